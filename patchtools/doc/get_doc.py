@@ -56,7 +56,7 @@ indent level 1 = 3 * ''
 import os
 
 from patchtools.lib.jsonconfig import JSONConfig
-from patchtools.lib.strings    import Strings
+from patchtools.lib.strings    import Strings, StringsView
 from patchtools.lib.functions  import Functions as ut
 
 def merge_files(config):
@@ -299,8 +299,9 @@ def convert_api_data(config):
     for source in sources:
         print('extract: ' + source)
         path = ut.join_path(srcroot, source)
-        strings  = Strings(ut.read_strings(path))
-        sections = strings.extract('#++','#--')
+        # Only the extracted sections are copied, since they are changed by conv_section
+        strings  = StringsView.from_text(ut.read_file(path))
+        sections = [section.to_strings() for section in strings.extract('#++','#--')]
         if (len(sections) > 0):
             sections = [conv_section(section) for section in sections]
             data += Strings.join(sections)
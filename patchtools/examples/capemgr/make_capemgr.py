@@ -101,6 +101,15 @@ def check_capes_0008():
     check_patch("capes/0008-capemgr-Priority-on-capemgr.enable_partno-option.patch",
                 "quilt/checks/check_capes_0008.tmp", { "mode" : "complete" })
 
+# Match each patch in the series file against the output of the previous patches,
+# without applying them to the files in ./quilt. This replaces the alternating
+# check_... and apply_patch() calls below. Run reset_quilt() first.
+def check_series():
+    series = h.read("quilt/series")
+    p = { "sourcedir" : "quilt", "patchdir" : "quilt/patches", "series" : True, "relocate" : True }
+    m = h.check(series, p)
+    h.write(m, "quilt/checks/check_series.tmp")
+
 def reset_quilt():
     ''' Reset quilt. This must be done each time you start from the first patch.
         Our local copy of the first patch was modified from '--- /dev/null' to
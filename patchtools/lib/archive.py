@@ -31,6 +31,7 @@ class Archive(PTObject):
              A "patch archive" file lists diff sections from patches that were applied to
              produce the associated kernel version. Since the patch archive files can be very large,
              we take care to avoid copying or storing data that is not of interest to the user.
+             The file is read one line at a time, and may be compressed by gzip, bzip2 or xz.
         """
         #--
 
@@ -72,7 +73,7 @@ class Archive(PTObject):
         '''
         index = begin = 0
         curr_seg = []
-        for string in ut.read_strings(self._path):
+        for string in ut.iter_strings(self._path):
             if (string.startswith('diff ')):
                 if (len(curr_seg) > 0):
                     yield (begin, curr_seg)
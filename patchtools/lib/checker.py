@@ -9,11 +9,46 @@ See the checker module section of the documentation for further information.
 
 # 2to3 from types import str
 
+import multiprocessing
+
 from patchtools.lib.patch      import Patch
+from patchtools.lib.filecache  import FileCache
+from patchtools.lib.overlay    import Overlay
+from patchtools.lib.gittree    import GitTree
+from patchtools.lib.landmark   import Landmarks
+from patchtools.lib.profiler   import Profiler
+from patchtools.lib.resultcache import ResultCache
+from patchtools.lib.parsecache import ParseCache
+from patchtools.lib.results    import CheckResult, TextSink
 from patchtools.lib.ptobject   import PTObject
 from patchtools.lib.exceptions import PT_ParameterError
 from patchtools.lib.functions  import Functions as ut
 
+# Checker used by the current worker process in parallel mode
+_worker_checker = None
+
+def _init_worker(checker):
+    
+    global _worker_checker
+    _worker_checker = checker
+
+def _check_chunk(chunk):
+    ''' Check a chunk of (index, path) items in a worker process. The records
+        and profile nodes of each patch are returned with its index so the caller
+        can restore the original order.
+    '''
+    results = []
+    for (index, path) in chunk:
+        _worker_checker._records = []
+        errors = _worker_checker._check_patch(path)
+        if (_worker_checker._profiler is not None):
+            nodes = _worker_checker._profiler.take_patches()
+        else:
+            nodes = []
+        results += [(index, _worker_checker._records, errors, nodes)]
+    
+    return results
+
 #++
 class Checker(PTObject):
     """ Validate the contents of Linux kernel patch files against
@@ -40,6 +75,23 @@ class Checker(PTObject):
                     default is True
                 debug (int, optional) debug options
                     default is 0
+                workers (int, optional): number of worker processes
+                    0 or 1 = check patches sequentially
+                    default is 0
+                cache_size (int, optional): size limit of the source file cache in bytes
+                    default is 64 MB
+                cache (FileCache, optional): source file cache to use across runs
+                relocate (bool, optional): find hunks that have moved in the source file
+                    default is False
+                fuzz (int, optional): number of outer merge lines that relocation may ignore
+                    default is 2
+                resultdir (string, optional): path to directory of stored results
+                parsedir (string, optional): path to directory of stored parsed patches
+                series (bool, optional): apply each patch in memory after checking it
+                    default is False
+                revision (string, optional): git revision to read source files from
+                profile (bool, optional): collect timers and counters for each patch
+                    default is False
             
         Raises:
             PT_ParameterError
@@ -50,6 +102,39 @@ class Checker(PTObject):
                 
             If 'targets' is specified the code will only scan diff sections that
             modify the filenames in params['targets]
+            
+            If 'workers' is > 1, patches are distributed across a pool of worker processes.
+            The messages are returned in the same order as in a sequential run.
+            
+            Source files are cached during a run of the match method. If 'cache' is
+            specified, its contents are kept for later runs, and 'cache_size' is ignored.
+            
+            If 'relocate' is True, a hunk whose "before" lines are not at its start line
+            is searched for outwards from that line, as done by GNU patch. Up to 'fuzz'
+            leading and trailing merge lines may be ignored. If the hunk is found, its
+            offset is reported and its edits are checked at the new location.
+            
+            If 'resultdir' is specified, the result of checking each patch is stored there.
+            A later run replays the stored messages of a patch, unless the patch file,
+            the options, or any source file referenced by the patch has changed.
+            
+            If 'parsedir' is specified, each parsed patch is stored there, and a later
+            run uses the stored patch instead of parsing the file again, unless the
+            patch file's contents have changed.
+            
+            If 'series' is True, the patches passed to the match method are a series,
+            and each patch is checked against the tree produced by the patches before it.
+            The patches are applied in memory, and the files on disk are not changed.
+            Since each patch depends on the previous ones, the patches are checked
+            sequentially, and 'workers' and 'resultdir' are ignored.
+            
+            If 'revision' is specified, sourcedir must be a git repository, and source
+            files are read from the tree of the given commit, tag or branch instead of
+            the checked out files. One "git cat-file" process reads all the files.
+            
+            If 'profile' is True, the time spent on each patch, diff and hunk is measured,
+            with counters such as bytes read, lines compared and find mode lookups. The
+            profile of the last run is returned by the get_profile method.
         """
         #--
         
@@ -68,10 +153,26 @@ class Checker(PTObject):
         self.mode   = self._check_optional_string_param(params, 'mode', 'full')
         self.find   = self._check_optional_param(params, 'find', bool, False)
         self.debug  = self._check_optional_param(params, 'debug', int, 0)
+        self.workers = self._check_optional_param(params, 'workers', int, 0)
+        self.cache_size = self._check_optional_param(params, 'cache_size', int, 64 * 1024 * 1024)
+        self.cache = self._check_optional_param(params, 'cache', FileCache, None)
+        self.relocate = self._check_optional_param(params, 'relocate', bool, False)
+        self.fuzz = self._check_optional_param(params, 'fuzz', int, 2)
+        self.resultdir = self._check_optional_string_param(params, 'resultdir', None)
+        self.parsedir = self._check_optional_string_param(params, 'parsedir', None)
+        self.series = self._check_optional_param(params, 'series', bool, False)
+        self.revision = self._check_optional_string_param(params, 'revision', None)
+        self.profile = self._check_optional_param(params, 'profile', bool, False)
         
         if (not self.mode in ('full', 'complete')):
             raise PT_ParameterError(self.name, 'mode')
         
+        if (self.fuzz < 0):
+            raise PT_ParameterError(self.name, 'fuzz')
+        
+        if (self.resultdir is not None):
+            self._check_path_param('resultdir', self.resultdir)
+        
         if ('targets' in params): 
             targets = params['targets']
             if (ut.is_string_type(targets)):
@@ -82,6 +183,19 @@ class Checker(PTObject):
                 raise PT_ParameterError(self.name, 'targets')
         else:
             self.targets = None
+        
+        self._landmarks = Landmarks()
+        
+        if (self.parsedir is not None):
+            self._parses = ParseCache({ 'cachedir' : self.parsedir })
+        else:
+            self._parses = None
+        self._profiler = None
+        
+        if (self.revision is not None):
+            self._git = GitTree({ 'repodir' : self.sourcedir, 'revision' : self.revision })
+        else:
+            self._git = None
               
     #++                                
     def match(self, param):
@@ -101,6 +215,282 @@ class Checker(PTObject):
         """
         #--
         
+        sink = TextSink(self.indent)
+        self.msgs = []
+        for record in self.results(param):
+            self.msgs += sink.format(record)
+    
+        return self.msgs
+    
+    #++                                
+    def results(self, param):
+        """ Validate patch files as the match method does, generating result records
+            instead of messages
+
+        Args:
+            param (choice):
+                (string): path to patch file
+                (list): paths to patch files
+                
+        Returns:
+            A generator of CheckResult records
+
+        Raises:
+            PT_ParameterError
+            PT_ParsingError
+            
+        Notes:
+            The records of each patch are generated when the patch has been checked,
+            so a run of any size can be written to a file by a TextSink or JsonSink
+            without holding its results in memory.
+        """
+        #--
+        
+        paths = self._start_run(param)
+        
+        if ((self.resultdir is not None) and (not self.series)):
+            self._results = ResultCache({ 'cachedir' : self.resultdir, 'sourcedir' : self.sourcedir })
+        
+        self._misc_msg('patchdir', 0, text=self.patchdir)
+        self._misc_msg('sourcedir', 0, text=self.sourcedir)
+        for record in self._take_records():
+            yield record
+        
+        if ((self.workers > 1) and (len(paths) > 1) and (not self.series)):
+            results = self._match_parallel(paths)
+        else:
+            results = self._match_sequential(paths)
+            
+        passed = skipped = 0
+        for (records, errors) in results:
+            for record in records:
+                yield record
+            if (errors == 0):
+                passed += 1
+            elif (errors < 0):
+                skipped += 1
+        
+        self._patch = None
+        self._misc_msg('summary', 0)
+        self._misc_msg('totals', 1, passed=passed, skipped=skipped, tested=len(paths))
+        for record in self._take_records():
+            yield record
+    
+    #++
+    def get_profile(self, count=10):
+        """ Get the profile of the last run of the match or results method
+        
+        Args:
+            count (int, optional): number of items in the lists of slowest items
+                default is 10
+                
+        Returns:
+            A dict (see Profiler.get_profile), or None if 'profile' is False
+        """
+        #--
+        
+        if (self._profiler is None):
+            return None
+        
+        return self._profiler.get_profile(count)
+    
+    #++                                
+    def bisect(self, param):
+        """ Find the first patch of a series whose hunks fail
+
+        Args:
+            param (list): paths to patch files, in series order
+                
+        Returns:
+            A dict describing the first failure:
+                patch  (string): path to the patch file, or None if all patches pass
+                index  (int):    index of the patch in the series
+                diff   (string): diff spec line
+                hunk   (string): hunk spec line, or None if the diff's paths are invalid
+                error  (string): kind of failure, e.g. 'hunk_not_found' or 'old_not_found'
+                tested (int):    number of patches whose hunks were checked, including
+                                 the failing patch if its hunks were checked
+
+        Raises:
+            PT_ParameterError
+            PT_ParsingError
+            
+        Notes:
+            First, every patch is parsed and the paths in its diffs are validated, which
+            does not read the source files. The first patch with an invalid path bounds
+            the rest of the search. Then the hunks of the patches before it are checked
+            in order, stopping at the first hunk that does not match the source file.
+            
+            A hunk fails if its "before" lines (merge and delete lines) are not at its
+            start line, or, if 'relocate' is True, cannot be located with up to 'fuzz'
+            lines of fuzz. If 'series' is True, each patch that passes is applied
+            in memory before the next patch is checked.
+        """
+        #--
+        
+        paths = self._start_run(param)
+        
+        # Parse the patches and validate their paths. In series mode, the files
+        # created and deleted by earlier patches are tracked.
+        patches = []
+        failure = None
+        exists  = {}
+        is_file = lambda filename: exists[filename] if (filename in exists) else self._tree.is_file(filename)
+        for index in range(len(paths)):
+            pdata = self._parse(ut.join_path(self.patchdir, paths[index]))
+            if (pdata.patch_type != 'binary'):
+                for diff in pdata.diffs:
+                    (kind, _) = self._get_path_error(diff, is_file)
+                    if (kind is not None):
+                        failure = (index, diff.spec, None, kind)
+                        break
+                    if (self.series):
+                        if (diff.new_path == '/dev/null'):
+                            exists[diff.old_path] = False
+                        else:
+                            if (diff.old_path not in ('/dev/null', diff.new_path)):
+                                exists[diff.old_path] = False
+                            exists[diff.new_path] = True
+            if (failure is not None):
+                break
+            patches += [pdata]
+        
+        # Check the hunks of the patches before the first path failure
+        tested = len(patches)
+        for index in range(len(patches)):
+            pdata = patches[index]
+            if (pdata.patch_type == 'binary'):
+                continue
+            result = self._find_failed_hunk(pdata)
+            if (result is not None):
+                failure = (index,) + result
+                tested  = index + 1 # including the failing patch
+                break
+            if (self.series):
+                self._tree.apply(pdata)
+        
+        if (failure is None):
+            return { 'patch' : None, 'index' : -1, 'diff' : None, 'hunk' : None,
+                     'error' : None, 'tested' : tested }
+        
+        return { 'patch' : paths[failure[0]], 'index' : failure[0], 'diff' : failure[1],
+                 'hunk' : failure[2], 'error' : failure[3], 'tested' : tested }
+    
+    #++                                
+    def matrix(self, param, trees):
+        """ Check patches against several source trees, e.g. kernel versions
+
+        Args:
+            param (list): paths to patch files
+            trees (list): source trees, each specified by
+                (string): path to source directory
+                (dict):   tree parameters
+                    sourcedir (string, required): path to source directory
+                    revision  (string, optional): git revision to read source files from
+                    name      (string, optional): name of the tree in the result
+                        default is sourcedir, followed by '@' and revision if specified
+                
+        Returns:
+            A dict describing the result:
+                trees   (list): tree names
+                patches (list): paths to patch files
+                rows    (list): a list of cells for each patch, one for each tree:
+                    'pass' : all hunks match
+                    'fail' : a path is invalid or a hunk does not match
+                    'skip' : binary patch
+                    '+N' or '-N' : all hunks match, at most N lines from their start line
+
+        Raises:
+            PT_ParameterError
+            PT_ParsingError
+            
+        Notes:
+            Each patch is parsed once and checked against every tree. Hunks are tested as
+            by the bisect method, and relocated if 'relocate' is True. The result of testing
+            the hunks of a diff is shared by all trees in which the diff's file has the same
+            contents, and git revisions share the contents of identical files.
+            
+            If 'series' is True, each patch is applied in memory to each tree after it has
+            been checked, as done by the match method.
+        """
+        #--
+        
+        paths = self._start_run(param)
+        
+        if (not isinstance(trees, list) or (len(trees) == 0)):
+            raise PT_ParameterError(self.name, 'trees')
+        
+        names, overlays, gits = [], [], []
+        try:
+            for tree in trees:
+                if (ut.is_string_type(tree)):
+                    tree = { 'sourcedir' : tree }
+                elif (not isinstance(tree, dict)):
+                    raise PT_ParameterError(self.name, 'trees')
+                sourcedir = self._check_required_string_param(tree, 'sourcedir')
+                self._check_path_param('trees', sourcedir)
+                revision = self._check_optional_string_param(tree, 'revision', None)
+                params = { 'sourcedir' : sourcedir, 'cache' : self._cache, 'fuzz' : self.fuzz }
+                if (revision is not None):
+                    gits += [GitTree({ 'repodir' : sourcedir, 'revision' : revision, 'cache' : self._cache })]
+                    params['base'] = gits[-1]
+                    name = '%s@%s' % (sourcedir, revision)
+                else:
+                    name = sourcedir
+                names    += [self._check_optional_string_param(tree, 'name', name)]
+                overlays += [Overlay(params)]
+            
+            rows = []
+            for path in paths:
+                if (self.debug > 0):
+                    print("matching %s" % path)
+                pdata = self._parse(ut.join_path(self.patchdir, path))
+                shared = {} # (diff index, file digest) -> result of _check_diff_hunks
+                row = []
+                for overlay in overlays:
+                    self._tree = overlay
+                    row += [self._get_matrix_cell(pdata, shared)]
+                    if (self.series and (pdata.patch_type != 'binary')):
+                        overlay.apply(pdata)
+                rows += [row]
+        finally:
+            for git in gits:
+                git.close()
+        
+        return { 'trees' : names, 'patches' : list(paths), 'rows' : rows }
+    
+    def _get_matrix_cell(self, pdata, shared):
+        ''' Check a patch against the current tree, returning its matrix cell.
+        '''
+        if (pdata.patch_type == 'binary'):
+            return 'skip'
+        
+        largest = 0
+        for index in range(len(pdata.diffs)):
+            diff = pdata.diffs[index]
+            (kind, _) = self._get_path_error(diff, self._tree.is_file)
+            if (kind is not None):
+                return 'fail'
+            if (diff.old_path == '/dev/null'):
+                continue
+            source = self._tree.get(diff.old_path)
+            key = (index, source.get_digest())
+            if (key not in shared):
+                shared[key] = self._check_diff_hunks(diff, source)
+            (failure, offset) = shared[key]
+            if (failure is not None):
+                return 'fail'
+            if (abs(offset) > abs(largest)):
+                largest = offset
+        
+        if (largest == 0):
+            return 'pass'
+        else:
+            return '%+d' % largest
+    
+    def _start_run(self, param):
+        ''' Validate the patch list and set up the state of a run.
+        '''
         if (ut.is_string_type(param)):
             paths = [param]
         elif (isinstance(param, (list, tuple))):
@@ -108,42 +498,209 @@ class Checker(PTObject):
         else:
             raise PT_ParameterError(self.name, param)
         
-        self.msgs = []
-        self._misc_msg('patchdir  = "%s":' % self.patchdir)
-        self._misc_msg('sourcedir = "%s":' % self.sourcedir)
+        if (self.cache is not None):
+            self._cache = self.cache
+        else:
+            self._cache = FileCache({ 'max_bytes' : self.cache_size })
         
-        passed = skipped = 0
+        tree = { 'sourcedir' : self.sourcedir, 'cache' : self._cache, 'fuzz' : self.fuzz }
+        if (self._git is not None):
+            self._git.cache = self._cache
+            tree['base'] = self._git
+        self._tree = Overlay(tree)
+        self._results = None
+        self._profiler = Profiler() if self.profile else None
+        
+        self._sink = TextSink(self.indent) # for debug output
+        self._patch = self._diff = self._hunk = None
+        self._records = []
+        
+        return paths
+    
+    def _find_failed_hunk(self, pdata):
+        ''' Return (diff spec, hunk spec, kind) of the first hunk of a patch that does
+            not match its source file, or None if all hunks match.
+        '''
+        for diff in pdata.diffs:
+            if (diff.old_path == '/dev/null'):
+                continue
+            (failure, _) = self._check_diff_hunks(diff, self._tree.get(diff.old_path))
+            if (failure is not None):
+                return (diff.spec,) + failure
+                    
+        return None
+    
+    def _check_diff_hunks(self, diff, source):
+        ''' Test whether the hunks of a diff match the source file. Returns (failure, offset),
+            where failure is (hunk spec, kind) for the first hunk that does not match, or None,
+            and offset is the largest offset of a relocated hunk.
+        '''
+        length = len(source.lines)
+        offset = largest = 0
+        for hunk in diff.hunks:
+            start = hunk.old_start
+            count = hunk.old_count
+            if (count == 0):
+                continue
+            if (self.relocate):
+                (found, _) = self._relocate_hunk(hunk, start + offset, source)
+                if (found > 0):
+                    offset = found - start
+                    if (abs(offset) > abs(largest)):
+                        largest = offset
+                    continue
+                return ((hunk.spec, 'hunk_not_found'), largest)
+            if ((start < 1) or ((start - 1 + count) > length)):
+                return ((hunk.spec, 'bad_range'), largest)
+            (_, texts) = hunk.get_before()
+            if (ut.normalize_strings(texts) != source.get_norms()[start - 1:start - 1 + len(texts)]):
+                return ((hunk.spec, 'hunk_not_found'), largest)
+        
+        return (None, largest)
+    
+    def _match_sequential(self, paths):
+        ''' Check patches in the current process, yielding the records and
+            error count of each.
+        '''
         for path in paths:
             if (self.debug > 0):
                 print("matching %s" % path)
-            errors = self._check(path)
-            if (errors == 0):
-                passed += 1
-            elif (errors < 0):
-                skipped += 1
-                
-        self._misc_msg('\nSummary:')
-        self._misc_msg('%d passed, %d skipped, %d tested' % (passed, skipped, len(paths)), 1)
+            errors = self._check_patch(path)
+            yield (self._take_records(), errors)
     
-        return self.msgs
+    def _match_parallel(self, paths):
+        ''' Check patches in a pool of worker processes, yielding the records and
+            error count of each in the original order. Results that arrive ahead
+            of their turn are held until the preceding patches are done.
+        '''
+        pending = {}
+        current = 0
+        pool = multiprocessing.Pool(self.workers, _init_worker, (self,))
+        try:
+            for chunk in pool.imap_unordered(_check_chunk, self._make_chunks(paths)):
+                for (index, records, errors, nodes) in chunk:
+                    pending[index] = (records, errors, nodes)
+                while (current in pending):
+                    (records, errors, nodes) = pending.pop(current)
+                    if (self._profiler is not None):
+                        self._profiler.patches += nodes
+                    yield (records, errors)
+                    current += 1
+            pool.close()
+        except:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+    
+    def _take_records(self):
+        ''' Return the records issued since the last call.
+        '''
+        records = self._records
+        self._records = []
+        
+        return records
+    
+    def _make_chunks(self, paths):
+        ''' Group patches into chunks of similar cost, using patch file size as the
+            cost estimate. Patches are taken largest first, so large patches get chunks
+            of their own and are dispatched before the batches of small ones, and
+            a few large patches do not hold up the end of the run.
+        '''
+        items = []
+        for index in range(len(paths)):
+            size = ut.file_size(ut.join_path(self.patchdir, paths[index]))
+            items += [(size or 0, index, paths[index])]
+        items.sort(key=lambda item: item[0], reverse=True)
+        
+        total = sum([size for (size, _, _) in items])
+        limit = max(total // (self.workers * 4), 1)
+        
+        chunks = []
+        chunk, cost = [], 0
+        for (size, index, path) in items:
+            chunk += [(index, path)]
+            cost  += size
+            if (cost >= limit):
+                chunks += [chunk]
+                chunk, cost = [], 0
+        if (len(chunk) > 0):
+            chunks += [chunk]
+            
+        return chunks
+          
+    def _check_patch(self, patchpath):
+        ''' Check a patch, collecting its profile if profiling is enabled.
+        '''
+        if (self._profiler is None):
+            return self._check_stored(patchpath)
+        
+        self._profiler.start_patch(patchpath)
+        try:
+            return self._check_stored(patchpath)
+        finally:
+            self._profiler.end_patch()
+          
+    def _check_stored(self, patchpath):
+        ''' Check a patch, or replay its stored result if its inputs are unchanged.
+        '''
+        if (self._results is None):
+            return self._check(patchpath)
+        
+        # The records name the patch, so patches with the same contents have their own results
+        options = [patchpath, self.sourcedir, self.mode, self.find, self.targets, self.relocate, self.fuzz]
+        if (self._git is not None): # the tree's contents are identified by its id
+            options += [self._git.tree_id]
+        key = self._results.make_key(ut.join_path(self.patchdir, patchpath), options)
+        result = self._results.get(key)
+        if (result is not None):
+            (records, errors) = result
+            self._records += [CheckResult.from_dict(record) for record in records]
+            if (self._profiler is not None):
+                self._profiler.add('replayed')
+            return errors
+        
+        first = len(self._records)
+        self._sources = []
+        errors = self._check(patchpath)
+        records = [record.as_dict() for record in self._records[first:]]
+        self._results.put(key, self._sources, records, errors)
+        
+        return errors
           
     def _check(self, patchpath):
         
-        self._misc_msg('\nPATCH: "%s"' % patchpath)   
+        profiler = self._profiler
+        self._patch, self._diff, self._hunk = patchpath, None, None
+        self._misc_msg('patch', 0)
         patchpath = ut.join_path(self.patchdir, patchpath)
-        pdata = Patch(patchpath)
+        if (profiler is not None):
+            started = profiler.clock()
+        pdata = self._parse(patchpath)
+        if (profiler is not None):
+            profiler.add('parse_time', profiler.clock() - started)
         if (len(pdata.diffs) == 0):
-            self._info_msg('skipping empty/commented patch', 1)
+            self._info_msg('empty_patch', 1)
             return 0
  
         if (pdata.patch_type == 'binary'):
-            self._info_msg('skipping binary patch', 1)
+            self._info_msg('binary_patch', 1)
             return -1
                
         errors = 0
         for diff in pdata.diffs:
             
-            self._misc_msg('DIFF: "%s"' % diff.spec, 1)
+            if (not self._check_targets(diff.a_path)): # the diff's hunks are not made
+                continue
+            
+            self._diff, self._hunk = diff.spec, None
+            self._misc_msg('diff', 1)
+            if (profiler is not None):
+                profiler.start_diff(diff.spec, diff.old_path)
+            
+            if (self._results is not None):
+                self._sources += [path for path in (diff.a_path, diff.old_path, diff.new_path)
+                                  if ((path is not None) and (path != '/dev/null'))]
             
             if (not self._check_paths(diff)):
                 errors += 1
@@ -152,57 +709,97 @@ class Checker(PTObject):
             if (diff.old_path == '/dev/null'): # Can't fail on adding lines to a new file
                 continue
                    
-            old_lines = ut.read_strings(ut.join_path(self.sourcedir, diff.old_path))
-               
+            if (profiler is not None):
+                (started, read) = (profiler.clock(), self._cache.bytes_read)
+            source = self._tree.get(diff.old_path)
+            if (profiler is not None):
+                profiler.add('read_time', profiler.clock() - started)
+                profiler.add('bytes_read', self._cache.bytes_read - read)
+            
+            offset = 0 # offset of the previous relocated hunk
             for hunk in diff.hunks:
-                self._misc_msg('HUNK: "%s"' % hunk.spec, 2)
+                self._hunk = hunk.spec
+                self._misc_msg('hunk', 2)
+                if (profiler is not None):
+                    profiler.start_hunk(hunk.spec)
                 edits = hunk.edits
                 start = hunk.old_start
                 count = hunk.old_count
                 tag   = 'old'    
                 note = hunk.note
-                if (not self._check_hunk_format(start, count, len(old_lines), tag)):
+                if (self.relocate and (count > 0)):
+                    if (profiler is not None):
+                        started = profiler.clock()
+                    (found, fuzz) = self._relocate_hunk(hunk, start + offset, source)
+                    if (profiler is not None):
+                        profiler.add('relocate_time', profiler.clock() - started)
+                    if (found > 0):
+                        if ((found != start) or (fuzz > 0)):
+                            self._info_msg('hunk_moved', 3, line=found, offset=found - start, fuzz=fuzz)
+                        offset = found - start
+                        start  = found
+                if (not self._check_hunk_format(start, count, len(source.lines), tag)):
                     errors += 1
                     continue
                 
-                errors += self._check_hunk_edits(diff.old_path, edits, start, count, note, old_lines)
+                errors += self._check_hunk_edits(diff.old_path, edits, start, count, note, source)
                     
-        self._info_msg("%d patch errors" % errors, 1)
+        self._diff = self._hunk = None
+        self._info_msg('patch_errors', 1, count=errors)
+        
+        if (self.series):
+            rejects = self._tree.apply(pdata)
+            if (rejects > 0):
+                self._warn_msg('patch_rejects', 1, count=rejects)
         
         return errors
     
+    def _parse(self, patchpath):
+        ''' Parse a patch file, or get it from the stored parsed patches.
+        '''
+        if (self._parses is None):
+            return Patch(patchpath)
+        else:
+            return self._parses.get(patchpath)
+    
     def _check_paths(self, diff):
+        ''' Check the paths of a diff, issuing an error record if one is invalid.
+        '''
+        (kind, path) = self._get_path_error(diff, self._tree.is_file)
+        if (kind is not None):
+            self._error_msg(kind, 2, text=path)
+            return False
+        
+        return True
+    
+    def _get_path_error(self, diff, is_file):
         ''' Check that:
             (1) file named in diff spec exists (GIT format only)
             (2) file named in '---' line exists or is /dev/null
             (3) file named in '+++' line exists or is /dev/null
             (4) file to be created exists in new tree
             (5) file to be deleted does not exist in old tree
+            Returns (kind, path) of the first invalid path, or (None, None).
         '''
         
-        if (not ut.is_file(ut.join_path(self.sourcedir, diff.a_path))):
-            self._error_msg('"a" file not found: %s' % diff.a_path, 2)
-            return False
+        if (not is_file(diff.a_path)):
+            return ('a_not_found', diff.a_path)
         
         if (diff.old_path != '/dev/null'):
-            if (not ut.is_file(ut.join_path(self.sourcedir, diff.old_path))):
-                self._error_msg('"old" file not found: %s' % diff.old_path, 2)
-                return False
+            if (not is_file(diff.old_path)):
+                return ('old_not_found', diff.old_path)
         else:
-            if (ut.is_file(ut.join_path(self.sourcedir, diff.new_path))):
-                self._error_msg('"new" file found in old tree: %s' % diff.new_path, 2)
-                return False
+            if (is_file(diff.new_path)):
+                return ('new_found', diff.new_path)
                 
         if (diff.new_path != '/dev/null'):
-            if (not ut.is_file(ut.join_path(self.sourcedir, diff.new_path))):
-                self._error_msg('"new" file not found: %s' % diff.new_path, 2)
-                return False
+            if (not is_file(diff.new_path)):
+                return ('new_not_found', diff.new_path)
         else:
-            if (not ut.is_file(ut.join_path(self.sourcedir, diff.old_path))):
-                self._error_msg('"old" file not found in old tree: %s' % diff.old_path, 2)
-                return False
+            if (not is_file(diff.old_path)):
+                return ('old_not_in_tree', diff.old_path)
                 
-        return True
+        return (None, None)
     
     def _check_hunk_format(self, start, count, length, tag):
         """ Validate a hunk's start, count, etc., values against the target file.
@@ -213,59 +810,76 @@ class Checker(PTObject):
         if ((start > 0) and (count > 0)): # path is a file
             # start is a 1-based index
             if ((start > length) or ((start + count) > length)):   
-                self._error_msg("invalid %s start or count for file: start=%d, count=%d, length=%d" % \
-                                (tag, start, count, length), 3)
+                self._error_msg('bad_range', 3, line=start, tag=tag, count=count, length=length)
                 return False 
             
         return True
     
-    def _check_hunk_note(self, note, linenum, alines, old_path):
+    def _relocate_hunk(self, hunk, start, source):
+        """ Find the hunk's "before" lines (merge and delete lines) nearest to start.
+            Returns (line number, fuzz) of the located hunk, or (0, 0) if it was not found,
+            or if fuzz would place its first line before the start of the file.
+        """
+        (ops, texts) = hunk.get_before()
+        texts = ut.normalize_strings(texts)
+        (index, fuzz) = source.locate_hunk(ops, texts, start - 1, self.fuzz)
+        if (index < 0): # not found, or its edits cannot be checked from line 1
+            return (0, 0)
+        
+        return (index + 1, fuzz)
+    
+    def _check_hunk_note(self, note, linenum, source, old_path):
         """ A hunk "note" (any text after the second '@@') appears to be a copy of
             the closest previous line with a character in column 0. This is often
             the start declaration of a previous or enclosing function, e.g. 'static int foo(...'.
             We may be able to locate a source fragment that has moved by finding the note.
             But we only search for lines that are likely to be unique in the file.
         """
-        errors = []
-        if (self._is_landmark(old_path, note)):
-            matches = self._find_line(note, alines)
-            for match in matches:
-                errors += ['hunk note found at %d' % match]
+        matches = []
+        if (self._landmarks.is_landmark(old_path, note)):
+            matches = self._find_line(note, source)
+            self._find_msg('note_moved', 3, text=note, found=[match + 1 for match in matches])
                 
-        return errors
+        return matches
                               
     def _is_null_path(self, path):
         """ Determine if a path indicates a non existent file.
         """
         return (path == '/dev/null')
     
-    def _check_hunk_edits(self, filepath, edits, start, count, note, lines):
+    def _check_hunk_edits(self, filepath, edits, start, count, note, source):
         """ Check edits against the "a" file. Report errors when lines to be deleted
             or merged are missing, and when lines to be added are present. Note that
             patch lines and source lines may have the same text, but differ in leading
             whitespace. We strip and normalize the strings before testing them. 
             In 'find' mode, try to find missing lines.
         """
-        errors = warnings = 0
+        errors = warnings = compared = 0
         current = start
         mismatches = []
+        if (self._profiler is not None):
+            self._profiler.add('normalizations', len(edits))
+            if (not source.is_normalized()):
+                self._profiler.add('normalizations', len(source.lines))
+        norms = source.get_norms()
+        enorms = ut.normalize_strings([edit[1:] for edit in edits])
         
         for (index, edit1, edit2) in self._get_edits(edits):
             
             op, text1 = edit1[0], edit1[1:]
-            norm1 = ut.normalize_string(text1)
-            line  = lines[current - 1] # patch line numbers are 1-based
-            norm3 = ut.normalize_string(line)
+            norm1 = enorms[index]
+            norm3 = norms[current - 1] # patch line numbers are 1-based
+            compared += 1 # each edit, or pair of change edits, is compared with one source line
             
             if (edit2 is not None): # change request
                 text2 = edit2[1:]
-                norm2 = ut.normalize_string(text2)
+                norm2 = enorms[index + 1]
                 if (norm2 == norm3): # Change already applied
-                    self._ok_msg('"after"  line found at %d: "%s"' % (current, text2), 3)
+                    self._ok_msg('after_found', 3, line=current, op='+', text=text2)
                 elif (norm1 == norm3): # Change not yet applied
-                    self._info_msg('"after"  line not found at %d: "%s"' % (current, text2), 3)
+                    self._info_msg('after_missing', 3, line=current, op='+', text=text2)
                 else:
-                    self._error_msg('"before"  line not found at %d: "%s"' % (current, text1), 3)
+                    self._error_msg('before_missing', 3, line=current, op='-', text=text1)
                 current += 1 # advance to next edit line
                     
             elif (op == '-'): # delete line
@@ -273,11 +887,11 @@ class Checker(PTObject):
                 # but may be elsewhere in the file. If self.find is True, we will look for it.
                 # Doing so may return multiple matches.
                 if (norm1 != norm3):
-                    self._error_msg('"delete" line not found at %d: "%s"' % (current, text1), 3)
+                    self._error_msg('delete_missing', 3, line=current, op=op, text=text1)
                     mismatches += [(index, '-')]
                 else:
                     if (self.mode == 'complete'):
-                        self._ok_msg('"delete" line found at %d: "%s"' % (current, text1), 3)
+                        self._ok_msg('delete_found', 3, line=current, op=op, text=text1)
                 current += 1 # advance to next edit line
             
             elif (op == '+'): # insert line
@@ -285,11 +899,11 @@ class Checker(PTObject):
                 # but may be elsewhere in the file. If self.find is True, we will look for
                 # significant "add" lines below. Doing so may return multiple matches.
                 if (norm1 == norm3):
-                    self._error_msg('"add"    line found at %d: "%s"' % (current, text1), 3)
+                    self._error_msg('add_found', 3, line=current, op=op, text=text1)
                     errors += 1
                 else: 
                     if (self.mode == 'complete'):
-                        self._info_msg('"add"    line not found at next line: "%s"' % text1, 3)
+                        self._info_msg('add_missing', 3, line=current, op=op, text=text1)
                     mismatches += [(index, '+')]
                                  
             else: # (op == ' '): # merge line
@@ -297,20 +911,23 @@ class Checker(PTObject):
                 # but may be elsewhere in the file. If self.find is True, we will look for it.
                 # Doing so may return multiple matches.
                 if (norm1 != norm3):
-                    self._warn_msg('"merge"  line not found at %d: "%s"' % (current, text1), 3)
+                    self._warn_msg('merge_missing', 3, line=current, op=op, text=text1)
                     warnings += 1
                     mismatches += [(index, ' ')]
                 elif (self.mode == 'complete'):
-                    self._ok_msg('"merge"  line found at %d: "%s"' % (current, text1), 3)
+                    self._ok_msg('merge_found', 3, line=current, op=op, text=text1)
                 current += 1 # advance to next edit line                                 
         
+        if (self._profiler is not None):
+            self._profiler.add('lines_compared', compared)
+        
         if ((len(mismatches) > 0) and self.find):   
-            self._match(filepath, edits, lines, mismatches)
+            self._match(filepath, edits, source, mismatches)
             return 1
         else:
             return 0
     
-    def _match(self, filepath, edits, strings, mismatches):
+    def _match(self, filepath, edits, source, mismatches):
         ''' (1) Try to find missing "delete" or "merge" lines
             (2) Try to find "add" lines
         '''
@@ -319,33 +936,36 @@ class Checker(PTObject):
             text = edit_text[1:]
             if (text.strip() == 'bool'):
                 pass
-            if (self._is_landmark(filepath, text)):   
-                matches = self._find_line(text, strings)
-                for match in matches:
-                    if (edit_type == '+'):
-                        self._find_msg('"add"    line found at %d: "%s"' %  (match + 1, text), 3)
-                    elif (edit_type == '-'):
-                        self._find_msg('"delete" line found at %d: "%s"' %  (match + 1, text), 3)
-                    else:
-                        self._find_msg('"merge"  line found at %d: "%s"' %  (match + 1, text), 3)
+            if (self._landmarks.is_landmark(filepath, text)):   
+                matches = self._find_line(text, source)
+                found = [match + 1 for match in matches]
+                if (edit_type == '+'):
+                    self._find_msg('add_moved', 3, op=edit_type, text=text, found=found)
+                elif (edit_type == '-'):
+                    self._find_msg('delete_moved', 3, op=edit_type, text=text, found=found)
+                else:
+                    self._find_msg('merge_moved', 3, op=edit_type, text=text, found=found)
                     
         return None # for bkpt only 
 
-    def _find_line(self, text, strings):
-        ''' Try to find text in the source strings.
+    def _find_line(self, text, source):
+        ''' Try to find text in the source file.
         
-            Both text and strings are normalized to eliminate mismatches on varying whitespace.
+            Both text and source lines are normalized to eliminate mismatches on varying
+            whitespace. The source file indexes its normalized lines once, so each search
+            is a dictionary lookup.
             
             Source strings may contain items such as author name, etc. with unicode characters
             that can't be converted to ascii or latin-1, so we must not convert the strings to
             Python 2.x str objects.
         '''
-        text = ut.normalize_string(text, True)
-        matches = []
-        for index in range(len(strings)):
-            string = ut.normalize_string(strings[index], True)
-            if (text == string):
-                matches += [index]
+        if (self._profiler is None):
+            return source.find(text)
+        
+        started = self._profiler.clock()
+        matches = source.find(text)
+        self._profiler.add('find_lookups')
+        self._profiler.add('find_time', self._profiler.clock() - started)
         
         return matches
             
@@ -373,209 +993,13 @@ class Checker(PTObject):
         index = 0
         while (index < elen):
             e1 = edits[index]
-            if (e1.startswith('-')):
-                if (index < (elen - 1)):
-                    e2 = edits[index + 1]
-                    if (e2.startswith('+')):
-                        yield (index, e1, e2)
-                        index += 1
+            if (e1.startswith('-') and (index < (elen - 1)) and edits[index + 1].startswith('+')):
+                yield (index, e1, edits[index + 1])
+                index += 1
             else:
                 yield (index, e1, None)
             index += 1
                 
-    def _is_landmark(self, filepath, string):
-        """ Determine if a string is a "landmark" string , i.e. one that is likely to be unique
-            in the file, and thus may be easy to isolate if it is present. Searching for strings
-            such as '};' could give a large number of extraneous matches. 
-        """
-    
-        if ((len(string) == 0) or string.isspace()):
-            return False
-        else:
-            words = ut.string_to_words(string)
-        
-        words2 = []
-        for word in words:
-            if ('_' in word):
-                sylls = word.split('_')
-                words2 += sylls
-            else:
-                words2 += [word]
-        words = words2
-        
-        words2 = []
-        for word in words:
-            if ('-' in word):
-                sylls = word.split('-')
-                words2 += sylls
-            else:
-                words2 += [word]
-        words = words2
-        
-        if (len(words) > 4):
-            return True
-        
-        index = filepath.rfind('/') + 1
-        filename = filepath[index:]
-            
-        if (filename.endswith('.c') or filename.endswith('.h')):
-            return self._is_c_h_landmark(string, words)
-       
-        elif (filename.endswith('.S') or filename.endswith('.inc')):
-            return self._is_S_landmark(string, words)
-        
-        elif (filename.endswith('.dts') or filename.endswith('.dtsi')):   
-            return self._is_dts_landmark(string, words)
-                
-        elif (filename.startswith('Kconfig')):
-            return self._is_Kconfig_landmark(string, words)
-   
-        elif (filename.startswith('Makefile')):
-            return self._is_Makefile_landmark(string, words)
-        
-        return self._is_generic_landmark(string, words)
-                      
-    def _is_c_h_landmark(self, string, words):
-        """ Determine if a string is a "landmark" string in a .c or .h file.
-        """
-        
-        #if (self._is_c_h_S_comment(string)):
-        #    return False
-                
-        word0 = words[0]
-        
-        if ((len(words) == 1) and (words[0] in ('/*','*/','}',')',');','bool'))):
-            return False
-            
-        if (word0 in ('#ifdef', '#ifndef', '#include', 'void', 'const', 'static', 'extern', 'struct', 'union')):
-            return True
-        
-        elif (word0.startswith('MACHINE_')):
-            return True
-        
-        elif (word0.startswith('MODULE_')):
-            return True
-        
-        elif (word0.startswith('module_')):
-            return True
-        
-        elif (word0.startswith('DEFINE_')):
-            return True
-        
-        elif (word0.startswith('DECLARE_')):
-            return True
-        
-        else:
-            for word in words:
-                if ('(' in word): # start of argument list?
-                    return True
-                elif (')' in word): # end of argument list?
-                    return True
-                elif ('->' in word): # pointer dereference
-                    return True
-            return False
-        
-    def _is_S_landmark(self, string, words):
-        """ Determine if a string is a "landmark" string in a .S (assembler) file.
-        """
-        
-        #if (self._is_c_h_S_comment(string)):
-        #    return False
-        
-        word0 = words[0]
-        
-        if (word0 in ('#ifdef', '#ifndef', '#include', '#if')):
-            return True
-        
-        elif (word0 in ('.section' , '.size', '.align')):
-            return True
-        
-        elif (word0.endswith(':')):  # label
-            return True
-        
-        else:
-            return False
-                          
-    def _is_dts_landmark(self, string, words):
-        """ Determine if a string is a "landmark" string in a .dts or .dtsi file.
-            Any line that is not blank or '};' is significant.
-        """
-        
-        if (words[0] in ('};','>;','/*','*/')):
-            return False
-        
-        if ('status =' in string):
-            return False
-        
-        if ('#address-cells = <1>;' in string):
-            return False
-        
-        if ('interrupt-parent = <&intc>;' in string):
-            return False
-        
-        if ('#size-cells = <0>;' in string):
-            return False
-        
-        if ('pinctrl-names = "default";' in string):
-            return False
-        
-        return True
-            
-        
-    def _is_Kconfig_landmark(self, string, words):
-        """ Determine if a string is a "landmark" string in a Kconfig file.
-        """
-        
-        #if (self._is_makefile_comment(string)):
-        #    return False
-        
-        return (words[0] in ('config','select','depends','source','menu','choice'))
-    
-    def _is_Makefile_landmark(self, string, words):
-        """ Determine if a string is a "landmark" string in a Makefile.
-        """
-        
-        if (string.startswith('# -')):
-            return False
-        
-        if ('CONFIG_' in string):
-            return True
-        
-        for word in words:
-            if (word.endswith(':')): # make target
-                return True
-            
-        return False
-    
-    def _is_generic_landmark(self, string, words):
-        
-        # Any string that has > 5 words may be unique
-        if (len(words) > 5):
-            return True
-            
-        # Any string that has a word with > 12 chars may be unique
-        for word in words:
-            if (len(word) > 12):
-                return True
-        
-        return False
-
-    def _is_c_h_S_comment(self, string):
-        
-        string = string.strip()
-        if (string.startswith('/*')):
-            return True
-        elif (string.endswith('*/')):
-            return True
-        elif (string.startswith('//')):
-            return True
-        else:
-            return False
-    
-    def _is_makefile_comment(self, string):
-        
-        return string.lstrip().startswith('#')
-                         
     def _normalize(self, string):
         ''' Strip leading and trailing whitespace, but not trailing '\n'.
             Replace all internal whitespace segments by a single space.
@@ -587,63 +1011,56 @@ class Checker(PTObject):
             
         return string
     
-    def _indent(self, string, level=0):
-        
-        return level * self.indent + string
-    
-    def _error_msg(self, string, level=0):
-        ''' Format error message
+    def _record(self, status, kind, level, line=None, op=None, text=None, found=None, **extra):
+        ''' Issue a result record in the context of the current patch, diff and hunk
         '''
-        text = self._indent('ERROR: ' + string, level)
-        self.msgs += [text]
+        if (len(extra) == 0):
+            extra = None
+        record = CheckResult(kind, status, level, self._patch, self._diff, self._hunk,
+                             line, op, text, found, extra)
+        self._records += [record]
         if (self.debug > 1):
-            print(text)
+            for string in self._sink.format(record):
+                print(string)
+    
+    def _error_msg(self, kind, level=0, **fields):
+        ''' Issue error record
+        '''
+        self._record('ERROR', kind, level, **fields)
             
-    def _info_msg(self, string, level=0):
-        ''' Format info message
+    def _info_msg(self, kind, level=0, **fields):
+        ''' Issue info record
         '''
-        text = self._indent('INFO:  ' + string, level)
-        self.msgs += [text]
-        if (self.debug > 1):
-            print(text)
+        self._record('INFO', kind, level, **fields)
             
-    def _find_msg(self, string, level=0):
-        ''' Format info message
+    def _find_msg(self, kind, level=0, **fields):
+        ''' Issue find mode record
         '''
-        text = self._indent('FIND:  ' + string, level)
-        self.msgs += [text]
-        if (self.debug > 1):
-            print(text)
+        self._record('FIND', kind, level, **fields)
             
-    def _ok_msg(self, string, level=0):
-        ''' Format complete mode message
+    def _ok_msg(self, kind, level=0, **fields):
+        ''' Issue complete mode record
         '''
-        text = self._indent('-OK-:  ' + string, level)
-        self.msgs += [text]
-        if (self.debug > 1):
-            print(text)
+        self._record('OK', kind, level, **fields)
     
-    def _warn_msg(self, string, level=0):
-        ''' Format info message
+    def _warn_msg(self, kind, level=0, **fields):
+        ''' Issue warning record
         '''
-        text = self._indent('WARN:  ' + string, level)
-        self.msgs += [text]
-        if (self.debug > 1):
-            print(text)
+        self._record('WARN', kind, level, **fields)
                     
-    def _misc_msg(self, string, level=0):
-        ''' Format miscellaneous message
+    def _misc_msg(self, kind, level=0, **fields):
+        ''' Issue miscellaneous record
         '''
-        text = self._indent(string, level)
-        self.msgs += [text]
-        if (self.debug > 1):
-            print(text)
+        self._record(None, kind, level, **fields)
     
     def _check_targets(self, diff_file):
         
         if (self.targets is None):
             return True
         
+        if (diff_file is None):
+            return False
+        
         for target in self.targets:
             if (target in diff_file):
                 return True
@@ -7,6 +7,8 @@ Created on Apr 13, 2014
 Parse a patch diff section.
 '''
 
+from array import array
+
 from patchtools.lib.ptobject   import PTObject
 from patchtools.lib.hunk       import Hunk
 from patchtools.lib.exceptions import PT_ParameterError
@@ -18,15 +20,30 @@ class Diff(PTObject):
     """
     #--
     
+    __slots__ = ('name', 'spec', 'a_path', 'b_path', 'old_path', 'new_path', 'diff_type',
+                 '_buffer', '_sections', '_hunks')
+    
     #++
-    def __init__(self, strings):
+    def __init__(self, strings, begin=0, end=None, buffer=None, offsets=None):
         """ Constructor
          
         Args:
-            strings (Strings): diff section from a patch file or archive file
+            strings (list): lines of a patch file or archive file
+            begin   (int, optional): index of the diff line
+                default is 0
+            end     (int, optional): index after the last line of the diff section
+                default is len(strings)
+            buffer  (string, optional): text that the lines were split from, by '\\n'
+            offsets (array, optional): offset in buffer of each line
+                required if buffer is specified
             
         Raises:
             PT_ParameterError
+            
+        Notes:
+            The diff keeps the offsets in buffer of each hunk section, and only makes the
+            Hunk objects when its hunks are first used. If buffer is not specified, the
+            diff keeps a buffer of its own.
         """
         #--
     
@@ -35,36 +52,103 @@ class Diff(PTObject):
         if ((strings is None) or (not isinstance(strings, list))):
             raise PT_ParameterError(self.name, 'strings')
         
-        (head, body) = strings.partition('@@ ')
-        self._parse_head(head)
-        self._parse_body(body)
-    
-    def _parse_head(self, strings):
+        if (end is None):
+            end = len(strings)
         
-        if (strings[0].startswith('diff -')):
-            self._parse_diff_line(strings[0])
+        if (buffer is None):
+            strings = strings[begin:end]
+            (begin, end) = (0, len(strings))
+            (buffer, offsets) = ('\n'.join(strings), self._get_offsets(strings))
+        
+        if (strings[begin].startswith('diff -')):
+            self._parse_diff_line(strings[begin])
         else:
             self.spec   = None
             self.a_path = None
             self.b_path = None
-            
+        
         self.diff_type = 'text'
-        for string in strings[1:]:
-            if (string == 'GIT binary patch'):
-                self.diff_type = 'binary'
-                self.old_path  = None
-                self.new_path  = None
-                break
-            elif (string.startswith('--- ')):
-                if (string[4:] == '/dev/null'):
-                    self.old_path = '/dev/null'
-                else:    
-                    self.old_path = string[6:] # drop leading 'a/'
-            elif (string.startswith('+++ ')):
-                if (string[4:] == '/dev/null'):
-                    self.new_path = '/dev/null'
-                else:    
-                    self.new_path = string[6:] # drop leading 'b/'   
+        sections = array('l') # start and end offsets of each hunk section
+        hunk = -1 # index of the current hunk line
+        for index in range(begin + 1, end):
+            string = strings[index]
+            if (string.lstrip().startswith('@@ ')):
+                if (hunk != -1):
+                    sections.extend(self._get_section(strings, hunk, index, offsets))
+                hunk = index
+            elif ((hunk == -1) and (self.diff_type == 'text')):
+                self._parse_head_line(string)
+        
+        if (hunk != -1):
+            sections.extend(self._get_section(strings, hunk, end, offsets))
+        
+        self._buffer, self._sections, self._hunks = buffer, sections, None
+    
+    #++
+    @property
+    def hunks(self):
+        """ The hunks of the diff, made when first used
+        
+        Returns:
+            A list of Hunk objects
+        """
+        #--
+        
+        if (self._hunks is None):
+            (buffer, sections) = (self._buffer, self._sections)
+            self._hunks = [Hunk.from_buffer(buffer, sections[index], sections[index + 1])
+                           for index in range(0, len(sections), 2)]
+        
+        return self._hunks
+    
+    def __getstate__(self):
+        ''' The paths are not set if the diff has no '---' and '+++' lines.
+        '''
+        return dict([(field, getattr(self, field)) for field in self.__slots__ if hasattr(self, field)])
+    
+    def __setstate__(self, state):
+        
+        for field in state:
+            setattr(self, field, state[field])
+    
+    def _get_section(self, strings, begin, end, offsets):
+        ''' Get the start and end offsets of the hunk section from the hunk line at
+            index begin to the line before end. On rare occasions, a hunk may be followed
+            by an empty line before the next diff, which is not part of the section.
+        '''
+        last = end - 1
+        while ((last > begin) and (len(strings[last]) == 0)):
+            last -= 1
+        
+        return (offsets[begin], offsets[last] + len(strings[last]))
+    
+    def _get_offsets(self, strings):
+        
+        offsets = array('l')
+        offset = 0
+        for string in strings:
+            offsets.append(offset)
+            offset += len(string) + 1
+        
+        return offsets
+    
+    def _parse_head_line(self, string):
+        ''' Parse a line between the diff line and the first hunk.
+        '''
+        if (string == 'GIT binary patch'):
+            self.diff_type = 'binary'
+            self.old_path  = None
+            self.new_path  = None
+        elif (string.startswith('--- ')):
+            if (string[4:] == '/dev/null'):
+                self.old_path = '/dev/null'
+            else:    
+                self.old_path = string[6:] # drop leading 'a/'
+        elif (string.startswith('+++ ')):
+            if (string[4:] == '/dev/null'):
+                self.new_path = '/dev/null'
+            else:    
+                self.new_path = string[6:] # drop leading 'b/'   
     
     def _parse_diff_line(self, string):
         ''' Extract old and new paths from diff line, which has a format like:
@@ -80,11 +164,3 @@ class Diff(PTObject):
         # On rare occasions the diff line is corrupted
         if (self.a_path.endswith('/')):
             self.a_path = self.b_path
-            
-    def _parse_body(self, strings):
-        
-        if (strings is None):
-            self.hunks = []
-        else:
-            self.hunks = [Hunk(rec) for rec in strings.split('@@ ')]
-        
\ No newline at end of file
@@ -10,10 +10,23 @@ import traceback
 
 from patchtools.lib.functions import Functions as ut
 
+def _restore_error(cls, mod, args):
+    
+    e = Exception.__new__(cls)
+    e.args = args
+    e.mod = mod
+    
+    return e
+
 class PatchToolsError(Exception):
     def __init__(self, mod, msg):
         super(PatchToolsError, self).__init__(msg)
         self.mod = mod
+        
+    def __reduce__(self):
+        # The sub class constructors take differing arguments, so an exception
+        # passed back from a worker process is rebuilt from its state instead.
+        return (_restore_error, (self.__class__, self.mod, self.args))
 
 class PT_NotFoundError(PatchToolsError): # file not found, etc.
     def __init__(self, mod, msg):
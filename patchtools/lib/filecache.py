@@ -0,0 +1,448 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Cache the contents of source files read by the Checker.
+
+Many patches in a large patch set modify the same source files, e.g. board files
+and device tree include files, so the contents are kept in a least recently used
+cache, bounded by the memory held by the cached files' lines and the data derived
+from them. A cached entry is only used while the file's modification time and size
+are unchanged.
+'''
+
+import sys
+import hashlib
+from collections import OrderedDict
+from functools   import partial
+
+from patchtools.lib.ptobject   import PTObject
+from patchtools.lib.exceptions import PT_NotFoundError, PT_ParameterError
+from patchtools.lib.functions  import Functions as ut
+
+# Parameters of the polynomial rolling hash used to locate blocks of lines
+_HASH_BASE = 1000003
+_HASH_MOD  = (1 << 61) - 1
+
+def _sizeof_list(items):
+    ''' Approximate memory size of a list and the objects in it.
+    '''
+    return sys.getsizeof(items) + sum([sys.getsizeof(item) for item in items])
+
+#++
+class SourceFile(object):
+    """ Contents of a source file
+    """
+    #--
+
+    #++
+    def __init__(self, path, lines):
+        """ Constructor
+
+        Args:
+            path  (string): file path
+            lines (list):   file data as a list of strings
+        """
+        #--
+        self.path  = path
+        self.lines = lines
+        self._norms  = None
+        self._index  = None
+        self._hashes = None
+        self._digest = None
+        self._charge = None # called with the size of derived data when it is built
+
+    #++
+    def find(self, text):
+        """ Find the lines that match text, ignoring whitespace differences
+
+        Args:
+            text (string): text to find
+
+        Returns:
+            A list of the 0-based indices of the matching lines
+
+        Notes:
+            On the first call, an index that maps each normalized line to its
+            line indices is built. Later calls are a single lookup.
+        """
+        #--
+
+        if (self._index is None):
+            self._index = {}
+            norms = self.get_norms()
+            for index in range(len(norms)):
+                key = norms[index]
+                if (key in self._index):
+                    self._index[key] += [index]
+                else:
+                    self._index[key] = [index]
+            self._add_size(sys.getsizeof(self._index) +
+                           sum([sys.getsizeof(value) for value in self._index.values()]))
+
+        return list(self._index.get(ut.normalize_string(text, True), []))
+
+    #++
+    def locate(self, texts, expected):
+        """ Find the block of lines that matches texts nearest to an expected position
+
+        Args:
+            texts    (list): normalized lines to find
+            expected (int):  0-based index at which the block is expected to start
+
+        Returns:
+            The 0-based index of the first line of the nearest matching block, or -1
+            if there is none
+
+        Notes:
+            Positions are tested outwards from (expected), trying the later position
+            first at each distance. Each test compares rolling hashes of the lines,
+            and only a matching hash is confirmed by comparing the lines.
+        """
+        #--
+
+        count  = len(texts)
+        length = len(self.lines)
+        if ((count == 0) or (count > length)):
+            return -1
+
+        prefix = self._get_hashes()
+        power  = pow(_HASH_BASE, count, _HASH_MOD)
+        target = 0
+        for text in texts:
+            target = (target * _HASH_BASE + hash(text)) % _HASH_MOD
+
+        norms = self.get_norms()
+        last  = length - count
+        expected = min(max(expected, 0), last)
+        for distance in range(max(expected, last - expected) + 1):
+            if (distance == 0):
+                positions = (expected,)
+            else:
+                positions = (expected + distance, expected - distance)
+            for pos in positions:
+                if ((pos < 0) or (pos > last)):
+                    continue
+                if (((prefix[pos + count] - prefix[pos] * power) % _HASH_MOD) != target):
+                    continue
+                if (norms[pos:pos + count] == texts):
+                    return pos
+                
+        return -1
+
+    #++
+    def locate_hunk(self, ops, texts, expected, fuzz):
+        """ Find the "before" lines (merge and delete lines) of a hunk nearest to an
+            expected position
+
+        Args:
+            ops      (list): edit op of each line, ' ' or '-'
+            texts    (list): normalized text of each line
+            expected (int):  0-based index at which the hunk is expected to start
+            fuzz     (int):  maximum number of leading and trailing merge lines to ignore
+
+        Returns:
+            (index, fuzz): the 0-based index of the hunk's first line and the fuzz level
+            used, or (-1, 0) if the hunk was not found
+
+        Notes:
+            As in GNU patch, successive fuzz levels ignore up to that many leading
+            and trailing merge lines. The index may be < 0 if ignored leading lines
+            would precede the start of the file.
+        """
+        #--
+
+        length = len(ops)
+        lead = trail = 0
+        while ((lead < length) and (ops[lead] == ' ')):
+            lead += 1
+        while ((trail < (length - lead)) and (ops[length - trail - 1] == ' ')):
+            trail += 1
+
+        for level in range(fuzz + 1):
+            head = min(level, lead)
+            tail = min(level, trail)
+            if ((head + tail) >= length):
+                break
+            index = self.locate(texts[head:length - tail], expected + head)
+            if (index != -1):
+                return (index - head, level)
+            if ((head == lead) and (tail == trail)): # nothing more to ignore
+                break
+
+        return (-1, 0)
+
+    #++
+    def get_norms(self):
+        """ Get the normalized lines of the file
+
+        Args:
+            None
+
+        Returns:
+            A list of the lines, normalized by Functions.normalize_strings
+        """
+        #--
+
+        if (self._norms is None):
+            self._norms = ut.normalize_strings(self.lines)
+            self._add_size(_sizeof_list(self._norms))
+
+        return self._norms
+
+    #++
+    def is_normalized(self):
+        """ Determine whether the normalized lines of the file have been computed
+
+        Args:
+            None
+
+        Returns:
+            True if get_norms has been called, else False
+        """
+        #--
+
+        return (self._norms is not None)
+
+    #++
+    def get_digest(self):
+        """ Get a digest of the file's contents
+
+        Args:
+            None
+
+        Returns:
+            The SHA-1 digest of the lines, as a hex string
+
+        Notes:
+            Files with the same contents have the same digest, e.g. a file that
+            is unchanged between two kernel trees.
+        """
+        #--
+
+        if (self._digest is None):
+            self._digest = hashlib.sha1('\n'.join(self.lines).encode('utf-8')).hexdigest()
+            self._add_size(sys.getsizeof(self._digest))
+
+        return self._digest
+
+    def _get_hashes(self):
+        ''' Get prefix hashes of the normalized lines: item i is the rolling hash of
+            lines 0..i-1, so the hash of any block of lines can be computed from two items.
+        '''
+        if (self._hashes is None):
+            value  = 0
+            hashes = [value]
+            for norm in self.get_norms():
+                value = (value * _HASH_BASE + hash(norm)) % _HASH_MOD
+                hashes += [value]
+            self._hashes = hashes
+            self._add_size(_sizeof_list(hashes))
+
+        return self._hashes
+
+    #++
+    def get_size(self):
+        """ Get the approximate memory size of the file's lines and of the data
+            derived from them
+
+        Args:
+            None
+
+        Returns:
+            The size in bytes
+        """
+        #--
+
+        size = _sizeof_list(self.lines)
+        if (self._norms is not None):
+            size += _sizeof_list(self._norms)
+        if (self._index is not None):
+            size += sys.getsizeof(self._index) + sum([sys.getsizeof(value) for value in self._index.values()])
+        if (self._hashes is not None):
+            size += _sizeof_list(self._hashes)
+        if (self._digest is not None):
+            size += sys.getsizeof(self._digest)
+
+        return size
+
+    def _add_size(self, size):
+        ''' Charge the size of newly built derived data to the cache that holds the file.
+        '''
+        if (self._charge is not None):
+            self._charge(self, size)
+
+#++
+class FileCache(PTObject):
+    """ Least recently used cache of source file contents
+    """
+    #--
+
+    #++
+    def __init__(self, params=None):
+        """ Constructor
+
+        Args:
+            params (dict, optional): parameters
+                max_bytes (int, optional): maximum memory held by cached files
+                    default is 64 MB
+
+        Raises:
+            PT_ParameterError
+
+        Notes:
+            A FileCache may be passed to several Checker objects in turn, so that
+            files read in one run are not read again in the next.
+            
+            A cached SourceFile is charged the memory of its lines when it is inserted,
+            and the memory of its normalized lines, find index, hashes and digest when
+            they are built, which may evict other entries.
+        """
+        #--
+
+        self.name = 'FileCache'
+
+        if (params is None):
+            params = {}
+        elif (not isinstance(params, dict)):
+            raise PT_ParameterError(self.name, 'params')
+
+        self.max_bytes = self._check_optional_param(params, 'max_bytes', int, 64 * 1024 * 1024)
+        if (self.max_bytes < 0):
+            raise PT_ParameterError(self.name, 'max_bytes', self.max_bytes)
+
+        self.clear()
+
+    #++
+    def get(self, path):
+        """ Get the contents of a file
+
+        Args:
+            path (string): file path
+
+        Returns:
+            A SourceFile object
+
+        Raises:
+            PT_NotFoundError
+        """
+        #--
+
+        stamp = ut.file_stamp(path)
+        if (stamp is None):
+            raise PT_NotFoundError(self.name, path)
+
+        source = self.lookup(path, stamp)
+        if (source is None):
+            source = SourceFile(path, ut.read_strings(path))
+            self.bytes_read += stamp[1]
+            self.insert(path, stamp, source, source.get_size())
+
+        return source
+
+    #++
+    def lookup(self, key, stamp):
+        """ Look up a cache entry
+
+        Args:
+            key   (string): entry key, e.g. a file path
+            stamp (object): validation stamp, e.g. (mtime, size)
+
+        Returns:
+            The cached object, or None if there is no entry for key, or the
+            entry was stored with a different stamp.
+        """
+        #--
+
+        entry = self._entries.pop(key, None)
+        if ((entry is None) or (entry[0] != stamp)):
+            if (entry is not None):
+                self._size -= entry[2]
+            self.misses += 1
+            return None
+
+        # Re-insert the entry to mark it as most recently used
+        self._entries[key] = entry
+        self.hits += 1
+
+        return entry[1]
+
+    #++
+    def insert(self, key, stamp, value, size):
+        """ Add a cache entry, evicting least recently used entries as needed
+
+        Args:
+            key   (string): entry key
+            stamp (object): validation stamp
+            value (object): object to cache
+            size  (int):    size of the object in bytes
+
+        Notes:
+            If value is a SourceFile, the size of the data it derives from its lines
+            is added to the entry's size as it is built.
+        """
+        #--
+
+        if (key in self._entries):
+            self._size -= self._entries.pop(key)[2]
+
+        if (size > self.max_bytes): # would evict everything else
+            return
+
+        while ((self._size + size) > self.max_bytes):
+            (_, entry) = self._entries.popitem(last=False)
+            self._size -= entry[2]
+
+        self._entries[key] = (stamp, value, size)
+        self._size += size
+        if (isinstance(value, SourceFile)):
+            value._charge = partial(self._grow, key)
+
+    #++
+    def clear(self):
+        """ Remove all entries and reset the statistics
+
+        Args:
+            None
+        """
+        #--
+
+        self._entries = OrderedDict()
+        self._size = 0
+        self.hits = self.misses = self.bytes_read = 0
+
+    def _grow(self, key, value, size):
+        ''' Add size to the entry for key, if it still holds value, and evict other
+            least recently used entries as needed. The entry keeps its place in the order.
+        '''
+        entry = self._entries.get(key)
+        if ((entry is None) or (entry[1] is not value)):
+            return
+
+        if ((entry[2] + size) > self.max_bytes):
+            del self._entries[key]
+            self._size -= entry[2]
+            return
+
+        self._entries[key] = (entry[0], value, entry[2] + size)
+        self._size += size
+        for other in list(self._entries.keys()):
+            if (self._size <= self.max_bytes):
+                break
+            if (other != key):
+                self._size -= self._entries.pop(other)[2]
+
+    def __len__(self):
+
+        return len(self._entries)
+
+    def __getstate__(self):
+        ''' Entries are not copied when the cache is passed to a worker process.
+        '''
+        state = self.__dict__.copy()
+        state['_entries'] = OrderedDict()
+        state['_size'] = 0
+
+        return state
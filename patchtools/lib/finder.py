@@ -9,11 +9,42 @@ See the finder module section of the documentation for further information.
 
 # 2to3 from types import str
 
+import multiprocessing
+
 from patchtools.lib.ptobject   import PTObject
 from patchtools.lib.exceptions import PT_ParameterError
 from patchtools.lib.matcher    import Matcher
+from patchtools.lib.trigramindex import TrigramIndex
 from patchtools.lib.functions  import Functions as ut
 
+# Finder used by the current worker process in parallel mode
+_worker_finder = None
+
+def _init_worker(finder):
+
+    global _worker_finder
+    _worker_finder = finder
+
+def _match_chunk(chunk):
+    ''' Search a chunk of (index, path) items in a worker process. The matches
+        of each file are returned with its index so the caller can restore the
+        original order.
+    '''
+    results = []
+    for (index, path) in chunk:
+        results += [(index,) + _worker_finder._match_file(path)]
+
+    return results
+
+def _get_encoding(data):
+    ''' Get the encoding that read_file would use for a file's data.
+    '''
+    try:
+        data[:].decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'latin_1'
+
 #++
 class Finder(PTObject):
     """ Find references to patterns you specify in a Linux kernel tree,
@@ -42,10 +73,28 @@ class Finder(PTObject):
                 
                 trim_paths (bool, optional): remove root portion of paths from returned paths
                     default is True
+                workers (int, optional): number of worker processes
+                    0 or 1 = search files sequentially
+                    default is 0
+                index (TrigramIndex, optional): trigram index of root_path
+                raw (bool, optional): search the undecoded data of files
+                    default is False
                       
         Raises:
             PT_ParameterError
             PT_NotFoundError
+
+        Notes:
+            If 'workers' is > 1, files are distributed across a pool of worker processes,
+            each with its own copy of the Matcher. The results are the same as those
+            of a sequential search.
+            If 'index' is specified, it is updated and used to skip the files that
+            cannot contain the literal patterns, or a literal required by each regular
+            expression. The results are the same as those of a search without it.
+            If 'raw' is True, the literals are searched for in the undecoded data of
+            each file, and only the lines that contain one are decoded and matched.
+            Line numbers are counted only up to those lines. Files are searched as
+            text if the patterns have no literals, or the file has carriage returns.
         """
         #--
     
@@ -65,6 +114,11 @@ class Finder(PTObject):
         self.file_paths = self._check_required_param(params, 'file_paths', list)
         self.trim_paths = self._check_optional_param(params, 'trim_paths', bool, True)
         self.debug      = self._check_optional_param(params, 'debug', int, 0)
+        self.workers    = self._check_optional_param(params, 'workers', int, 0)
+        self.index      = self._check_optional_param(params, 'index', TrigramIndex, None)
+        self.raw        = self._check_optional_param(params, 'raw', bool, False)
+        if ((self.index is not None) and (self.index.root_path != self.root_path)):
+            raise PT_ParameterError(self.name, 'index')
         
     #++
     def match(self, params):
@@ -89,55 +143,182 @@ class Finder(PTObject):
         
         self.matcher = Matcher(params)
         self.matches = {}
+
+        paths = self.file_paths
+        if (self.index is not None):
+            self.index.update(self.file_paths)
+            candidates = self.index.candidates(self.matcher.get_literals())
+            if (candidates is not None): # may include indexed files outside file_paths
+                paths = [path for path in paths if (path in candidates)]
     
+        if ((self.workers > 1) and (len(paths) > 1)):
+            results = self._match_parallel(paths)
+        else:
+            results = self._match_sequential(paths)
+
+        for (path, found) in results:
+            self._add_matches(path, found)
+
         if (self.mode == 'file'):
-            for path in self.file_paths:
-                self._match_files(path)
             matches = self._list_by_file()
         else:
-            for path in self.file_paths:
-                self._match_pattern(path)
             matches = self._list_by_pattern()
          
         return matches
-    
-    def _match_files(self, path):
-        ''' Search files in self.paths for match to self.matcher.
+
+    def _match_sequential(self, paths):
+        ''' Search files in the current process, yielding the matches of each.
+        '''
+        for path in paths:
+            yield self._match_file(path)
+
+    def _match_parallel(self, paths):
+        ''' Search files in a pool of worker processes, yielding the matches of
+            each in the original order. Results that arrive ahead of their turn are
+            held until the preceding files are done.
+        '''
+        pending = {}
+        current = 0
+        pool = multiprocessing.Pool(self.workers, _init_worker, (self,))
+        try:
+            for chunk in pool.imap_unordered(_match_chunk, self._make_chunks(paths)):
+                for (index, path, found) in chunk:
+                    pending[index] = (path, found)
+                while (current in pending):
+                    yield pending.pop(current)
+                    current += 1
+            pool.close()
+        except:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+
+    def _make_chunks(self, paths):
+        ''' Group files into chunks of similar total size, largest files first, so
+            that a few large files do not hold up the end of the run.
+        '''
+        items = []
+        for index in range(len(paths)):
+            size = ut.file_size(ut.join_path(self.root_path, paths[index]))
+            items += [(size or 0, index, paths[index])]
+        items.sort(key=lambda item: item[0], reverse=True)
+
+        total = sum([size for (size, _, _) in items])
+        limit = max(total // (self.workers * 4), 1)
+
+        chunks = []
+        chunk, cost = [], 0
+        for (size, index, path) in items:
+            chunk += [(index, path)]
+            cost  += size
+            if (cost >= limit):
+                chunks += [chunk]
+                chunk, cost = [], 0
+        if (len(chunk) > 0):
+            chunks += [chunk]
+
+        return chunks
+
+    def _match_file(self, path):
+        ''' Search a file for matches to self.matcher, returning the reported path
+            and a list of (pattern, number, text) items.
         '''
         filepath = ut.join_path(self.root_path, path)
-        strings = ut.read_strings(filepath)
+        found = None
+        if (self.raw):
+            found = self._match_raw(filepath)
+
+        if (found is None):
+            found = self._match_text(filepath)
+
+        if (self.trim_paths):
+            return (path, found)
+        else:
+            return (filepath, found)
+
+    def _match_text(self, filepath):
+        ''' Search the decoded lines of a file, returning a list of (pattern, number, text)
+            items.
+        '''
+        data  = ut.read_file(filepath)
+        found = []
+
+        # Most files in a tree contain none of the patterns, and are rejected by a
+        # single search of their data, without splitting it into lines
+        if (self.matcher.could_match(data)):
+            strings = data.rstrip('\n').split('\n')
+        else:
+            strings = []
+
         for index in range(len(strings)):
             text = strings[index]
             if (self.debug > 1):
                 print('   "%s"' % text)
             pattern = self.matcher(text)
             if (pattern is not None):
-                if (self.trim_paths):
-                    path_ = path
-                else:
-                    path_ = filepath
-                if (path_ not in self.matches):
-                    self.matches[path_] = []
-                self.matches[path_] += [(pattern, index + 1, text.lstrip())]
-    
-    def _match_patterns(self, path):
-        ''' Search files in self.paths for match to self.matcher. 
+                found += [(pattern, index + 1, text.lstrip())]
+
+        return found
+
+    def _match_raw(self, filepath):
+        ''' Search the undecoded data of a file for the matcher's literals, decoding
+            and matching only the lines that contain one. Return a list of (pattern,
+            number, text) items, or None if the file must be searched as text.
         '''
-        filepath = ut.join_path(self.root_path, path)
-        strings = ut.read_strings(filepath)
-        for index in range(len(strings)):
-            text = strings[index]
+        regex = self.matcher.get_bytes_regex()
+        if (regex is None):
+            return None
+
+        data  = ut.read_bytes(filepath)
+        match = regex.search(data)
+        if (match is None):
+            return []
+
+        if (data.find(b'\r') != -1): # text mode also ends lines at carriage returns
+            return None
+
+        found    = []
+        number   = 1 # number of the line that starts at (counted)
+        counted  = 0
+        encoding = None # of the whole file, found if a line is not ASCII
+        while (match is not None):
+            begin = data.rfind(b'\n', 0, match.start()) + 1
+            end   = data.find(b'\n', match.start())
+            if (end == -1):
+                end = len(data)
+            number += data[counted:begin].count(b'\n')
+            counted = begin
+
+            line = data[begin:end]
+            try:
+                text = line.decode('ascii')
+            except UnicodeDecodeError:
+                if (encoding is None):
+                    encoding = _get_encoding(data)
+                text = line.decode(encoding)
             if (self.debug > 1):
                 print('   "%s"' % text)
             pattern = self.matcher(text)
             if (pattern is not None):
-                if (self.trim_paths):
-                    path_ = path
-                else:
-                    path_ = filepath
+                found += [(pattern, number, text.lstrip())]
+
+            match = regex.search(data, end + 1)
+
+        return found
+
+    def _add_matches(self, path, found):
+        ''' Add the matches of a file to self.matches, by file or by pattern.
+        '''
+        for (pattern, number, text) in found:
+            if (self.mode == 'file'):
+                if (path not in self.matches):
+                    self.matches[path] = []
+                self.matches[path] += [(pattern, number, text)]
+            else:
                 if (pattern not in self.matches):
                     self.matches[pattern] = []
-                self.matches[pattern] += [(path_, index + 1, text.lstrip())]
+                self.matches[pattern] += [(path, number, text)]
                         
     def _list_by_file(self):
         ''' List matches by file. self.matches is a dict:
@@ -209,11 +390,11 @@ class Finder(PTObject):
                 self.matches[pattern] = [(path, number, text),...]
         '''
         if (self.options == 'compact'):
-            strings = self._pattern_compact()
+            strings = self._list_pattern_compact()
         elif (self.options == 'terse'):
-            strings = self._pattern_terse()
+            strings = self._list_pattern_terse()
         else: # (self.options == 'full')
-            strings = self._pattern_full()
+            strings = self._list_pattern_full()
         
         return strings
 
@@ -252,4 +433,3 @@ class Finder(PTObject):
                 strings += [': '.join([pattern, path])]
                 
         return strings
-        
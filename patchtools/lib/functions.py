@@ -11,13 +11,99 @@ to handle exceptions.
 This is the only module in PatchTools that has knowledge of the host operating system.
 """
 
-import os, sys, io
+import os, sys, io, re, mmap, codecs, hashlib, gzip, bz2
 from platform import system
+try:
+    import lzma # Python 3.3 and later
+except ImportError:
+    lzma = None
 # 2to3 from types    import StringTypes
             
 _is_windows = ("Windows" in system())
 _is_python3 = (sys.version_info[0] >= 3) # 2to3
 
+# Runs of 2 or more spaces
+_SPACES = re.compile(' {2,}')
+
+# Compressed files are decompressed as they are read
+_DECOMPRESSORS = { '.gz' : gzip.GzipFile, '.bz2' : bz2.BZ2File }
+if (lzma is not None):
+    _DECOMPRESSORS['.xz'] = lzma.LZMAFile
+
+# Files of this size or more are mapped by read_bytes, rather than read
+_MMAP_SIZE = 1024 * 1024
+
+class _RawReader(io.RawIOBase):
+    ''' Adapt a Python 2 decompressor, which is not an io module stream, so that
+        it can be buffered and decoded by the io module.
+    '''
+    def __init__(self, inpt):
+        
+        self._inpt = inpt
+    
+    def readable(self):
+        
+        return True
+    
+    def readinto(self, buf):
+        
+        data = self._inpt.read(len(buf))
+        buf[:len(data)] = data
+        return len(data)
+    
+    def close(self):
+        
+        self._inpt.close()
+        io.RawIOBase.close(self)
+
+def _is_compressed(path):
+    
+    return path.endswith(('.gz', '.bz2', '.xz'))
+
+def _open_compressed(path):
+    ''' Open a compressed file for reading its decompressed bytes.
+    '''
+    ext = os.path.splitext(path)[1]
+    if (ext not in _DECOMPRESSORS): # .xz in Python 2
+        raise IOError('reading %s files requires the lzma module: %s' % (ext, path))
+    
+    inpt = _DECOMPRESSORS[ext](path, 'rb')
+    if (not _is_python3):
+        inpt = io.BufferedReader(_RawReader(inpt), 1 << 16)
+    
+    return inpt
+
+def _get_encoding(path):
+    ''' Get the encoding that read_file uses for a file: utf-8 if all its data is
+        legal utf-8, else Latin-1. The data is checked a block at a time.
+    '''
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    if (_is_compressed(path)):
+        inpt = _open_compressed(path)
+    else:
+        inpt = io.open(path, 'rb')
+    try:
+        block = inpt.read(1 << 18)
+        while (len(block) > 0):
+            decoder.decode(block)
+            block = inpt.read(1 << 18)
+        decoder.decode(b'', True)
+    except UnicodeDecodeError:
+        return 'latin_1'
+    finally:
+        inpt.close()
+    
+    return 'utf-8'
+
+def _open_text(path, encoding):
+    ''' Open a file for reading text with universal newlines, decompressing it
+        if its name ends in '.gz', '.bz2' or '.xz'.
+    '''
+    if (_is_compressed(path)):
+        return io.TextIOWrapper(_open_compressed(path), encoding=encoding, errors='strict')
+    else:
+        return io.open(path, "r", encoding=encoding, errors='strict')
+
 '''
 Text extracted from patches and source files may contain characters
 with ordinal codes > 127 (unicode values > U+00FF).
@@ -112,6 +198,51 @@ class Functions(object):
             return True
         '''
 
+    #++
+    @staticmethod
+    def file_stamp(path):
+        """ Determine modification time and size of the file at (path)
+
+        Args:
+            path (string): file path
+
+        Returns:
+            stamp (tuple): (mtime, size), or None if the file does not exist
+        """
+        #--
+        try:
+            st = os.stat(path)
+            return (st.st_mtime, st.st_size)
+        except OSError:
+            return None
+
+    #++
+    @staticmethod
+    def file_hash(path):
+        """ Compute a hash of the contents of the file at (path)
+
+        Args:
+            path (string): file path
+
+        Returns:
+            The SHA-1 digest of the file data, as a hex string
+        """
+        #--
+        if _is_windows:
+            path = path.replace('/','\\')
+
+        digest = hashlib.sha1()
+        inpt = io.open(path, "rb")
+        try:
+            block = inpt.read(1 << 20)
+            while (len(block) > 0):
+                digest.update(block)
+                block = inpt.read(1 << 20)
+        finally:
+            inpt.close()
+
+        return digest.hexdigest()
+
     #++
     @staticmethod
     def is_dir(path):
@@ -195,11 +326,21 @@ class Functions(object):
         Notes:
             Kernel and distro files may contain Latin-1 characters whose numeric
             values are not legal start bytes of utf-8 characters.
+            
+            Files whose names end in '.gz', '.bz2' or '.xz' are decompressed as they
+            are read.
         """
         #--
         if _is_windows:
             path = path.replace('/','\\')
         
+        if (_is_compressed(path)): # decoding all the data at once is fastest
+            inpt = _open_compressed(path)
+            try:
+                return Functions.decode_data(inpt.read())
+            finally:
+                inpt.close()
+        
         inpt = io.open(path, "r", encoding='utf-8', errors='strict')
         try:      
             data = inpt.read()
@@ -216,6 +357,61 @@ class Functions(object):
       
         return data
 
+    #++
+    @staticmethod
+    def decode_data(data):
+        """ Decode file data that was not read from a file in text mode, e.g. a git blob
+        
+        Args:
+            data (bytes): file data
+        
+        Returns:
+            The data decoded as by read_file: as utf-8 if it is legal utf-8, else as
+            Latin-1, with '\\r\\n' and '\\r' line ends replaced by '\\n'.
+        """
+        #--
+        try:
+            data = data.decode('utf-8')
+        except UnicodeDecodeError:
+            data = data.decode('latin_1')
+        if ('\r' in data): # universal newlines, as in text mode
+            data = data.replace('\r\n', '\n').replace('\r', '\n')
+        
+        return data
+
+    #++
+    @staticmethod
+    def read_bytes(path):
+        """ Read file data without decoding it.
+
+        Args:
+            path (string): file path
+
+        Returns:
+            File data as bytes, or as a read-only mmap object for a large file.
+            Both may be searched by regular expressions, find and rfind, and sliced.
+
+        Notes:
+            A large file is mapped, so that only the pages that are searched are read.
+
+            Files whose names end in '.gz', '.bz2' or '.xz' are decompressed as they
+            are read.
+        """
+        #--
+        if _is_windows:
+            path = path.replace('/','\\')
+
+        if (_is_compressed(path)):
+            inpt = _open_compressed(path)
+        else:
+            inpt = io.open(path, 'rb')
+        try:
+            if ((not _is_compressed(path)) and (os.fstat(inpt.fileno()).st_size >= _MMAP_SIZE)):
+                return mmap.mmap(inpt.fileno(), 0, access=mmap.ACCESS_READ)
+            return inpt.read()
+        finally:
+            inpt.close()
+
     #++
     @staticmethod
     def read_lines(path):
@@ -230,6 +426,59 @@ class Functions(object):
         #--
         return [(s + '\n') for s in Functions.read_strings(path)]
 
+    #++
+    @staticmethod
+    def iter_strings(path):
+        """ Read file strings one at a time, without reading the whole file
+        
+        Args:
+            path (string): file path
+        
+        Returns:
+            A generator of the same strings as read_strings: empty strings at the end
+            of the file are dropped, and an empty file has one empty string.
+            
+        Notes:
+            Files are decoded as by read_file: as utf-8 if all the data is legal utf-8,
+            else as Latin-1. Since that is not known until the end of the file, the
+            file is first read as bytes, a block at a time, to check it.
+        """
+        #--
+        if _is_windows:
+            path = path.replace('/','\\')
+        
+        inpt = _open_text(path, _get_encoding(path))
+        try:
+            count = 0  # strings generated
+            empty = 0  # empty strings not yet generated, since they may end the file
+            rest  = '' # start of a string that continues in the next block
+            block = inpt.read(1 << 18)
+            while (len(block) > 0):
+                strings = (rest + block).split('\n')
+                rest = strings.pop()
+                last = len(strings)
+                while ((last > 0) and (len(strings[last - 1]) == 0)):
+                    last -= 1
+                if (last > 0):
+                    for _ in range(empty):
+                        yield ''
+                    count += empty + last
+                    empty = len(strings) - last
+                    del strings[last:]
+                    for string in strings:
+                        yield string
+                else:
+                    empty += len(strings)
+                block = inpt.read(1 << 18)
+            if (len(rest) > 0):
+                for _ in range(empty):
+                    yield ''
+                yield rest
+            elif (count == 0): # empty, or only newlines
+                yield ''
+        finally:
+            inpt.close()
+
     #++
     @staticmethod
     def read_strings(path):
@@ -364,15 +613,40 @@ class Functions(object):
             strip  (bool):   True = strip the string first
         """
         #--
-    
+        
         if (strip):
-            string = string.strip()
-            string = string.replace('\t', ' ')
-        while ('  ' in string):
-            string = string.replace('  ', ' ')
+            string = string.strip().replace('\t', ' ')
+        if ('  ' in string):
+            if ('    ' in string): # long runs, e.g. indentation
+                string = _SPACES.sub(' ', string)
+            else: # runs of 2 or 3 spaces
+                string = string.replace('  ', ' ').replace('  ', ' ')
         
         return string
 
+    #++
+    @staticmethod   
+    def normalize_strings(strings):
+        """ Normalize a list of strings, e.g. the lines of a file
+        
+        Args:
+            strings (list): input strings
+        
+        Returns:
+            A list of the strings, normalized as by normalize_string with strip=True
+        
+        Notes:
+            Callers that compare many strings against the lines of a file should
+            normalize the lines once, and keep the result alongside the raw lines.
+            Each string is normalized separately: stripping the lines of a joined
+            text with an expression is several times slower than str.strip.
+        """
+        #--
+        
+        normalize = Functions.normalize_string
+        
+        return [normalize(string, True) for string in strings]
+
     #++
     @staticmethod
     def string_to_words(string):
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Read source files from a git repository at a given revision, without
+checking the revision out.
+
+File contents are read by one long lived "git cat-file --batch" process, so
+that a run that reads thousands of files starts only one process. The list
+of files in the revision's tree is read once by "git ls-tree", and is used
+to test whether files exist. Both the list and the file contents are kept
+in a FileCache, keyed by git object id. Since objects never change, the
+cached entries never become stale.
+'''
+
+import subprocess
+
+from patchtools.lib.filecache  import FileCache, SourceFile
+from patchtools.lib.ptobject   import PTObject
+from patchtools.lib.exceptions import PT_NotFoundError, PT_OperationalError, PT_ParameterError
+from patchtools.lib.functions  import Functions as ut
+
+#++
+class GitTree(PTObject):
+    """ Source tree of a git revision
+    """
+    #--
+
+    #++
+    def __init__(self, params):
+        """ Constructor
+
+        Args:
+            params (dict): parameters
+                repodir  (string, required):    path to git repository or work tree
+                revision (string, required):    commit, tag or branch name
+                cache    (FileCache, optional): cache of file contents and tree lists
+
+        Raises:
+            PT_ParameterError
+            PT_NotFoundError if the revision does not exist
+        """
+        #--
+
+        self.name = 'GitTree'
+
+        if ((params is None) or (not isinstance(params, dict))):
+            raise PT_ParameterError(self.name, 'params')
+
+        self.repodir = self._check_required_string_param(params, 'repodir')
+        self._check_path_param('repodir', self.repodir)
+
+        self.revision = self._check_required_string_param(params, 'revision')
+
+        self.cache = self._check_optional_param(params, 'cache', FileCache, None)
+        if (self.cache is None):
+            self.cache = FileCache()
+
+        (code, output) = self._run(['rev-parse', '--verify', '-q', self.revision + '^{tree}'])
+        if (code != 0):
+            raise PT_NotFoundError(self.name, self.revision)
+
+        self.tree_id = output.decode('ascii').strip()
+        self._proc  = None
+        self._paths = None
+
+    #++
+    def is_file(self, filename):
+        """ Determine whether a file exists in the tree
+
+        Args:
+            filename (string): path of the file relative to the repository root
+
+        Returns:
+            True if the file exists, else False
+        """
+        #--
+
+        return (filename in self._get_paths())
+
+    #++
+    def get(self, filename):
+        """ Get the contents of a file in the tree
+
+        Args:
+            filename (string): path of the file relative to the repository root
+
+        Returns:
+            A SourceFile object
+
+        Raises:
+            PT_NotFoundError
+            PT_OperationalError if the git process fails
+        """
+        #--
+
+        blob = self._get_paths().get(filename)
+        if (blob is None):
+            raise PT_NotFoundError(self.name, filename)
+
+        source = self.cache.lookup(blob, blob)
+        if (source is None):
+            data = self._read_blob(blob)
+            text = ut.decode_data(data) # the same lines as read from the working tree
+            source = SourceFile(ut.join_path(self.repodir, filename), text.rstrip('\n').split('\n'))
+            self.cache.bytes_read += len(data)
+            self.cache.insert(blob, blob, source, source.get_size())
+
+        return source
+
+    #++
+    def close(self):
+        """ Stop the "git cat-file" process, if it is running
+
+        Args:
+            None
+        """
+        #--
+
+        if (self._proc is not None):
+            try:
+                self._proc.stdin.close()
+                self._proc.wait()
+            finally:
+                self._proc.stdout.close()
+                self._proc = None
+
+    def __del__(self):
+
+        if ('_proc' in self.__dict__): # else the constructor failed
+            self.close()
+
+    def __getstate__(self):
+        ''' The process is not copied when the tree is passed to a worker process.
+            The worker starts its own when it first reads a file.
+        '''
+        state = self.__dict__.copy()
+        state['_proc'] = None
+
+        return state
+
+    def _get_paths(self):
+        ''' Get the map of file paths to blob ids in the tree.
+        '''
+        if (self._paths is None):
+            key = 'ls-tree:' + self.tree_id
+            self._paths = self.cache.lookup(key, self.tree_id)
+            if (self._paths is None):
+                (code, output) = self._run(['ls-tree', '-r', '-z', self.tree_id])
+                if (code != 0):
+                    raise PT_OperationalError(self.name, 'git ls-tree %s failed' % self.tree_id)
+                paths = {}
+                for entry in output.split(b'\0'):
+                    if (len(entry) == 0):
+                        continue
+                    # entry is '<mode> <type> <object id>\t<path>'
+                    (info, path) = entry.split(b'\t', 1)
+                    (_, kind, blob) = info.split(b' ')
+                    if (kind == b'blob'):
+                        paths[self._decode_path(path)] = blob.decode('ascii')
+                self._paths = paths
+                self.cache.insert(key, self.tree_id, paths, len(output))
+
+        return self._paths
+
+    def _read_blob(self, blob):
+        ''' Read a blob from the "git cat-file --batch" process, starting it if needed.
+            The process answers each object id with a '<id> blob <size>' line, followed
+            by the data and a newline.
+        '''
+        if (self._proc is None):
+            self._proc = subprocess.Popen(['git', 'cat-file', '--batch'], cwd=self.repodir,
+                                          bufsize=-1, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        try:
+            self._proc.stdin.write((blob + '\n').encode('ascii'))
+            self._proc.stdin.flush()
+            header = self._proc.stdout.readline().split()
+            if ((len(header) != 3) or (header[1] != b'blob')):
+                raise PT_NotFoundError(self.name, blob)
+            size = int(header[2])
+            data = self._proc.stdout.read(size)
+            self._proc.stdout.read(1)
+        except (IOError, OSError, ValueError):
+            self.close()
+            raise PT_OperationalError(self.name, 'git cat-file failed reading %s' % blob)
+
+        if (len(data) != size):
+            self.close()
+            raise PT_OperationalError(self.name, 'git cat-file failed reading %s' % blob)
+
+        return data
+
+    def _run(self, args):
+        ''' Run a git command in the repository, returning (return code, output bytes).
+        '''
+        proc = subprocess.Popen(['git'] + args, cwd=self.repodir,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        (output, _) = proc.communicate()
+
+        return (proc.returncode, output)
+
+    def _decode_path(self, path):
+
+        try:
+            return path.decode('utf-8')
+        except UnicodeDecodeError:
+            return path.decode('latin_1')
@@ -15,6 +15,9 @@ from patchtools.lib.walker     import Walker
 from patchtools.lib.watcher    import Watcher
 from patchtools.lib.patchset   import PatchSet
 from patchtools.lib.command    import Command
+from patchtools.lib.filecache  import FileCache
+from patchtools.lib.trigramindex import TrigramIndex
+from patchtools.lib.results    import JsonSink, TextSink
 from patchtools.lib.exceptions import PatchToolsError
 from patchtools.lib.functions  import Functions as ut
 from patchtools.lib.jsonconfig import JSONConfig
@@ -52,6 +55,12 @@ class Helper(object):
             'patchset'  : self.config['patchset'],
             'tempdir'   : self.config['tempdir'],
             }
+        
+        # Source files read by one check request are kept for the next one
+        self.file_cache = FileCache()
+
+        # Trigram indexes of the trees searched by find requests, by root path
+        self.trigram_indexes = {}
 
     '''
     Wrappers for tools modules.
@@ -92,8 +101,19 @@ class Helper(object):
         Args:
              patterns (dict) Matcher parameters
              params   (dict) Finder parameters 
+
+        Notes:
+            If the configuration specifies an 'indexdir', a trigram index of each
+            searched tree is kept there, and in memory for later requests.
         """
         #--
+        if (('index' not in params) and self.config.has('indexdir') and ('root_path' in params)):
+            root_path = params['root_path']
+            if (root_path not in self.trigram_indexes):
+                self.trigram_indexes[root_path] = TrigramIndex({ 'root_path' : root_path,
+                                                                 'indexdir'  : self.config['indexdir'] })
+            params = self.extend(params, { 'index' : self.trigram_indexes[root_path] })
+
         return Finder(params).match(patterns)
 
     #++
@@ -107,9 +127,103 @@ class Helper(object):
         #--
         if (params is None):
             params = self.config['defaults']
+        
+        if ('cache' not in params):
+            params = self.extend(params, { 'cache' : self.file_cache })
             
         return Checker(params).match(patches)
     
+    #++
+    def check_json(self, patches, filepath, params=None):
+        """ Handle Checker request, writing result records to a JSON Lines file
+
+        Args:
+            patches  (string/list, required) patch file(s)
+            filepath (string, required) output file path
+            params   (dict, optional) Checker parameters
+            
+        Returns:
+            The number of records written
+        """
+        #--
+        if (params is None):
+            params = self.config['defaults']
+        
+        if ('cache' not in params):
+            params = self.extend(params, { 'cache' : self.file_cache })
+            
+        return JsonSink().write(Checker(params).results(patches), filepath)
+    
+    #++
+    def check_profile(self, patches, params=None):
+        """ Handle Checker request, collecting a profile of the run
+
+        Args:
+            patches (string/list, required) patch file(s)
+            params  (dict, optional) Checker parameters
+            
+        Returns:
+            (msgs, profile), where msgs is the list of Checker messages and
+            profile is a dict (see Checker.get_profile)
+        """
+        #--
+        if (params is None):
+            params = self.config['defaults']
+        
+        params = self.extend(params, { 'profile' : True })
+        if ('cache' not in params):
+            params = self.extend(params, { 'cache' : self.file_cache })
+        
+        checker = Checker(params)
+        msgs = checker.match(patches)
+        
+        return (msgs, checker.get_profile())
+    
+    #++
+    def bisect(self, patches=None, params=None):
+        """ Handle Checker bisect request
+
+        Args:
+            patches (list, optional) patch files in series order
+                default is all patches in the patch set, in patchset order
+            params  (dict, optional) Checker parameters
+            
+        Returns:
+            A dict describing the first patch whose hunks fail (see Checker.bisect)
+        """
+        #--
+        if (params is None):
+            params = self.config['defaults']
+        
+        if (patches is None):
+            patches = PatchSet(params).get_patch_names()
+        
+        if ('cache' not in params):
+            params = self.extend(params, { 'cache' : self.file_cache })
+            
+        return Checker(params).bisect(patches)
+    
+    #++
+    def matrix(self, patches, trees, params=None):
+        """ Handle Checker matrix request
+
+        Args:
+            patches (list, required) patch files
+            trees   (list, required) source directories, or dicts of tree parameters
+            params  (dict, optional) Checker parameters
+            
+        Returns:
+            The matrix, formatted as a list of strings
+        """
+        #--
+        if (params is None):
+            params = self.config['defaults']
+        
+        if ('cache' not in params):
+            params = self.extend(params, { 'cache' : self.file_cache })
+            
+        return TextSink().format_matrix(Checker(params).matrix(patches, trees))
+    
     #++
     def walk(self, params):
         """ Handle Walker request
@@ -10,27 +10,162 @@ Parse a patch hunk section.
 from patchtools.lib.ptobject  import PTObject
 from patchtools.lib.functions import Functions as ut
 
+# Character codes of the edit ops
+_OPS = frozenset([ord(op) for op in ' +-\\'])
+_MERGE, _DELETE = ord(' '), ord('-')
+
 #++
 class Hunk(PTObject):
     """ Extract information from a hunk section of a patch file
     """
     #--
+    
+    __slots__ = ('spec', 'note', 'old_start', 'old_count', 'new_start', 'new_count',
+                 '_buffer', '_start', '_end', '_ops')
 
     #++
-    def __init__(self, strings):
+    def __init__(self, strings, begin=0, end=None, buffer=None, offsets=None):
         """ Constructor
         
         Args:
-            strings (Strings): hunk section from a patch file or archive file
+            strings (list): lines of a patch file or archive file
+            begin   (int, optional): index of the hunk line
+                default is 0
+            end     (int, optional): index after the last line of the hunk section
+                default is len(strings)
+            buffer  (string, optional): text that the lines were split from, by '\\n'
+            offsets (array, optional): offset in buffer of each line
+                required if buffer is specified
+                
+        Notes:
+            The edit lines are not kept as strings, but as the offsets of their text in
+            buffer, which is shared by all the hunks of a patch. If buffer is not specified,
+            the hunk keeps a buffer of its own.
         """
         #--
         
+        if (end is None):
+            end = len(strings)
+        
         # On rare occasions, a hunk may be followed by an empty line before the next diff
-        while (len(strings[-1]) == 0):
-            strings.pop(-1)
-            
-        self._parse_hunk_line(strings[0])
-        self.edits = strings[1:]
+        while ((end > begin + 1) and (len(strings[end - 1]) == 0)):
+            end -= 1
+        
+        if (buffer is None):
+            buffer = '\n'.join(strings[begin:end])
+            self._set_section(buffer, 0, len(buffer))
+        else:
+            self._set_section(buffer, offsets[begin], offsets[end - 1] + len(strings[end - 1]))
+    
+    #++
+    @staticmethod
+    def from_buffer(buffer, start, end):
+        """ Make a hunk from its section of a patch file's text
+        
+        Args:
+            buffer (string): text of a patch file
+            start  (int): offset of the hunk line
+            end    (int): offset of the end of the last edit line
+        
+        Returns:
+            A Hunk object
+        """
+        #--
+        
+        hunk = Hunk.__new__(Hunk)
+        hunk._set_section(buffer, start, end)
+        
+        return hunk
+    
+    #++
+    @property
+    def edits(self):
+        """ The edit lines of the hunk, with their '+', '-' or ' ' ops
+        
+        Returns:
+            A list of strings
+        
+        Notes:
+            The lines are split from the buffer on each access, so callers that use
+            them more than once should keep the list.
+        """
+        #--
+        
+        if (self._start == self._end):
+            return []
+        
+        return self._buffer[self._start:self._end].split('\n')
+    
+    #++
+    @property
+    def ops(self):
+        """ The ops of the edit lines, found when first used
+        
+        Returns:
+            A bytearray of the character code of each edit line's op: '+', '-', ' ' or
+            '\\', or 0 if the line has none, e.g. an empty merge line whose leading space
+            was stripped
+        """
+        #--
+        
+        if (self._ops is None):
+            self._ops = bytearray([self._get_op(edit) for edit in self.edits])
+        
+        return self._ops
+    
+    #++
+    def get_before(self):
+        """ Get the hunk's "before" lines, i.e. its merge and delete lines
+        
+        Returns:
+            A tuple (ops, texts) of lists, of the op (' ' or '-') and the text without
+            its op of each before line
+        
+        Notes:
+            Lines without an op are merge lines, and '\\ No newline at end of file'
+            markers are skipped.
+        """
+        #--
+        
+        ops, texts = [], []
+        for (code, edit) in zip(self.ops, self.edits):
+            if (code == _DELETE):
+                ops   += ['-']
+                texts += [edit[1:]]
+            elif ((code == _MERGE) or (code == 0)):
+                ops   += [' ']
+                texts += [edit[1:]]
+        
+        return (ops, texts)
+    
+    def __getstate__(self):
+        
+        return tuple([getattr(self, field) for field in self.__slots__])
+    
+    def __setstate__(self, state):
+        
+        for (field, value) in zip(self.__slots__, state):
+            setattr(self, field, value)
+    
+    def _set_section(self, buffer, start, end):
+        ''' Parse the hunk line at start, and keep the offsets of the edit lines that
+            follow it. The last edit line is never empty, so a hunk has no edit lines
+            if the offsets are equal.
+        '''
+        newline = buffer.find('\n', start, end)
+        if (newline == -1): # no edit lines
+            newline = end
+        
+        self._parse_hunk_line(buffer[start:newline])
+        self._buffer, self._start, self._end = buffer, min(newline + 1, end), end
+        self._ops = None
+    
+    def _get_op(self, string):
+        
+        if ((len(string) > 0) and (ord(string[0]) in _OPS)):
+            return ord(string[0])
+        else:
+            return 0
     
     def _parse_hunk_line(self, string):
         ''' Parse hunk line like '@@ -428,7 +428,7 @@ DEFINE_...'. The text after
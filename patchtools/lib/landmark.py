@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Classify "landmark" strings for the Checker.
+
+A landmark is a line that is likely to be unique in its file, so that finding
+it is likely to locate a source fragment that has moved. The rules depend on
+the file type. They are compiled once into sets and regular expressions, and
+each result is remembered, since the same lines, e.g. 'static int ...' and '};',
+recur many times across a patch series.
+'''
+
+import re
+from collections import OrderedDict
+
+from patchtools.lib.ptobject import PTObject
+
+# Words are split into "syllables" on '_' and '-' before they are classified
+_SYLLABLE_SPLITTER = re.compile(r'[_\-]')
+
+_C_H_NON_LANDMARKS  = frozenset(('/*', '*/', '}', ')', ');', 'bool'))
+_C_H_KEYWORDS       = frozenset(('#ifdef', '#ifndef', '#include', 'void', 'const', 'static',
+                                 'extern', 'struct', 'union'))
+_C_H_MACRO_PREFIX   = re.compile(r'MACHINE_|MODULE_|module_|DEFINE_|DECLARE_')
+_C_H_CALL           = re.compile(r'[()]|->')
+
+_S_KEYWORDS         = frozenset(('#ifdef', '#ifndef', '#include', '#if',
+                                 '.section', '.size', '.align'))
+
+_DTS_NON_LANDMARKS  = frozenset(('};', '>;', '/*', '*/'))
+_DTS_COMMON         = re.compile('|'.join([re.escape(s) for s in (
+                          'status =', '#address-cells = <1>;', 'interrupt-parent = <&intc>;',
+                          '#size-cells = <0>;', 'pinctrl-names = "default";')]))
+
+_KCONFIG_KEYWORDS   = frozenset(('config', 'select', 'depends', 'source', 'menu', 'choice'))
+
+# Classifier method for each file type
+_RULES = {
+    'c_h'      : '_is_c_h_landmark',
+    'S'        : '_is_S_landmark',
+    'dts'      : '_is_dts_landmark',
+    'Kconfig'  : '_is_Kconfig_landmark',
+    'Makefile' : '_is_Makefile_landmark',
+    'generic'  : '_is_generic_landmark',
+    }
+
+# Number of results, and of file types, remembered. The least recently used are
+# forgotten first.
+_MEMO_LIMIT  = 1 << 16
+_TYPES_LIMIT = 1 << 12
+
+#++
+class Landmarks(PTObject):
+    """ Classify strings as landmarks, by file type
+    """
+    #--
+
+    #++
+    def __init__(self):
+        """ Constructor
+
+        Args:
+            None
+        """
+        #--
+
+        self.name = 'Landmarks'
+        self._types = OrderedDict()
+        self._memo  = OrderedDict()
+
+    #++
+    def is_landmark(self, filepath, string):
+        """ Determine if a string is a "landmark" string, i.e. one that is likely to be unique
+            in the file, and thus may be easy to isolate if it is present
+
+        Args:
+            filepath (string): path of the file that contains the string
+            string   (string): text of a source or patch line
+
+        Returns:
+            True if the string is a landmark, else False
+
+        Notes:
+            Searching for strings such as '};' could give a large number of extraneous
+            matches. Results are remembered by file type and string, up to a fixed
+            number of entries.
+        """
+        #--
+
+        ftype = _lookup(self._types, filepath, _TYPES_LIMIT, self.get_file_type, filepath)
+
+        return _lookup(self._memo, (ftype, string), _MEMO_LIMIT, self._classify, ftype, string)
+
+    #++
+    @staticmethod
+    def get_file_type(filepath):
+        """ Determine the landmark rules that apply to a file
+
+        Args:
+            filepath (string): file path
+
+        Returns:
+            'c_h', 'S', 'dts', 'Kconfig', 'Makefile' or 'generic'
+        """
+        #--
+
+        filename = filepath[filepath.rfind('/') + 1:]
+
+        if (filename.endswith('.c') or filename.endswith('.h')):
+            return 'c_h'
+        elif (filename.endswith('.S') or filename.endswith('.inc')):
+            return 'S'
+        elif (filename.endswith('.dts') or filename.endswith('.dtsi')):
+            return 'dts'
+        elif (filename.startswith('Kconfig')):
+            return 'Kconfig'
+        elif (filename.startswith('Makefile')):
+            return 'Makefile'
+        else:
+            return 'generic'
+
+    def _classify(self, ftype, string):
+
+        if ((len(string) == 0) or string.isspace()):
+            return False
+
+        # Split into words as Functions.string_to_words does, then into syllables
+        words = []
+        for word in string.strip(' \t\n\f').split(' '):
+            word = word.strip(' \t')
+            if (len(word) > 0):
+                words += _SYLLABLE_SPLITTER.split(word)
+
+        if (len(words) > 4):
+            return True
+
+        return getattr(self, _RULES[ftype])(string, words)
+
+    def _is_c_h_landmark(self, string, words):
+        """ Determine if a string is a "landmark" string in a .c or .h file.
+        """
+
+        #if (self._is_c_h_S_comment(string)):
+        #    return False
+
+        word0 = words[0]
+
+        if ((len(words) == 1) and (word0 in _C_H_NON_LANDMARKS)):
+            return False
+
+        if (word0 in _C_H_KEYWORDS):
+            return True
+
+        if (_C_H_MACRO_PREFIX.match(word0) is not None):
+            return True
+
+        for word in words:
+            if (_C_H_CALL.search(word) is not None): # argument list or pointer dereference
+                return True
+
+        return False
+
+    def _is_S_landmark(self, string, words):
+        """ Determine if a string is a "landmark" string in a .S (assembler) file.
+        """
+
+        #if (self._is_c_h_S_comment(string)):
+        #    return False
+
+        word0 = words[0]
+
+        return ((word0 in _S_KEYWORDS) or word0.endswith(':')) # directive or label
+
+    def _is_dts_landmark(self, string, words):
+        """ Determine if a string is a "landmark" string in a .dts or .dtsi file.
+            Any line that is not blank, '};' or a common property is significant.
+        """
+
+        if (words[0] in _DTS_NON_LANDMARKS):
+            return False
+
+        return (_DTS_COMMON.search(string) is None)
+
+    def _is_Kconfig_landmark(self, string, words):
+        """ Determine if a string is a "landmark" string in a Kconfig file.
+        """
+
+        #if (self._is_makefile_comment(string)):
+        #    return False
+
+        return (words[0] in _KCONFIG_KEYWORDS)
+
+    def _is_Makefile_landmark(self, string, words):
+        """ Determine if a string is a "landmark" string in a Makefile.
+        """
+
+        if (string.startswith('# -')):
+            return False
+
+        if ('CONFIG_' in string):
+            return True
+
+        for word in words:
+            if (word.endswith(':')): # make target
+                return True
+
+        return False
+
+    def _is_generic_landmark(self, string, words):
+
+        # Any string that has a word with > 12 chars may be unique
+        for word in words:
+            if (len(word) > 12):
+                return True
+
+        return False
+
+    def _is_c_h_S_comment(self, string):
+
+        string = string.strip()
+        if (string.startswith('/*')):
+            return True
+        elif (string.endswith('*/')):
+            return True
+        elif (string.startswith('//')):
+            return True
+        else:
+            return False
+
+    def _is_makefile_comment(self, string):
+
+        return string.lstrip().startswith('#')
+
+def _lookup(memo, key, limit, function, *args):
+    ''' Get a remembered result, or compute and remember it, forgetting the least
+        recently used result if (memo) is full.
+    '''
+    result = memo.pop(key, None) # reinserted below, as the most recently used
+    if (result is None):
+        result = function(*args)
+        if (len(memo) >= limit):
+            memo.popitem(last=False)
+    memo[key] = result
+
+    return result
@@ -7,17 +7,213 @@ Created on Apr 13, 2014
 Select strings based on caller components: prefixes, suffixes and substrings.
 Regular expression matching is also supported.
 
+Each type of literal pattern is compiled into an Aho-Corasick automaton, and the
+regular expressions into a single alternation, so that a string is matched against
+all the patterns of a type in one pass, however many patterns there are. Since the
+automaton steps through a string in Python, a few substring patterns are searched
+for one at a time by the faster 'in' operator instead.
+
 Note that some patch and kernel files have utf-8 chars with code > 127. Some of
 these codes are not legal utf-8 start byte codes. See functions.py for the file
  read, write handling.
 '''
 
 import re
+from collections import deque
 from inspect import isfunction
 
 from patchtools.lib.ptobject   import PTObject
 from patchtools.lib.exceptions import PatchToolsError, PT_ParameterError
 
+# Flags of a regex without inline flags. Regexes with other flags are not combined,
+# since an inline flag would apply to the whole alternation.
+_DEFAULT_FLAGS = re.compile('').flags
+
+# Group references, whose group numbers would change in the alternation
+_GROUP_REFERENCE = re.compile(r'\\[1-9]|\(\?P=|\(\?\(')
+
+# A regex that matches nothing, used when there are no patterns to search for
+_NOTHING = re.compile('(?!)')
+
+# A repeat count, e.g. "{2}" or "{1,3}"
+_REPEAT = re.compile(r'\{\d*,?\d*\}')
+
+# Number of substring patterns from which an automaton is faster than testing each
+# pattern with 'in'. Prefixes and suffixes always use an automaton, which stops at
+# the first character that no pattern has at that position.
+_AUTOMATON_SUBSTRS = 32
+
+class _Automaton(object):
+    ''' Aho-Corasick automaton of a list of literal patterns. Each state has a dict
+        of transitions, a failure state, and the lowest index of the patterns that
+        end at the state (_ends), or at any of its failure states (_found).
+    '''
+    def __init__(self, patterns):
+
+        self._goto  = [{}]
+        self._fail  = [0]
+        self._ends  = [None]
+        for index in range(len(patterns)):
+            state = 0
+            for char in patterns[index]:
+                next_ = self._goto[state].get(char)
+                if (next_ is None):
+                    next_ = len(self._goto)
+                    self._goto[state][char] = next_
+                    self._goto += [{}]
+                    self._fail += [0]
+                    self._ends += [None]
+                state = next_
+            if (self._ends[state] is None): # the first of duplicate patterns
+                self._ends[state] = index
+
+        # Breadth first, so that the failure state of a state is done before it
+        self._found = list(self._ends)
+        queue = deque(self._goto[0].values())
+        while (len(queue) > 0):
+            state = queue.popleft()
+            for (char, next_) in self._goto[state].items():
+                queue += [next_]
+                fail = self._fail[state]
+                while ((fail != 0) and (char not in self._goto[fail])):
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_] = fail
+                self._found[next_] = _lowest(self._found[next_], self._found[fail])
+
+    def find(self, string):
+        ''' Get the lowest index of the patterns contained in string, or None.
+        '''
+        goto  = self._goto
+        fail  = self._fail
+        found = self._found
+        state = 0
+        best  = found[0] # an empty pattern
+        for char in string:
+            if (best == 0):
+                break
+            while ((state != 0) and (char not in goto[state])):
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if (found[state] is not None):
+                best = _lowest(best, found[state])
+
+        return best
+
+    def find_prefix(self, string):
+        ''' Get the lowest index of the patterns that string starts with, or None.
+        '''
+        goto  = self._goto
+        state = 0
+        best  = self._ends[0]
+        for char in string:
+            state = goto[state].get(char)
+            if (state is None):
+                break
+            if (self._ends[state] is not None):
+                best = _lowest(best, self._ends[state])
+
+        return best
+
+def _required_literal(regex):
+    ''' Get the longest literal that every match of a regex contains, or None if
+        none is found. Only the top level of the pattern is examined: groups,
+        classes, escapes of letters and digits, and repeated items end a literal.
+    '''
+    if ((regex.flags & (re.IGNORECASE | re.VERBOSE)) != 0):
+        return None
+
+    pattern = regex.pattern
+    length  = len(pattern)
+    runs  = []
+    run   = ''
+    index = 0
+    while (index < length):
+        char = pattern[index]
+        if (char == '|'): # any branch may match
+            return None
+        if (char == '\\'):
+            char = pattern[index + 1:index + 2]
+            literal = (len(char) > 0) and (not char.isalnum())
+            index += 2
+        elif (char == '['):
+            literal = False
+            index = _skip_class(pattern, index)
+        elif (char == '('):
+            literal = False
+            index = _skip_group(pattern, index)
+        else:
+            literal = (char not in '.^$*+?{}[]()')
+            index += 1
+
+        # A repeated item may occur zero times, or be followed by itself
+        repeat = ''
+        if ((index < length) and (pattern[index] in '*+?')):
+            repeat = pattern[index]
+            index += 1
+            if ((index < length) and (pattern[index] in '?+')): # lazy or possessive
+                index += 1
+        else:
+            match = _REPEAT.match(pattern, index)
+            if (match is not None):
+                repeat = '{'
+                index = match.end()
+
+        if (literal and (repeat in ('', '+'))):
+            run += char
+        if ((not literal) or (repeat != '')):
+            runs += [run]
+            run = ''
+
+    runs += [run]
+    longest = max(runs, key=len)
+
+    return longest if (len(longest) > 0) else None
+
+def _skip_class(pattern, index):
+    ''' Get the index after the character class that starts at (index).
+    '''
+    index += 1
+    if (pattern[index:index + 1] == '^'):
+        index += 1
+    if (pattern[index:index + 1] == ']'): # a leading ']' is a member
+        index += 1
+    while ((index < len(pattern)) and (pattern[index] != ']')):
+        index += 2 if (pattern[index] == '\\') else 1
+
+    return index + 1
+
+def _skip_group(pattern, index):
+    ''' Get the index after the group that starts at (index).
+    '''
+    depth = 0
+    while (index < len(pattern)):
+        char = pattern[index]
+        if (char == '\\'):
+            index += 2
+            continue
+        if (char == '['):
+            index = _skip_class(pattern, index)
+            continue
+        if (char == '('):
+            depth += 1
+        elif (char == ')'):
+            depth -= 1
+            if (depth == 0):
+                break
+        index += 1
+
+    return index + 1
+
+def _lowest(index1, index2):
+
+    if (index1 is None):
+        return index2
+    if (index2 is None):
+        return index1
+
+    return min(index1, index2)
+
 #++
 class Matcher(PTObject):
     """ Implement filter selection of strings
@@ -43,6 +239,8 @@ class Matcher(PTObject):
         Notes:
             At least one option must be specified for the filter to have an effect.         
             Regular expression pattern strings should be coded using the r"..." string form.
+            Regular expressions that have inline flags or group references are matched
+            one at a time, since they cannot be combined with the others.
         """
         #--
 
@@ -73,6 +271,8 @@ class Matcher(PTObject):
             self.callbacks = cbs
         else:
             self.callbacks = None
+
+        self._compile()
                    
     #++   
     def __call__(self, string):
@@ -86,30 +286,35 @@ class Matcher(PTObject):
         """
         #--
         
-        if ('compatible = "ti,am3359-tscadc"' in string):
-            pass
-        
-        if (self.match_patterns is not None):
-            for pattern in self.match_patterns:
-                if (string == pattern):
-                    return pattern
-                
-        if (self.prefix_patterns is not None):
-            for pattern in self.prefix_patterns:
-                if (string.startswith(pattern)):
-                    return pattern
-        
-        if (self.suffix_patterns is not None):
-            for pattern in self.suffix_patterns:
-                if (string.endswith(pattern)):
-                    return pattern
-        
-        if (self.substr_patterns is not None):
+        if (self._exact is not None):
+            pattern = self._exact.get(string)
+            if (pattern is not None):
+                return pattern
+
+        if (self._prefixes is not None):
+            index = self._prefixes.find_prefix(string)
+            if (index is not None):
+                return self.prefix_patterns[index]
+
+        if (self._suffixes is not None):
+            index = self._suffixes.find_prefix(string[::-1])
+            if (index is not None):
+                return self.suffix_patterns[index]
+
+        if (self._substrs is not None):
+            index = self._substrs.find(string)
+            if (index is not None):
+                return self.substr_patterns[index]
+        elif (self.substr_patterns is not None):
             for pattern in self.substr_patterns:
                 if (pattern in string):
                     return pattern
-         
-        if (self.regex_patterns is not None):
+
+        if (self._regex is not None):
+            ret = self._regex.match(string)
+            if (ret is not None):
+                return str(self.regex_patterns[int(ret.lastgroup[2:])])
+        elif (self.regex_patterns is not None):
             for pattern in self.regex_patterns:
                 ret = pattern.match(string)
                 if (ret is not None):
@@ -120,4 +325,137 @@ class Matcher(PTObject):
                 if callback(string):
                     return str(callback)
   
-        return None
\ No newline at end of file
+        return None
+
+    #++
+    def could_match(self, text):
+        """ Determine whether any line of a text could match the stored filter
+
+        Args:
+            text (string): lines separated by newlines, e.g. the data of a file
+
+        Returns:
+            False if no line can match, else True
+
+        Notes:
+            The text is searched in one pass for the literal patterns, and for a
+            literal that each regular expression requires. Callbacks, and regular
+            expressions that require no literal, could match any line.
+        """
+        #--
+
+        if (self._literals is None):
+            return True
+
+        return (self._literals.search(text) is not None)
+
+    #++
+    def get_literals(self):
+        """ Get a list of literals, one of which is contained in every matching string
+
+        Args:
+            None
+
+        Returns:
+            A sorted list of strings, or None if there is no such list, e.g. if there
+            are callbacks
+
+        Notes:
+            See could_match
+        """
+        #--
+
+        return self._literal_list
+
+    #++
+    def get_bytes_regex(self):
+        """ Get a regular expression that finds the literals in undecoded file data
+
+        Args:
+            None
+
+        Returns:
+            A compiled regular expression that matches the utf-8 and Latin-1 encodings
+            of the literals returned by get_literals, or None if there are none
+        """
+        #--
+
+        return self._bytes_literals
+
+    def _compile(self):
+        ''' Compile the patterns into a dict of match patterns, automata of prefix, 
+            reversed suffix and substring patterns, and an alternation of the regexes.
+            No automaton is made for fewer than _AUTOMATON_SUBSTRS substring patterns.
+        '''
+        self._exact = None
+        if (self.match_patterns is not None):
+            self._exact = {}
+            for pattern in reversed(self.match_patterns): # the first of duplicates wins
+                self._exact[pattern] = pattern
+
+        self._prefixes = self._suffixes = self._substrs = None
+        if (self.prefix_patterns is not None):
+            self._prefixes = _Automaton(self.prefix_patterns)
+        if (self.suffix_patterns is not None):
+            self._suffixes = _Automaton([pattern[::-1] for pattern in self.suffix_patterns])
+        if ((self.substr_patterns is not None) and (len(self.substr_patterns) >= _AUTOMATON_SUBSTRS)):
+            self._substrs = _Automaton(self.substr_patterns)
+
+        self._compile_literals()
+
+        self._regex = None
+        if ((self.regex_patterns is not None) and (len(self.regex_patterns) > 0)):
+            for regex in self.regex_patterns:
+                if ((regex.flags != _DEFAULT_FLAGS) or (_GROUP_REFERENCE.search(regex.pattern) is not None)):
+                    return
+            groups = ['(?P<_m%d>%s)' % (index, self.regex_patterns[index].pattern)
+                      for index in range(len(self.regex_patterns))]
+            try:
+                self._regex = re.compile('|'.join(groups))
+            except re.error: # e.g. duplicate group names
+                self._regex = None
+
+    def _compile_literals(self):
+        ''' Compile an alternation of the literals, one of which is contained in every
+            matching string, or set None if there is no such set.
+        '''
+        self._literals = self._literal_list = self._bytes_literals = None
+        if (self.callbacks is not None):
+            return
+
+        literals = set()
+        for patterns in (self.match_patterns, self.prefix_patterns,
+                         self.suffix_patterns, self.substr_patterns):
+            if (patterns is not None):
+                literals.update(patterns)
+
+        if (self.regex_patterns is not None):
+            for regex in self.regex_patterns:
+                literal = _required_literal(regex)
+                if (literal is None):
+                    return
+                literals.add(literal)
+
+        if ('' in literals): # matches every string
+            return
+
+        self._literal_list = sorted(literals)
+        if (len(literals) == 0):
+            self._literals = _NOTHING
+            self._bytes_literals = re.compile(b'(?!)')
+            return
+
+        self._literals = re.compile('|'.join([re.escape(literal) for literal in self._literal_list]))
+
+        # Files are decoded as Latin-1 if they are not valid utf-8
+        encoded = set()
+        for literal in self._literal_list:
+            if isinstance(literal, bytes): # Python 2 str
+                encoded.add(literal)
+                continue
+            encoded.add(literal.encode('utf-8'))
+            try:
+                encoded.add(literal.encode('latin_1'))
+            except UnicodeEncodeError:
+                pass
+        self._bytes_literals = re.compile(b'|'.join([re.escape(literal) for literal in sorted(encoded)]))
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Read the patches in a mailbox file, e.g. the output of "git format-patch --stdout"
+or a mailing list archive.
+
+The file is read one line at a time, and only the lines of the current message
+are kept, so a mailbox of any size can be read in constant memory. The file may
+be compressed by gzip, bzip2 or xz.
+
+Messages are separated by "From " lines that follow an empty line, or start the
+file. Lines of a message body that start with "From " are escaped as ">From " in
+a mailbox, and are restored.
+'''
+
+import re
+
+from patchtools.lib.patch      import Patch
+from patchtools.lib.ptobject   import PTObject
+from patchtools.lib.exceptions import PT_NotFoundError, PT_ParameterError
+from patchtools.lib.functions  import Functions as ut
+
+# A body line starting with "From ", escaped by one or more '>' characters
+_ESCAPED_FROM = re.compile(r'>+From ')
+
+#++
+class Mbox(PTObject):
+    """ Read the patches in a mailbox file
+    """
+    #--
+
+    #++
+    def __init__(self, path):
+        """ Constructor
+
+        Args:
+            path (string): path to mailbox file
+
+        Raises:
+            PT_ParameterError, PT_NotFoundError
+        """
+        #--
+
+        self.name = 'Mbox'
+
+        if (not ut.is_string_type(path)):
+            raise PT_ParameterError(self.name, path)
+
+        if (not ut.is_file(path)):
+            raise PT_NotFoundError(self.name, path)
+
+        self._path = path
+
+    #++
+    def patches(self):
+        """ Generate the patches in the mailbox, one message at a time
+
+        Args:
+            None
+
+        Returns:
+            A generator of Patch objects. The headers of each message, e.g. 'Subject',
+            'From', 'Date' and 'Message-Id', are in the patch's 'headers' dict.
+
+        Notes:
+            Messages that contain no diffs, e.g. the cover letter of a series or a
+            reply on a mailing list, are skipped.
+        """
+        #--
+
+        for strings in self._messages():
+            patch = Patch.from_text('\n'.join(strings) + '\n')
+            if (len(patch.diffs) > 0):
+                yield patch
+
+    def _messages(self):
+        ''' Use generator to split the mailbox file into the lines of each message.
+        '''
+        strings  = []
+        previous = ''
+        for string in ut.iter_strings(self._path):
+            if (string.startswith('From ') and (len(previous) == 0)):
+                if (len(strings) > 0):
+                    yield strings
+                strings = []
+            elif (_ESCAPED_FROM.match(string) is not None):
+                string = string[1:]
+            strings += [string]
+            previous = string
+
+        if (len(strings) > 0):
+            yield strings
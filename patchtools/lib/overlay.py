@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+A source tree with patches applied in memory.
+
+The Checker matches each patch of a series against the tree produced by the
+patches before it. Rather than applying the patches to the files on disk, e.g.
+by "quilt push", the overlay keeps the contents of each modified file. Files
+that no patch has modified are read from the source directory, or from a git
+revision.
+
+A patch is applied to a file in a single pass, as a list of pieces: slices of
+the unchanged lines between hunks, and the lines produced by each hunk. Only
+references to the unchanged lines are copied, not the lines themselves.
+'''
+
+from patchtools.lib.filecache  import FileCache, SourceFile
+from patchtools.lib.gittree    import GitTree
+from patchtools.lib.ptobject   import PTObject
+from patchtools.lib.exceptions import PT_NotFoundError, PT_ParameterError
+from patchtools.lib.functions  import Functions as ut
+
+#++
+class Overlay(PTObject):
+    """ Source tree with patches applied in memory
+    """
+    #--
+
+    #++
+    def __init__(self, params):
+        """ Constructor
+
+        Args:
+            params (dict): parameters
+                sourcedir (string, required):   path to source directory
+                cache     (FileCache, optional): cache of unmodified source files
+                base      (GitTree, optional):  tree to read unmodified files from,
+                    instead of sourcedir
+                fuzz      (int, optional): number of outer merge lines that may be
+                    ignored when locating a hunk
+                    default is 2
+
+        Raises:
+            PT_ParameterError
+        """
+        #--
+
+        self.name = 'Overlay'
+
+        if ((params is None) or (not isinstance(params, dict))):
+            raise PT_ParameterError(self.name, 'params')
+
+        self.sourcedir = self._check_required_string_param(params, 'sourcedir')
+        self._check_path_param('sourcedir', self.sourcedir)
+
+        self.cache = self._check_optional_param(params, 'cache', FileCache, None)
+        if (self.cache is None):
+            self.cache = FileCache()
+
+        self.base = self._check_optional_param(params, 'base', GitTree, None)
+
+        self.fuzz = self._check_optional_param(params, 'fuzz', int, 2)
+        if (self.fuzz < 0):
+            raise PT_ParameterError(self.name, 'fuzz')
+
+        self.reset()
+
+    #++
+    def is_file(self, filename):
+        """ Determine whether a file exists in the tree
+
+        Args:
+            filename (string): path of the file relative to the source directory
+
+        Returns:
+            True if the file exists, else False
+        """
+        #--
+
+        if (filename in self._files):
+            return (self._files[filename] is not None)
+        elif (self.base is not None):
+            return self.base.is_file(filename)
+        else:
+            return ut.is_file(ut.join_path(self.sourcedir, filename))
+
+    #++
+    def get(self, filename):
+        """ Get the contents of a file in the tree
+
+        Args:
+            filename (string): path of the file relative to the source directory
+
+        Returns:
+            A SourceFile object
+
+        Raises:
+            PT_NotFoundError
+        """
+        #--
+
+        if (filename in self._files):
+            source = self._files[filename]
+            if (source is None): # deleted by a patch
+                raise PT_NotFoundError(self.name, filename)
+            return source
+
+        if (self.base is not None):
+            return self.base.get(filename)
+        else:
+            return self.cache.get(ut.join_path(self.sourcedir, filename))
+
+    #++
+    def apply(self, patch):
+        """ Apply a patch to the tree
+
+        Args:
+            patch (Patch): parsed patch file
+
+        Returns:
+            The number of hunks that could not be applied
+
+        Notes:
+            As in GNU patch, a hunk is located nearest to its start line, allowing
+            for the offset of the previous hunk and for up to 'fuzz' outer merge
+            lines that do not match. A hunk that is not found is not applied, and
+            the rest of the file's hunks are applied without it.
+        """
+        #--
+
+        rejects = 0
+        for diff in patch.diffs:
+            if (diff.diff_type == 'binary'):
+                continue
+
+            if (diff.new_path == '/dev/null'): # file deleted
+                self._files[diff.old_path] = None
+                continue
+
+            if (diff.old_path == '/dev/null'): # file created
+                source = SourceFile(None, [])
+            elif (self.is_file(diff.old_path)):
+                source = self.get(diff.old_path)
+            else:
+                rejects += len(diff.hunks)
+                continue
+
+            (lines, failed) = self._apply_hunks(source, diff.hunks)
+            rejects += failed
+
+            if (diff.old_path not in ('/dev/null', diff.new_path)): # file renamed
+                self._files[diff.old_path] = None
+            self._files[diff.new_path] = SourceFile(ut.join_path(self.sourcedir, diff.new_path), lines)
+
+        return rejects
+
+    #++
+    def list_files(self):
+        """ List the files modified by the applied patches
+
+        Args:
+            None
+
+        Returns:
+            A sorted list of filenames. Deleted files are included.
+        """
+        #--
+
+        return sorted(self._files)
+
+    #++
+    def reset(self):
+        """ Discard all applied patches
+
+        Args:
+            None
+        """
+        #--
+
+        self._files = {}
+
+    def _apply_hunks(self, source, hunks):
+        ''' Apply the hunks of a diff to a source file. Returns (lines, failed), where
+            lines is the new contents of the file and failed is the number of hunks
+            that were not applied.
+        '''
+        lines  = source.lines
+        pieces = []
+        pos    = 0 # index of the first source line not yet copied
+        offset = 0 # offset of the previous applied hunk
+        failed = 0
+
+        for hunk in hunks:
+            edits = [self._split_edit(edit) for edit in hunk.edits if (not edit.startswith('\\'))]
+            ops   = [op for (op, _) in edits if (op != '+')]
+            if (len(ops) == 0): # lines are added after old_start
+                index = hunk.old_start + offset
+                if (index > len(lines)):
+                    index = -1
+            else:
+                texts = ut.normalize_strings([text for (op, text) in edits if (op != '+')])
+                (index, _) = source.locate_hunk(ops, texts, hunk.old_start - 1 + offset, self.fuzz)
+                if (index != -1):
+                    offset = index - (hunk.old_start - 1)
+
+            if ((index == -1) or (max(index, 0) < pos)): # not found, or overlaps the previous hunk
+                failed += 1
+                continue
+
+            pieces += [lines[pos:max(index, 0)]]
+            added = []
+            current = index
+            for (op, text) in edits:
+                if (op == '+'):
+                    added += [text]
+                else:
+                    if ((op == ' ') and (0 <= current < len(lines))):
+                        added += [lines[current]] # keep the file's version of the line
+                    current += 1
+            pieces += [added]
+            pos = min(max(current, pos), len(lines))
+
+        pieces += [lines[pos:]]
+
+        result = []
+        for piece in pieces:
+            result += piece
+
+        return (result, failed)
+
+    def _split_edit(self, edit):
+        ''' Split an edit line into op and text. Empty edit lines are merge lines
+            whose leading space was stripped.
+        '''
+        if (len(edit) == 0):
+            return (' ', '')
+        else:
+            return (edit[0], edit[1:])
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Store parsed patches on disk, so that patch files are not parsed again by later
+runs.
+
+A parsed patch is stored as a pickle of its Patch object, in a file named by a
+hash of the patch file's contents. Since the name changes whenever the contents
+do, a stored patch never becomes stale. The total size of the stored patches is
+bounded: when it is exceeded, the least recently used ones are removed.
+'''
+
+import io
+import os
+import sys
+
+try:
+    import cPickle as pickle # Python 2
+except ImportError:
+    import pickle
+
+from patchtools.lib.patch      import Patch
+from patchtools.lib.ptobject   import PTObject
+from patchtools.lib.exceptions import PT_ParameterError
+from patchtools.lib.functions  import Functions as ut
+
+# os.rename does not replace an existing file on Windows
+_replace = getattr(os, 'replace', os.rename)
+
+# Stored patches are only read by the Python major version that wrote them, and
+# the format number is changed whenever the Patch, Diff or Hunk attributes change
+_FORMAT = 5
+_SUFFIX = '.%d.py%d.pickle' % (_FORMAT, sys.version_info[0])
+
+#++
+class ParseCache(PTObject):
+    """ Persistent cache of parsed patches
+    """
+    #--
+
+    #++
+    def __init__(self, params):
+        """ Constructor
+
+        Args:
+            params (dict): parameters
+                cachedir  (string, required): path to cache directory
+                max_bytes (int, optional): size limit of the stored patches in bytes
+                    default is 256 MB
+
+        Raises:
+            PT_ParameterError
+        """
+        #--
+
+        self.name = 'ParseCache'
+
+        if ((params is None) or (not isinstance(params, dict))):
+            raise PT_ParameterError(self.name, 'params')
+
+        self.cachedir = self._check_required_string_param(params, 'cachedir')
+        self._check_path_param('cachedir', self.cachedir)
+
+        self.max_bytes = self._check_optional_param(params, 'max_bytes', int, 256 * 1024 * 1024)
+        if (self.max_bytes <= 0):
+            raise PT_ParameterError(self.name, 'max_bytes')
+
+        self.hits   = 0
+        self.misses = 0
+        self._size  = None # total size of the stored patches, once known
+
+    #++
+    def get(self, patchpath):
+        """ Get a parsed patch, parsing and storing it if it is not stored
+
+        Args:
+            patchpath (string): path to patch file
+
+        Returns:
+            A Patch object
+
+        Raises:
+            PT_ParameterError
+            PT_NotFoundError
+        """
+        #--
+
+        if (not ut.is_file(patchpath)):
+            return Patch(patchpath) # raises the error
+
+        path  = ut.join_path(self.cachedir, ut.file_hash(patchpath) + _SUFFIX)
+        patch = self._load(path)
+        if (patch is not None):
+            self.hits += 1
+            return patch
+
+        self.misses += 1
+        patch = Patch(patchpath)
+        self._store(path, patch)
+
+        return patch
+
+    def _load(self, path):
+        ''' Read a stored patch, marking it as the most recently used.
+        '''
+        try:
+            inpt = io.open(path, 'rb')
+        except (IOError, OSError):
+            return None
+
+        try:
+            patch = pickle.loads(inpt.read())
+        except Exception: # damaged by an interrupted run
+            return None
+        finally:
+            inpt.close()
+
+        if (not isinstance(patch, Patch)):
+            return None
+
+        try:
+            os.utime(path, None)
+        except OSError: # removed by another process
+            pass
+
+        return patch
+
+    def _store(self, path, patch):
+
+        data = pickle.dumps(patch, pickle.HIGHEST_PROTOCOL)
+
+        # Write to a temporary file first, so that a reader never sees a partial patch
+        temp = '%s.%d.tmp' % (path, os.getpid())
+        outp = io.open(temp, 'wb')
+        try:
+            outp.write(data)
+        finally:
+            outp.close()
+        _replace(temp, path)
+
+        if (self._size is None):
+            self._size = sum([size for (_, size, _) in self._list_entries()])
+        else:
+            self._size += len(data)
+
+        if (self._size > self.max_bytes):
+            self._evict()
+
+    def _evict(self):
+        ''' Remove the least recently used patches until the total size is 3/4 of
+            max_bytes, so that the directory is not listed again on every store.
+        '''
+        entries = sorted(self._list_entries())
+        self._size = sum([size for (_, size, _) in entries])
+        limit = self.max_bytes * 3 // 4
+        for (_, size, path) in entries:
+            if (self._size <= limit):
+                break
+            try:
+                os.remove(path)
+            except OSError: # removed by another process
+                pass
+            self._size -= size
+
+    def _list_entries(self):
+        ''' List (mtime, size, path) of each stored patch.
+        '''
+        entries = []
+        for filename in os.listdir(self.cachedir):
+            if (filename.endswith('.pickle')):
+                path = ut.join_path(self.cachedir, filename)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries += [(st.st_mtime, st.st_size, path)]
+
+        return entries
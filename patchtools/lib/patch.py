@@ -9,17 +9,24 @@ Parse patch file.
 
 # 2to3 from types import str
 
+from array import array
+from email.header import decode_header, make_header
+
 from patchtools.lib.diff       import Diff
-from patchtools.lib.strings    import Strings
 from patchtools.lib.ptobject   import PTObject
 from patchtools.lib.exceptions import PT_NotFoundError, PT_ParameterError
 from patchtools.lib.functions  import Functions as ut
 
+# unicode in Python 2, str in Python 3
+_text_type = type(u'')
+
 #++
 class Patch(PTObject):
     """ Extract information from a patch file
     """
     #--
+    
+    __slots__ = ('name', 'headers', 'diffs', 'patch_type', 'patch_mode')
 
     #++
     def __init__(self, path):
@@ -34,6 +41,15 @@ class Patch(PTObject):
         
         Notes:
             Commented out diff and hunk sections are omitted.
+            
+            The lines are scanned once to find the diff sections, and each Diff parses
+            its own range of the lines, finding the hunk sections. A Hunk is only made
+            when the diff's hunks are first used, and keeps the text of its edit lines
+            as offsets into the file data, which all the hunks share.
+            
+            If the patch is an email, e.g. made by "git format-patch", its headers are
+            kept in the 'headers' dict, by name in title case, e.g. 'Subject' or
+            'Message-Id'. Otherwise the dict is empty.
         """
         #--
  
@@ -45,23 +61,46 @@ class Patch(PTObject):
         if (not ut.is_file(path)):
             raise PT_NotFoundError(self.name, path)
         
-        strings = Strings(ut.read_strings(path))
-        strings = strings.discard('"""','"""')
+        self._parse(ut.read_file(path))
+    
+    #++
+    @staticmethod
+    def from_text(text):
+        """ Parse a patch from its text, e.g. a message read from a mailbox
         
-        # Split any email header from the patch data
-        (_, body) = strings.partition('diff -')
+        Args:
+            text (string): patch text
+            
+        Returns:
+            A Patch object
+        """
+        #--
+        
+        patch = Patch.__new__(Patch)
+        patch.name = 'Patch'
+        patch._parse(text)
         
-        if (body is None): #all diffs commented out?
+        return patch
+    
+    def _parse(self, text):
+        
+        (data, strings, offsets, starts, footer) = self._scan(text)
+        
+        self.headers = self._parse_headers(strings, starts[0] if (len(starts) > 0) else len(strings))
+        
+        if (len(starts) == 0): #all diffs commented out?
             self.diffs = []
             self.patch_type = 'text'
             self.patch_mode = 'git'
-        elif (body[0].startswith('diff --git ')):
-            # Split any email footer from the patch data
-            (body, _) = body.rpartition('-- ')
-            self._parse_body(body, 'diff --git ')
+        elif (strings[starts[0]].startswith('diff --git ')):
+            # Drop any email footer from the patch data
+            end = footer if (footer > starts[0]) else len(strings)
+            starts = [index for index in starts
+                      if ((index < end) and strings[index].lstrip().startswith('diff --git '))]
+            self._parse_body(strings, starts, end, data, offsets)
             self.patch_mode = 'git'
         else:
-            self._parse_body(body, 'diff -')
+            self._parse_body(strings, starts, len(strings), data, offsets)
             self.patch_mode = 'urn'
     
     #++
@@ -92,13 +131,102 @@ class Patch(PTObject):
         
         return filenames
             
-    def _parse_body(self, strings, splitter):
+    def __getstate__(self):
+        
+        return tuple([getattr(self, field) for field in self.__slots__])
+    
+    def __setstate__(self, state):
+        
+        for (field, value) in zip(self.__slots__, state):
+            setattr(self, field, value)
+    
+    def _scan(self, data):
+        ''' Find the diff sections in one pass over the patch lines, without copying them.
+            Returns (data, strings, offsets, starts, footer), where offsets are the offsets
+            of the lines in data, starts are the indexes of lines that start with 'diff -',
+            and footer is the index of the last line that starts with '-- ', or -1.
+            Sections between '"""' lines are commented out: if there are any, the returned
+            data and strings hold only the lines outside them.
+        '''
+        strings = data.rstrip('\n').split('\n')
+        kept    = None # lines outside commented out sections, once one is found
+        offsets = array('l')
+        offset  = 0
+        starts  = []
+        footer  = -1
+        comment = False
+        for (index, string) in enumerate(strings):
+            stripped = string.lstrip()
+            if (comment):
+                if (stripped.startswith('"""')):
+                    comment = False
+                continue
+            if (stripped.startswith('"""')):
+                if (kept is None):
+                    kept = strings[:index]
+                comment = True
+                continue
+            
+            position = len(offsets)
+            if (stripped.startswith('diff -')):
+                starts += [position]
+            elif (stripped.startswith('-- ')):
+                footer = position
+            offsets.append(offset)
+            offset += len(string) + 1
+            if (kept is not None):
+                kept += [string]
+        
+        if (kept is None):
+            return (data, strings, offsets, starts, footer)
+        else:
+            return ('\n'.join(kept), kept, offsets, starts, footer)
+    
+    def _parse_headers(self, strings, end):
+        ''' Parse the email headers, if any, which precede the first empty line.
+            Folded header lines are joined, and encoded words are decoded.
+        '''
+        headers = {}
+        name = None
+        for index in range(end):
+            string = strings[index]
+            if ((index == 0) and string.startswith('From ')): # mbox separator line
+                continue
+            if (len(string) == 0):
+                break
+            if (string[0] in ' \t'):
+                if (name is None):
+                    break
+                headers[name] += ' ' + string.strip()
+                continue
+            (key, colon, value) = string.partition(':')
+            if ((len(colon) == 0) or (len(key) == 0) or (' ' in key)): # not a header
+                break
+            name = key.title()
+            headers[name] = value.strip()
         
+        for name in headers:
+            if ('=?' in headers[name]):
+                headers[name] = self._decode_header(headers[name])
+        
+        return headers
+    
+    def _decode_header(self, value):
+        ''' Decode RFC 2047 encoded words, e.g. '=?UTF-8?q?J=C3=B6rg?=' in an author name.
+        '''
+        try:
+            return _text_type(make_header(decode_header(value)))
+        except Exception: # badly encoded, so keep it as it is
+            return value
+    
+    def _parse_body(self, strings, starts, end, data, offsets):
+        ''' Parse the diff sections, each of which runs from its start index to the
+            next start index, or to end.
+        '''
         self.diffs = []
         self.patch_type = 'text'
-        if (strings is not None):
-            for rec in strings.split(splitter):
-                diff = Diff(rec)
-                if (diff.diff_type == 'binary'):
-                    self.patch_type = 'binary'
-                self.diffs += [diff]
\ No newline at end of file
+        for (begin, stop) in zip(starts, starts[1:] + [end]):
+            diff = Diff(strings, begin, stop, data, offsets)
+            if (diff.diff_type == 'binary'):
+                self.patch_type = 'binary'
+            self.diffs += [diff]
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Collect timers and counters for a Checker run.
+
+The profile of a run is a tree of nodes: one for each patch, containing one
+for each diff, containing one for each hunk. Each node holds its elapsed time
+and a set of counters, e.g. bytes read, lines compared, normalizations and
+find mode lookups. Timers for parts of the work, e.g. reading source files,
+are kept as counters whose names end in '_time'. The counters of a node
+include those of the nodes it contains.
+'''
+
+import time
+
+# time.perf_counter is not available in Python 2
+_clock = getattr(time, 'perf_counter', time.time)
+
+#++
+class Profiler(object):
+    """ Timers and counters of a Checker run
+    """
+    #--
+
+    #++
+    def __init__(self):
+        """ Constructor
+
+        Args:
+            None
+        """
+        #--
+        self.patches = []
+        self._stack  = [] # open nodes: patch, diff, hunk
+
+    #++
+    @staticmethod
+    def clock():
+        """ Read the clock used for timers
+
+        Args:
+            None
+
+        Returns:
+            The time in seconds, as a float
+        """
+        #--
+        return _clock()
+
+    #++
+    def start_patch(self, name):
+        """ Start the node of a patch, ending any open node
+
+        Args:
+            name (string): patch name
+        """
+        #--
+        self._end_level(0)
+        node = { 'patch' : name, 'diffs' : [] }
+        self.patches += [node]
+        self._start(node)
+
+    #++
+    def start_diff(self, spec, filename):
+        """ Start the node of a diff in the current patch, ending any open diff
+
+        Args:
+            spec     (string): diff spec line
+            filename (string): name of the file modified by the diff
+        """
+        #--
+        self._end_level(1)
+        node = { 'diff' : spec, 'file' : filename, 'hunks' : [] }
+        self._stack[-1][0]['diffs'] += [node]
+        self._start(node)
+
+    #++
+    def start_hunk(self, spec):
+        """ Start the node of a hunk in the current diff, ending any open hunk
+
+        Args:
+            spec (string): hunk spec line
+        """
+        #--
+        self._end_level(2)
+        node = { 'hunk' : spec }
+        self._stack[-1][0]['hunks'] += [node]
+        self._start(node)
+
+    #++
+    def end_patch(self):
+        """ End the node of the current patch, and any open diff and hunk
+
+        Args:
+            None
+        """
+        #--
+        self._end_level(0)
+
+    #++
+    def add(self, counter, value=1):
+        """ Add to a counter of the innermost open node
+
+        Args:
+            counter (string): counter name
+            value   (number, optional): amount to add
+                default is 1
+        """
+        #--
+        if (len(self._stack) > 0):
+            node = self._stack[-1][0]
+            node[counter] = node.get(counter, 0) + value
+
+    #++
+    def take_patches(self):
+        """ Remove and return the nodes of the completed patches
+
+        Args:
+            None
+
+        Returns:
+            A list of patch nodes
+        """
+        #--
+        patches = self.patches
+        self.patches = []
+
+        return patches
+
+    #++
+    def get_profile(self, count=10):
+        """ Get the profile of the run
+
+        Args:
+            count (int, optional): number of items in the lists of slowest items
+                default is 10
+
+        Returns:
+            A dict:
+                patches (list): patch nodes, in the order checked
+                totals  (dict): sums of the counters and times of all patches
+                slowest_patches (list): (time, patch name) of the slowest patches
+                slowest_files   (list): (time, filename) of the files whose diffs
+                    took the most time, summed over all patches
+        """
+        #--
+        totals = { 'patches' : len(self.patches), 'time' : 0 }
+        files  = {}
+        for patch in self.patches:
+            self._add_counters(totals, patch)
+            totals['time'] += patch['time']
+            for diff in patch['diffs']:
+                files[diff['file']] = files.get(diff['file'], 0) + diff['time']
+
+        slowest_patches = sorted([(patch['time'], patch['patch']) for patch in self.patches], reverse=True)
+        slowest_files   = sorted([(files[name], name) for name in files], reverse=True)
+
+        return { 'patches' : self.patches, 'totals' : totals,
+                 'slowest_patches' : slowest_patches[:count],
+                 'slowest_files'   : slowest_files[:count] }
+
+    def _start(self, node):
+
+        node['time'] = 0
+        self._stack += [(node, _clock())]
+
+    def _end_level(self, level):
+        ''' End the open nodes at (level) and below, adding their counters to
+            the node that contains them.
+        '''
+        while (len(self._stack) > level):
+            (node, started) = self._stack.pop()
+            node['time'] = _clock() - started
+            if (len(self._stack) > 0):
+                self._add_counters(self._stack[-1][0], node)
+
+    def _add_counters(self, totals, node):
+
+        for key in node:
+            if ((key != 'time') and isinstance(node[key], (int, float))):
+                totals[key] = totals.get(key, 0) + node[key]
@@ -16,6 +16,8 @@ class PTObject(object):
     """
     #--
     
+    __slots__ = () # so that sub classes may use __slots__
+    
     def _check_required_param(self, params, field, types):
 
         if (field in params):
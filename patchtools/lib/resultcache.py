@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Store Checker results on disk, so that patches whose inputs have not changed
+are not checked again.
+
+A result is stored in a file named by a key, which is a hash of the patch file's
+contents and the Checker options that affect its output. The result records the
+modification time and size of each source file the patch refers to. It is only
+used while all of them are unchanged.
+'''
+
+import os
+import json
+import hashlib
+
+from patchtools.lib.ptobject   import PTObject
+from patchtools.lib.exceptions import PT_ParameterError
+from patchtools.lib.functions  import Functions as ut
+
+# os.rename does not replace an existing file on Windows
+_replace = getattr(os, 'replace', os.rename)
+
+#++
+class ResultCache(PTObject):
+    """ Persistent cache of Checker results
+    """
+    #--
+
+    #++
+    def __init__(self, params):
+        """ Constructor
+
+        Args:
+            params (dict): parameters
+                cachedir  (string, required): path to cache directory
+                sourcedir (string, required): path to source directory
+
+        Raises:
+            PT_ParameterError
+        """
+        #--
+
+        self.name = 'ResultCache'
+
+        if ((params is None) or (not isinstance(params, dict))):
+            raise PT_ParameterError(self.name, 'params')
+
+        self.cachedir = self._check_required_string_param(params, 'cachedir')
+        self._check_path_param('cachedir', self.cachedir)
+
+        self.sourcedir = self._check_required_string_param(params, 'sourcedir')
+
+    #++
+    def make_key(self, patchpath, options):
+        """ Make the key of a patch's result
+
+        Args:
+            patchpath (string): path to patch file
+            options   (list):   Checker options that affect the result
+
+        Returns:
+            key (string)
+        """
+        #--
+
+        digest = hashlib.sha1()
+        digest.update(json.dumps(options, sort_keys=True).encode('utf-8'))
+        digest.update(ut.file_hash(patchpath).encode('utf-8'))
+
+        return digest.hexdigest()
+
+    #++
+    def get(self, key):
+        """ Get a stored result
+
+        Args:
+            key (string): result key
+
+        Returns:
+            (msgs, errors) if a valid result is stored, else None
+        """
+        #--
+
+        path = self._result_path(key)
+        if (not ut.is_file(path)):
+            return None
+
+        try:
+            record = json.loads(ut.read_file(path))
+        except ValueError: # damaged by an interrupted run
+            return None
+
+        for (filename, stamp) in record['sources']:
+            if (self._get_stamp(filename) != stamp):
+                return None
+
+        return (record['msgs'], record['errors'])
+
+    #++
+    def put(self, key, filenames, msgs, errors):
+        """ Store a result
+
+        Args:
+            key       (string): result key
+            filenames (list):   source files referenced by the patch
+            msgs      (list):   messages issued for the patch
+            errors    (int):    error count for the patch
+        """
+        #--
+
+        sources = [[filename, self._get_stamp(filename)] for filename in sorted(set(filenames))]
+        record  = { 'sources' : sources, 'msgs' : msgs, 'errors' : errors }
+
+        # Write to a temporary file first, so that a reader never sees a partial result
+        path = self._result_path(key)
+        temp = '%s.%d.tmp' % (path, os.getpid())
+        ut.write_file(json.dumps(record) + '\n', temp)
+        _replace(temp, path)
+
+    def _result_path(self, key):
+
+        return ut.join_path(self.cachedir, key + '.json')
+
+    def _get_stamp(self, filename):
+        ''' Return the (mtime, size) of a source file as a list, since the
+            stamps are compared to stamps read back from JSON data.
+        '''
+        stamp = ut.file_stamp(ut.join_path(self.sourcedir, filename))
+        if (stamp is None):
+            return None
+        else:
+            return list(stamp)
@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Result records issued by the Checker, and sinks that format them.
+
+Each record describes one event of a check run, e.g. a missing "delete" line,
+with its patch, diff, hunk, line number and edit op. The text of a message is
+only produced when a sink formats the record, so a run can be streamed to disk
+without holding its messages in memory.
+'''
+
+import io
+import json
+
+from patchtools.lib.functions import Functions as ut
+
+# Message prefixes for each record status
+_PREFIXES = {
+    'ERROR' : 'ERROR: ',
+    'INFO'  : 'INFO:  ',
+    'FIND'  : 'FIND:  ',
+    'OK'    : '-OK-:  ',
+    'WARN'  : 'WARN:  ',
+    None    : '',
+    }
+
+def _format_moved(fields):
+
+    text = 'hunk found at %(line)d (offset %(offset)d lines' % fields
+    if (fields['fuzz'] > 0):
+        text += ', fuzz %d' % fields['fuzz']
+
+    return text + ')'
+
+# Message templates for each record kind. A template is a format string
+# applied to the record's fields, or a function of the fields.
+_TEMPLATES = {
+    # run and patch structure
+    'patchdir'        : 'patchdir  = "%(text)s":',
+    'sourcedir'       : 'sourcedir = "%(text)s":',
+    'patch'           : '\nPATCH: "%(patch)s"',
+    'diff'            : 'DIFF: "%(diff)s"',
+    'hunk'            : 'HUNK: "%(hunk)s"',
+    'summary'         : '\nSummary:',
+    'totals'          : '%(passed)d passed, %(skipped)d skipped, %(tested)d tested',
+    'empty_patch'     : 'skipping empty/commented patch',
+    'binary_patch'    : 'skipping binary patch',
+    'patch_errors'    : '%(count)d patch errors',
+    'patch_rejects'   : '%(count)d hunks could not be applied to the series tree',
+    # diff paths
+    'a_not_found'     : '"a" file not found: %(text)s',
+    'old_not_found'   : '"old" file not found: %(text)s',
+    'new_found'       : '"new" file found in old tree: %(text)s',
+    'new_not_found'   : '"new" file not found: %(text)s',
+    'old_not_in_tree' : '"old" file not found in old tree: %(text)s',
+    # hunk location
+    'bad_range'       : 'invalid %(tag)s start or count for file: start=%(line)d, count=%(count)d, length=%(length)d',
+    'hunk_moved'      : _format_moved,
+    # edit lines
+    'after_found'     : '"after"  line found at %(line)d: "%(text)s"',
+    'after_missing'   : '"after"  line not found at %(line)d: "%(text)s"',
+    'before_missing'  : '"before"  line not found at %(line)d: "%(text)s"',
+    'delete_found'    : '"delete" line found at %(line)d: "%(text)s"',
+    'delete_missing'  : '"delete" line not found at %(line)d: "%(text)s"',
+    'add_found'       : '"add"    line found at %(line)d: "%(text)s"',
+    'add_missing'     : '"add"    line not found at next line: "%(text)s"',
+    'merge_found'     : '"merge"  line found at %(line)d: "%(text)s"',
+    'merge_missing'   : '"merge"  line not found at %(line)d: "%(text)s"',
+    # find mode: one message per found location
+    'add_moved'       : '"add"    line found at %(line)d: "%(text)s"',
+    'delete_moved'    : '"delete" line found at %(line)d: "%(text)s"',
+    'merge_moved'     : '"merge"  line found at %(line)d: "%(text)s"',
+    'note_moved'      : 'hunk note found at %(line)d',
+    }
+
+_FIELDS = ('kind', 'status', 'level', 'patch', 'diff', 'hunk', 'line', 'op', 'text', 'found')
+
+#++
+class CheckResult(object):
+    """ Record of one event in a Checker run
+    """
+    #--
+
+    __slots__ = _FIELDS + ('extra',)
+
+    #++
+    def __init__(self, kind, status, level, patch=None, diff=None, hunk=None,
+                 line=None, op=None, text=None, found=None, extra=None):
+        """ Constructor
+
+        Args:
+            kind   (string): event kind, e.g. 'delete_missing'
+            status (string): 'ERROR', 'INFO', 'FIND', 'OK', 'WARN' or None
+            level  (int):    nesting level, 0 = run, 1 = patch, 2 = diff, 3 = hunk
+            patch  (string, optional): patch name
+            diff   (string, optional): diff spec line
+            hunk   (string, optional): hunk spec line
+            line   (int, optional):    1-based source line number
+            op     (string, optional): edit op, '+', '-' or ' '
+            text   (string, optional): edit text, file path, etc.
+            found  (list, optional):   1-based line numbers found in find mode
+            extra  (dict, optional):   other values used by the kind's message
+        """
+        #--
+        self.kind   = kind
+        self.status = status
+        self.level  = level
+        self.patch  = patch
+        self.diff   = diff
+        self.hunk   = hunk
+        self.line   = line
+        self.op     = op
+        self.text   = text
+        self.found  = found
+        self.extra  = extra
+
+    #++
+    def as_dict(self):
+        """ Convert the record to a dict
+
+        Args:
+            None
+
+        Returns:
+            A dict of the record's fields, with the items of 'extra' merged in
+        """
+        #--
+        data = dict([(field, getattr(self, field)) for field in _FIELDS])
+        if (self.extra is not None):
+            data.update(self.extra)
+
+        return data
+
+    #++
+    @staticmethod
+    def from_dict(data):
+        """ Create a record from a dict made by as_dict
+
+        Args:
+            data (dict): record fields
+
+        Returns:
+            A CheckResult object
+        """
+        #--
+        extra = dict([(key, data[key]) for key in data if (key not in _FIELDS)])
+        if (len(extra) == 0):
+            extra = None
+
+        return CheckResult(data['kind'], data['status'], data['level'], data['patch'],
+                           data['diff'], data['hunk'], data['line'], data['op'],
+                           data['text'], data['found'], extra)
+
+    def __getstate__(self):
+
+        return tuple([getattr(self, field) for field in self.__slots__])
+
+    def __setstate__(self, state):
+
+        for (field, value) in zip(self.__slots__, state):
+            setattr(self, field, value)
+
+#++
+class TextSink(object):
+    """ Format result records as Checker messages
+    """
+    #--
+
+    #++
+    def __init__(self, indent='   '):
+        """ Constructor
+
+        Args:
+            indent (string, optional): indentation for each nesting level
+                default is 3 spaces
+        """
+        #--
+        self.indent = indent
+
+    #++
+    def format(self, record):
+        """ Format a record
+
+        Args:
+            record (CheckResult): result record
+
+        Returns:
+            A list of message strings. Find mode records produce one message
+            for each found location, or none if nothing was found.
+        """
+        #--
+        fields = record.as_dict()
+        head = self.indent * record.level + _PREFIXES[record.status]
+        template = _TEMPLATES[record.kind]
+
+        if (record.found is None):
+            return [head + self._apply(template, fields)]
+
+        strings = []
+        for line in record.found:
+            fields['line'] = line
+            strings += [head + self._apply(template, fields)]
+
+        return strings
+
+    #++
+    def write(self, records, path):
+        """ Write formatted records to a file, one message per line
+
+        Args:
+            records (iterable): result records
+            path    (string):   output file path
+
+        Returns:
+            The number of records written
+        """
+        #--
+        count = 0
+        oupt = _open_output(path)
+        try:
+            for record in records:
+                for string in self.format(record):
+                    oupt.write(string + u'\n')
+                count += 1
+        finally:
+            oupt.close()
+
+        return count
+
+    #++
+    def format_matrix(self, matrix):
+        """ Format the result of the Checker matrix method as a table
+
+        Args:
+            matrix (dict): result of Checker.matrix
+
+        Returns:
+            A list of strings: a legend of the trees, a row for each patch with
+            a column for each tree, and the number of patches that pass in each tree,
+            i.e. whose cell is 'pass' or an offset
+        """
+        #--
+        trees = matrix['trees']
+        heads = ['[%d]' % (index + 1) for index in range(len(trees))]
+        strings = ['trees:']
+        strings += ['%s%s %s' % (self.indent, heads[index], trees[index]) for index in range(len(trees))]
+
+        width  = max([len('patch')] + [len(patch) for patch in matrix['patches']])
+        widths = [max(len(head), 4) for head in heads]
+        strings += ['', self._format_row('patch', heads, width, widths)]
+        passed = [0] * len(trees)
+        for (patch, row) in zip(matrix['patches'], matrix['rows']):
+            strings += [self._format_row(patch, row, width, widths)]
+            for index in range(len(row)):
+                if ((row[index] == 'pass') or (row[index][:1] in ('+', '-'))):
+                    passed[index] += 1
+        strings += [self._format_row('passed', [str(count) for count in passed], width, widths)]
+
+        return strings
+
+    def _format_row(self, label, cells, width, widths):
+
+        items = [label.ljust(width)]
+        items += [cells[index].rjust(widths[index]) for index in range(len(cells))]
+
+        return '  '.join(items).rstrip()
+
+    def _apply(self, template, fields):
+
+        if (ut.is_string_type(template)):
+            return template % fields
+        else:
+            return template(fields)
+
+#++
+class JsonSink(object):
+    """ Format result records as JSON Lines, i.e. one JSON object per line
+    """
+    #--
+
+    #++
+    def format(self, record):
+        """ Format a record
+
+        Args:
+            record (CheckResult): result record
+
+        Returns:
+            The record as a JSON encoded string
+        """
+        #--
+        return json.dumps(record.as_dict(), sort_keys=True)
+
+    #++
+    def write(self, records, path):
+        """ Write records to a file, one JSON object per line
+
+        Args:
+            records (iterable): result records
+            path    (string):   output file path
+
+        Returns:
+            The number of records written
+
+        Notes:
+            Records are written as they are produced, so memory use does not
+            grow with the size of the run.
+        """
+        #--
+        count = 0
+        oupt = _open_output(path)
+        try:
+            for record in records:
+                oupt.write(self.format(record) + u'\n')
+                count += 1
+        finally:
+            oupt.close()
+
+        return count
+
+def _open_output(path):
+
+    if ut.is_windows():
+        path = path.replace('/','\\')
+
+    return io.open(path, "w", encoding='utf-8', errors='strict')
@@ -6,19 +6,33 @@ Created on Mar 29, 2014
 
 Implement string like methods for lists of strings.
 
+The StringsView class implements the same methods for lines held in a single text
+buffer. Its slices are views of the same buffer, so splitting a large file into
+sections does not copy its lines.
+
 The module implements its own exceptions and reimplements certain utility functions,
 since the code may be useful in other projects.
 
 See the strings module section of the documentation for further information.
 '''
 
+import re
 import sys
+from array import array
+from bisect import bisect_right
 from platform import system
 # 2to3 from types import StringTypes
 
 _is_windows = ("Windows" in system())
 _is_python3 = (sys.version_info[0] >= 3) # 2to3
 
+# StringsView searches for a newline followed by a line's text. A regex that starts
+# with a literal is searched for much faster than one that starts with an anchor.
+_NEWLINE = re.compile('\n')
+# The lookahead stops the whitespace from backtracking, so a pattern that starts with
+# whitespace cannot match part of a line's leading whitespace.
+_LEADING = r'\n[^\S\n]*(?![^\S\n])' # a newline and the whitespace that lstrip would remove
+
 class StringsError(Exception):
     def __init__(self, msg):
         super(StringsError, self).__init__(msg)
@@ -602,4 +616,724 @@ class Strings(list):
         if _is_python3:
             return isinstance(param, str)
         else:
-            return isinstance(param, (str, unicode))
\ No newline at end of file
+            return isinstance(param, (str, unicode))
+
+#++
+class StringsView(object):
+    """ Provide the methods of Strings for lines held in a single text buffer
+    """
+    #--
+
+    __slots__ = ('_buffer', '_offsets', '_start', '_stop')
+
+    #++
+    def __init__(self, data=None):
+        """ Constructor
+
+        Args:
+            data (list, optional): a list of strings
+
+        Raises:
+            StringsParameterError
+
+        Notes:
+            The strings are joined into a new buffer. Use from_text to make a
+            StringsView of text that is already in one string, e.g. the data of a
+            file, without copying it.
+        """
+        #--
+
+        if (data is None):
+            data = []
+        elif (not isinstance(data, list)):
+            raise StringsParameterError('data')
+
+        try:
+            text = '\n'.join(data)
+        except TypeError:
+            raise StringsParameterError('data')
+
+        if (text.count('\n') != max(len(data) - 1, 0)):
+            raise StringsParameterError('data') # a string contains a newline
+
+        offsets = array('l', [0])
+        position = 0
+        for string in data:
+            position += len(string) + 1
+            offsets.append(position)
+
+        self._buffer  = (text + '\n') if (len(data) > 0) else text
+        self._offsets = offsets
+        self._start   = 0
+        self._stop    = len(data)
+
+    #++
+    @classmethod
+    def from_text(cls, text):
+        """ Make a StringsView of the lines of a text string
+
+        Args:
+            text (string): lines separated by newlines
+
+        Returns:
+            A StringsView object
+
+        Raises:
+            StringsParameterError
+
+        Notes:
+            A final newline does not start another line, so 'a\\nb\\n' and 'a\\nb'
+            both contain two lines, and '' contains none. The text is only copied
+            if it does not end with a newline.
+        """
+        #--
+
+        if (not _is_string(text)):
+            raise StringsParameterError('text')
+
+        if ((len(text) > 0) and (not text.endswith('\n'))):
+            text += '\n'
+
+        offsets = array('l', [0])
+        offsets.extend([match.end() for match in _NEWLINE.finditer(text)])
+
+        return cls._make(text, offsets, 0, len(offsets) - 1)
+
+    #++
+    def __getitem__(self, i):
+        """ Get a line, or a view of a range of lines
+
+        Args:
+            i (int):   item index
+            i (slice): slice of items
+            i (tuple): (start, stop, [step])
+
+        Returns:
+            A string for an index. A StringsView of the same buffer for a slice,
+            or a Strings object if the slice has a step other than 1.
+
+        Raises:
+            IndexError
+        """
+        #--
+
+        if isinstance(i, tuple):
+            if (len(i) > 2):
+                i = slice(i[0], i[1], i[2])
+            else:
+                i = slice(i[0], i[1])
+
+        length = len(self)
+        if isinstance(i, slice):
+            (start, stop, step) = i.indices(length)
+            if (step != 1):
+                return Strings([self._line(index) for index in range(start, stop, step)])
+            stop = max(start, stop)
+            return self._make(self._buffer, self._offsets, self._start + start, self._start + stop)
+
+        if (i < 0):
+            i += length
+        if ((i < 0) or (i >= length)):
+            raise IndexError('StringsView index out of range')
+
+        return self._line(i)
+
+    def __len__(self):
+
+        return self._stop - self._start
+
+    def __iter__(self):
+
+        for index in range(len(self)):
+            yield self._line(index)
+
+    def __eq__(self, other):
+
+        if isinstance(other, (list, StringsView)):
+            return ((len(self) == len(other)) and (list(self) == list(other)))
+
+        return NotImplemented
+
+    def __ne__(self, other):
+
+        equal = self.__eq__(other)
+        if (equal is NotImplemented):
+            return equal
+
+        return (not equal)
+
+    __hash__ = None
+
+    def __repr__(self):
+
+        return 'StringsView(%r)' % (list(self),)
+
+    #++
+    def to_strings(self):
+        """ Copy our lines into a Strings object
+
+        Args:
+            none
+
+        Returns:
+            A Strings object
+        """
+        #--
+
+        return Strings(self.to_text().split('\n')[:-1])
+
+    #++
+    def to_text(self):
+        """ Get the text of our lines
+
+        Args:
+            none
+
+        Returns:
+            Our lines as a single string, each followed by a newline
+        """
+        #--
+
+        return self._buffer[self._offsets[self._start]:self._offsets[self._stop]]
+
+    #++
+    def find(self, pattern, begin=None, end=None):
+        """ Find the first string in our data that starts with (pattern)
+
+        Args:
+            pattern (str):  the substring to match
+            begin   (int):  start index
+            end     (int):  stop index
+
+        Returns:
+            Found: the index of matching string
+            Not found: -1
+
+        Raises:
+            StringsParameterError
+
+        Notes:
+            See Strings.find
+        """
+        #--
+        index, _ = self.match([pattern], begin, end)
+
+        return index
+
+    #++
+    def match(self, patterns, begin=None, end=None):
+        """ Find the first string in our data that starts with a pattern in (patterns)
+
+        Args:
+            patterns (list): The substrings to match
+            begin    (int):  Start index
+            end      (int):  Stop index
+
+        Returns:
+            Found: the index of matching string, and the matching pattern
+            Not found: -1, ''
+
+        Raises:
+            StringsParameterError
+
+        Notes:
+            See Strings.match. The buffer is searched by a single regular expression,
+            without making a string for each line.
+        """
+        #--
+
+        regex  = self._compile_patterns(patterns)
+        length = len(self)
+        begin  = min(max(self._check_index_param('begin', begin, 0), 0), length)
+        end    = min(max(self._check_index_param('end', end, length), 0), length)
+
+        if (begin > end):
+            raise StringsParameterError('begin, end')
+
+        if (regex is not None):
+            for (index, match) in self._scan(regex, begin, end):
+                return index, match.group(1)
+
+        return -1, ''
+
+    #++
+    def rfind(self, pattern, begin=None, end=None):
+        """ Find the last string in our data that starts with (pattern)
+
+        Args:
+            pattern (str):  the substring to match
+            begin   (int):  start index
+            end     (int):  stop index
+
+        Returns:
+            Found: the index of matching string
+            Not found: -1
+
+        Raises:
+            StringsParameterError
+
+        Notes:
+            See Strings.rfind
+        """
+        #--
+        index, _ = self.rmatch([pattern], begin, end)
+
+        return index
+
+    #++
+    def rmatch(self, patterns, begin=None, end=None):
+        """ Find the last string in our data that starts with a string in (patterns)
+
+        Args:
+            patterns (list): The substrings to match
+            begin    (int):  Start index
+            end      (int):  Stop index
+
+        Returns:
+            Found: the index of matching string, and the matching pattern
+            Not found: -1, ''
+
+        Raises:
+            StringsParameterError
+
+        Notes:
+            See Strings.rmatch
+        """
+        #--
+
+        regex  = self._compile_patterns(patterns)
+        length = len(self)
+        begin  = min(self._check_index_param('begin', begin, length - 1), length - 1)
+        end    = max(self._check_index_param('end', end, -1), -1)
+
+        if (begin < end):
+            raise StringsParameterError('begin, end')
+
+        if (regex is not None):
+            for index in range(begin, end, -1):
+                match = self._match_line(regex, index)
+                if (match is not None):
+                    return index, match.group(1)
+
+        return -1, ''
+
+    #++
+    def filter(self, pattern, begin=None, end=None):
+        """ Find all strings in our data that start with (pattern)
+
+        Args:
+            pattern (str):  the substring to match
+            begin   (int):  start index
+            end     (int):  stop index
+
+        Returns:
+            A list of the indices of the matching strings
+
+        Raises:
+            StringsParameterError
+
+        Notes:
+            If begin is not specified, it is set to 0
+            If end is not specified, it is set to len(self).
+            All strings are left stripped before testing.
+        """
+        #--
+
+        regex  = self._compile_patterns([pattern])
+        length = len(self)
+        begin  = min(max(self._check_index_param('begin', begin, 0), 0), length)
+        end    = min(max(self._check_index_param('end', end, length), 0), length)
+
+        if (begin > end):
+            raise StringsParameterError('begin, end')
+
+        return [index for (index, _) in self._scan(regex, begin, end)]
+
+    #++
+    def index(self, pattern):
+        """ Return indices of strings that exactly match (pattern)
+
+        Args:
+            pattern (string): search text
+
+        Raises:
+            StringsParameterError
+        """
+        #--
+
+        pattern = self._check_string_param('pattern', pattern)
+        regex = re.compile(r'\n(%s)(?=\n)' % re.escape(pattern))
+
+        return [index for (index, _) in self._scan(regex, 0, len(self))]
+
+    #++
+    def lstrip(self):
+        """ Remove leading lines that are empty or whitespace
+
+        Args:
+            none
+
+        Returns:
+            self, to allow chaining to slices, other methods
+
+        Notes:
+            Only the view is changed, not the buffer
+        """
+        #--
+
+        while ((len(self) > 0) and (len(self._line(0).strip()) == 0)):
+            self._start += 1
+
+        return self
+
+    #++
+    def rstrip(self):
+        """ Remove trailing lines that are empty or whitespace.
+
+        Args:
+            none
+
+        Returns:
+            self, to allow chaining to slices, other methods
+
+        Notes:
+            Only the view is changed, not the buffer
+        """
+        #--
+
+        while ((len(self) > 0) and (len(self._line(len(self) - 1).strip()) == 0)):
+            self._stop -= 1
+
+        return self
+
+    #++
+    def partition(self, splitter):
+        """ Split our data into two parts at a splitter pattern, searching forwards
+
+        Args:
+            splitter (str): The substring that splits the parts
+
+        Returns:
+            splitter was found:
+                A tuple (head, tail) of StringsView objects
+            splitter was not found:
+                (self, None)
+        """
+        #--
+
+        index = self.find(splitter)
+        if (index != -1):
+            return (self[:index], self[index:])
+        else:
+            return (self, None)
+
+    #++
+    def rpartition(self, splitter):
+        """ Split our data into two parts at a splitter pattern, searching backwards
+
+        Args:
+            splitter (str): The substring that splits the parts
+
+        Returns:
+            splitter was found:
+                A tuple (body, tail) of StringsView objects
+            splitter was not found:
+                (None, self)
+        """
+        #--
+
+        index = self.rfind(splitter)
+        if (index != -1):
+            return (self[:index], self[index:])
+        else:
+            return (None, self)
+
+    #++
+    def split(self, splitter):
+        """ Split our data into two or more parts at occurrences of a splitter pattern
+
+        Args:
+            splitter (str): The substring that splits the parts
+
+        Returns:
+            A list of StringsView objects, each of which contains a part
+
+        Raises:
+            StringsParameterError
+
+        Notes:
+            See Strings.split
+        """
+        #--
+
+        matches = self.filter(splitter)
+        if (len(matches) == 0):
+            return [self[:]]
+
+        parts = []
+        if (matches[0] > 0):
+            parts += [self[:matches[0]]]
+        for index in range(len(matches) - 1):
+            parts += [self[matches[index]:matches[index + 1]]]
+        parts += [self[matches[-1]:]]
+
+        return parts
+
+    #++
+    def extract(self, begin, end):
+        """ Extract a list of sections tagged by (begin) and (end)
+
+        Args:
+            begin (str): section start marker
+            end   (str): section end marker
+
+        Returns:
+            A list of StringsView objects, one for each extracted section
+
+        Notes:
+            See Strings.extract
+        """
+        #--
+
+        begin = re.escape(self._check_string_param('begin', begin))
+        end   = re.escape(self._check_string_param('end', end))
+        regex = re.compile(_LEADING + r'(?:(%s)|(%s))[^\S\n]*(?=\n)' % (begin, end), re.U)
+
+        sections = []
+        start = 0
+        for (index, match) in self._scan(regex, 0, len(self)):
+            if (match.group(1) is not None):
+                start = index + 1
+            else:
+                sections += [self[start:index]]
+
+        return sections
+
+    #++
+    def discard(self, begin, end):
+        """ Remove a list of sections tagged by (begin) and (end)
+
+        Args:
+            begin (str): section start marker
+            end   (str): section end marker
+
+        Returns:
+            A StringsView object, with a new buffer holding the remaining lines
+
+        Notes:
+            The begin and end markers are not returned in the output
+        """
+        #--
+
+        regex  = self._compile_patterns([begin, end])
+        ranges = []
+        first  = 0
+        state  = 0
+        matches = self._scan(regex, 0, len(self)) if (regex is not None) else []
+        for (index, _) in matches:
+            string = self._line(index).lstrip()
+            if (state == 0):
+                if (string.startswith(begin)):
+                    ranges += [(first, index)]
+                    state = 1
+            elif (string.startswith(end)):
+                first = index + 1
+                state = 0
+
+        if (state == 0):
+            ranges += [(first, len(self))]
+
+        return self._copy_ranges(ranges)
+
+    #++
+    def ltrim(self, pattern):
+        """ Remove text to start of pattern from our strings.
+
+        Args:
+            pattern (string) splitter pattern
+
+        Returns:
+            A Strings object, since the buffer is not changed
+        """
+        #--
+        return self.to_strings().ltrim(pattern)
+
+    #++
+    def rtrim(self, pattern):
+        """ Remove text beginning with pattern from our strings.
+
+        Args:
+            pattern (string) splitter pattern
+
+        Returns:
+            A Strings object, since the buffer is not changed
+        """
+        #--
+        return self.to_strings().rtrim(pattern)
+
+    #++
+    def sort(self):
+        """ Sort our data.
+
+        Args:
+            none
+
+        Returns:
+            A Strings object, since the buffer is not changed
+        """
+        #--
+        return self.to_strings().sort()
+
+    #++
+    def unique(self):
+        """ Remove duplicate successive instances of strings in our data.
+
+        Args:
+            none
+
+        Returns:
+            A Strings object, since the buffer is not changed
+        """
+        #--
+        return self.to_strings().unique()
+
+    #++
+    @staticmethod
+    def join(lists):
+        """ Join a list of objects into a single StringsView object.
+
+        Args:
+            lists (list): list of list, Strings or StringsView objects
+
+        Returns:
+            A StringsView object containing all strings in the lists
+
+        Raises:
+            StringsParameterError
+        """
+        #--
+
+        if ((not isinstance(lists, list)) or (len(lists) == 0)):
+            raise StringsParameterError('lists')
+
+        texts = []
+        for item in lists:
+            if isinstance(item, StringsView):
+                texts += [item.to_text()]
+            elif isinstance(item, list):
+                if (len(item) > 0):
+                    texts += ['\n'.join(item) + '\n']
+            else:
+                raise StringsParameterError('lists')
+
+        return StringsView.from_text(''.join(texts))
+
+    @classmethod
+    def _make(cls, buffer_, offsets, start, stop):
+        ''' Make a view of lines start..stop-1 of a buffer, without copying it.
+        '''
+        view = cls.__new__(cls)
+        view._buffer  = buffer_
+        view._offsets = offsets
+        view._start   = start
+        view._stop    = stop
+
+        return view
+
+    def _line(self, index):
+
+        index += self._start
+
+        return self._buffer[self._offsets[index]:self._offsets[index + 1] - 1]
+
+    def _position(self, index):
+        ''' Get the buffer position of the start of a line of the view.
+        '''
+        return self._offsets[self._start + index]
+
+    def _index_at(self, position):
+        ''' Get the index of the line of the view that contains a buffer position.
+        '''
+        return bisect_right(self._offsets, position, self._start, self._stop) - 1 - self._start
+
+    def _scan(self, regex, begin, end):
+        ''' Generate (index, match) for the lines in begin..end-1 that match regex, which
+            matches the newline before a line and then text within the line.
+        '''
+        start = self._position(begin)
+        stop  = self._position(end)
+        if (start >= stop):
+            return
+
+        if (start == 0): # no newline precedes the first line of the buffer
+            match = self._match_line(regex, begin)
+            if (match is not None):
+                yield (begin, match)
+            start = self._position(begin + 1)
+
+        for match in regex.finditer(self._buffer, start - 1, stop):
+            yield (self._index_at(match.end() - 1), match)
+
+    def _match_line(self, regex, index):
+
+        position = self._position(index)
+        if (position == 0):
+            return regex.match('\n' + self._line(index) + '\n')
+
+        return regex.match(self._buffer, position - 1, self._position(index + 1))
+
+    def _copy_ranges(self, ranges):
+        ''' Make a StringsView of a new buffer holding ranges of our lines.
+        '''
+        texts   = []
+        offsets = array('l', [0])
+        base    = 0
+        for (first, last) in ranges:
+            if (first >= last):
+                continue
+            (first, last) = (self._start + first, self._start + last)
+            shift = base - self._offsets[first]
+            offsets.extend([offset + shift for offset in self._offsets[first + 1:last + 1]])
+            texts += [self._buffer[self._offsets[first]:self._offsets[last]]]
+            base = offsets[-1]
+
+        return self._make(''.join(texts), offsets, 0, len(offsets) - 1)
+
+    def _compile_patterns(self, patterns):
+        ''' Compile a regex that matches lines that start with one of the patterns,
+            after leading whitespace. Group 1 is the matching pattern.
+        '''
+        if (not isinstance(patterns, list)):
+            raise StringsParameterError('patterns')
+
+        # A pattern that contains a newline cannot match the start of a line
+        patterns = [self._check_string_param('pattern', pattern) for pattern in patterns]
+        texts = [re.escape(pattern) for pattern in patterns if ('\n' not in pattern)]
+        if (len(texts) == 0):
+            return None
+
+        return re.compile(_LEADING + '(%s)' % '|'.join(texts), re.U)
+
+    def _check_index_param(self, name, value, default):
+
+        if (value is None):
+            return default
+
+        if (isinstance(value, int)):
+            return value
+        else:
+            raise StringsParameterError(name)
+
+    def _check_string_param(self, name, value):
+
+        if (_is_string(value) and (len(value) > 0)):
+            return value
+        else:
+            raise StringsParameterError(name)
+
+def _is_string(param):
+
+    if _is_python3:
+        return isinstance(param, str)
+    else:
+        return isinstance(param, (str, unicode))
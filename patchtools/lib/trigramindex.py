@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Index the trigrams (3 character substrings) of the files in a source tree, so
+that a search can be narrowed to the files that could contain its patterns.
+
+For each trigram, the index holds a list of the ids of the files that contain
+it. A file can only contain a string if it contains all the string's trigrams,
+so the candidates for a string are found by intersecting a few lists, without
+reading any file.
+
+The index is stored on disk, and updated from the modification times and sizes
+of the files: only new and changed files are read. A changed or removed file's
+id is retired, not removed from the lists, and the lists are compacted when the
+retired ids outnumber the live ones.
+
+The index is stored as a small manifest, holding the stamp, id and digest of each
+file, and a series of segments, each holding the lists of the files added by one
+update. An update only writes the manifest and a segment for the files it added,
+so its cost depends on the number of changed files, not on the size of the tree.
+Loading the index reads all the segments: for a large tree this takes seconds, so
+an index should be kept in memory for a series of searches, as the Helper does.
+'''
+
+import io
+import os
+import sys
+import hashlib
+from array import array
+
+try:
+    import cPickle as pickle # Python 2
+except ImportError:
+    import pickle
+
+from patchtools.lib.ptobject   import PTObject
+from patchtools.lib.exceptions import PT_ParameterError
+from patchtools.lib.functions  import Functions as ut
+
+# os.rename does not replace an existing file on Windows
+_replace = getattr(os, 'replace', os.rename)
+
+# Stored indexes are only read by the Python major version that wrote them, and
+# the format number is changed whenever the stored data changes
+_FORMAT = 2
+_SUFFIX = '.%d.py%d' % (_FORMAT, sys.version_info[0])
+
+# The segments are merged into one when there are more than this many
+_MAX_SEGMENTS = 16
+
+#++
+class TrigramIndex(PTObject):
+    """ Persistent trigram index of the files in a source tree
+    """
+    #--
+
+    #++
+    def __init__(self, params):
+        """ Constructor
+
+        Args:
+            params (dict): parameters
+                root_path (string, required): path of file tree root
+                indexdir  (string, required): path to index directory
+
+        Raises:
+            PT_ParameterError
+
+        Notes:
+            The indexes of several trees may be stored in the same directory.
+        """
+        #--
+
+        self.name = 'TrigramIndex'
+
+        if ((params is None) or (not isinstance(params, dict))):
+            raise PT_ParameterError(self.name, 'params')
+
+        self.root_path = self._check_required_string_param(params, 'root_path')
+        self._check_path_param('root_path', self.root_path)
+
+        self.indexdir = self._check_required_string_param(params, 'indexdir')
+        self._check_path_param('indexdir', self.indexdir)
+
+        digest = hashlib.sha1(os.path.abspath(self.root_path).encode('utf-8')).hexdigest()
+        self._base = ut.join_path(self.indexdir, 'trigrams.' + digest + _SUFFIX)
+
+        self._files    = None # path: (stamp, id, digest) of each indexed file, once loaded
+        self._paths    = None # id: path of each live id
+        self._postings = None # trigram: array of ids of the files that contain it
+        self._added    = None # trigram: array of the ids added since the last save
+        self._segments = None # names of the stored segments
+        self._serial   = 0    # number of the next segment
+        self._next_id  = 0
+
+    #++
+    def update(self, file_paths):
+        """ Bring the index up to date with a set of files
+
+        Args:
+            file_paths (list): paths of the files to index, relative to root_path
+
+        Returns:
+            The number of files that were indexed
+
+        Notes:
+            Indexed files that are not in (file_paths) are kept, so that a search of
+            part of the tree does not remove the rest of it, unless they no longer
+            exist. A file whose stamp changed but whose contents did not keeps its
+            entry. The changes, if any, are saved.
+        """
+        #--
+
+        if (self._files is None):
+            self._load()
+
+        changed = False
+        wanted = set(file_paths)
+        for path in list(self._files):
+            if ((path not in wanted) and (ut.file_stamp(ut.join_path(self.root_path, path)) is None)):
+                self._retire(path)
+                changed = True
+
+        count = 0
+        for path in file_paths:
+            stamp = ut.file_stamp(ut.join_path(self.root_path, path))
+            entry = self._files.get(path)
+            if ((entry is not None) and (entry[0] == stamp)):
+                continue
+            changed = True
+            if (stamp is None):
+                self._retire(path)
+                continue
+            digest = ut.file_hash(ut.join_path(self.root_path, path))
+            if ((entry is not None) and (entry[2] == digest)): # only the stamp changed
+                self._files[path] = (stamp, entry[1], digest)
+                continue
+            if (entry is not None):
+                self._retire(path)
+            self._add(path, stamp, digest, ut.read_file(ut.join_path(self.root_path, path)))
+            count += 1
+
+        if changed:
+            if ((self._next_id - len(self._paths)) > len(self._paths)):
+                self._compact()
+            self._save()
+
+        return count
+
+    #++
+    def candidates(self, literals):
+        """ Find the indexed files that could contain any of a list of strings
+
+        Args:
+            literals (list): strings, e.g. the literals of a Matcher, or None
+
+        Returns:
+            A set of the paths of the files that contain all the trigrams of at least
+            one of the strings, or None if the files cannot be narrowed, i.e. if
+            (literals) is None or contains a string shorter than 3 characters.
+
+        Notes:
+            The set may include indexed files that the caller is not searching.
+        """
+        #--
+
+        if (literals is None):
+            return None
+
+        if (self._files is None):
+            self._load()
+
+        ids = set()
+        for literal in literals:
+            if (len(literal) < 3):
+                return None
+            postings = [self._postings.get(trigram, ()) for trigram in _trigrams(literal)]
+            postings.sort(key=len)
+            found = set(postings[0])
+            for ids_ in postings[1:]:
+                if (len(found) == 0):
+                    break
+                found.intersection_update(ids_)
+            ids.update(found)
+
+        return set([self._paths[id_] for id_ in ids if id_ in self._paths])
+
+    def __len__(self):
+
+        if (self._files is None):
+            self._load()
+
+        return len(self._files)
+
+    def _add(self, path, stamp, digest, data):
+
+        id_ = self._next_id
+        self._next_id += 1
+        for trigram in _trigrams(data):
+            for postings in (self._postings, self._added):
+                ids = postings.get(trigram)
+                if (ids is None):
+                    postings[trigram] = array('i', [id_])
+                else:
+                    ids.append(id_)
+
+        self._files[path] = (stamp, id_, digest)
+        self._paths[id_]  = path
+
+    def _retire(self, path):
+        ''' Remove a file from the index. Its id stays in the posting lists until
+            they are compacted, but is no longer live.
+        '''
+        entry = self._files.pop(path, None)
+        if (entry is not None):
+            del self._paths[entry[1]]
+
+    def _compact(self):
+        ''' Renumber the live ids from 0, removing the retired ids from the lists.
+            The lists are then saved as a single segment.
+        '''
+        renumber = {}
+        for id_ in sorted(self._paths):
+            renumber[id_] = len(renumber)
+
+        postings = {}
+        for (trigram, ids) in self._postings.items():
+            ids = array('i', [renumber[id_] for id_ in ids if id_ in renumber])
+            if (len(ids) > 0):
+                postings[trigram] = ids
+
+        self._postings = postings
+        self._added    = dict([(trigram, array('i', ids)) for (trigram, ids) in postings.items()])
+        self._files = dict([(path, (stamp, renumber[id_], digest))
+                            for (path, (stamp, id_, digest)) in self._files.items()])
+        self._paths = dict([(id_, path) for (path, (_, id_, _)) in self._files.items()])
+        self._next_id = len(renumber)
+        self._segments = [] # replaced by the saved segment
+
+    def _load(self):
+        ''' Read the stored manifest and segments, or start an empty index if they
+            are missing or damaged.
+        '''
+        self._files, self._paths, self._postings, self._added = {}, {}, {}, {}
+        self._segments, self._serial, self._next_id = [], 0, 0
+
+        state = _read_pickle(self._base + '.pickle')
+        if ((not isinstance(state, dict)) or (state.get('root_path') != self.root_path)):
+            return
+
+        postings = {}
+        for name in state['segments']:
+            segment = _read_pickle(ut.join_path(self.indexdir, name))
+            if (not isinstance(segment, dict)): # removed, or damaged by an interrupted run
+                return
+            for (trigram, ids) in segment.items():
+                if (trigram in postings):
+                    postings[trigram].extend(ids)
+                else:
+                    postings[trigram] = ids
+
+        self._files    = state['files']
+        self._postings = postings
+        self._segments = state['segments']
+        self._serial   = state['serial']
+        self._next_id  = state['next_id']
+        self._paths    = dict([(id_, path) for (path, (_, id_, _)) in self._files.items()])
+
+    def _save(self):
+        ''' Write a segment of the lists added since the last save, if any, then the
+            manifest. Segments that the manifest no longer names are removed.
+        '''
+        if ((len(self._segments) >= _MAX_SEGMENTS) and (len(self._added) > 0)):
+            self._added = dict([(trigram, array('i', ids)) for (trigram, ids) in self._postings.items()])
+            self._segments = []
+
+        if (len(self._added) > 0):
+            name = '%s.%d.segment' % (os.path.basename(self._base), self._serial)
+            self._serial += 1
+            _write_pickle(ut.join_path(self.indexdir, name), self._added)
+            self._segments = self._segments + [name]
+            self._added = {}
+
+        state = { 'root_path' : self.root_path, 'files' : self._files, 'segments' : self._segments,
+                  'serial' : self._serial, 'next_id' : self._next_id }
+        _write_pickle(self._base + '.pickle', state)
+
+        prefix = os.path.basename(self._base) + '.'
+        for filename in os.listdir(self.indexdir):
+            if (filename.startswith(prefix) and filename.endswith('.segment') and
+                (filename not in self._segments)):
+                try:
+                    os.remove(ut.join_path(self.indexdir, filename))
+                except OSError: # removed by another process
+                    pass
+
+def _read_pickle(path):
+    ''' Read a pickled object, or return None if the file is missing or damaged.
+    '''
+    try:
+        inpt = io.open(path, 'rb')
+    except (IOError, OSError):
+        return None
+
+    try:
+        return pickle.loads(inpt.read())
+    except Exception: # damaged by an interrupted run
+        return None
+    finally:
+        inpt.close()
+
+def _write_pickle(path, value):
+
+    data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    # Write to a temporary file first, so that a reader never sees a partial file
+    temp = '%s.%d.tmp' % (path, os.getpid())
+    outp = io.open(temp, 'wb')
+    try:
+        outp.write(data)
+    finally:
+        outp.close()
+    _replace(temp, path)
+
+def _trigrams(text):
+    ''' Get the set of trigrams of a string.
+    '''
+    return set(map(''.join, zip(text, text[1:], text[2:])))
@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Tests of the Checker.
+'''
+
+import os
+import shutil
+import tempfile
+import subprocess
+import unittest
+
+from patchtools.lib.checker import Checker
+
+# The example patch series, whose source files are in the same directory
+_QUILT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      'patchtools', 'examples', 'capemgr', 'quilt')
+
+def _read_series():
+
+    with open(os.path.join(_QUILT, 'series')) as inpt:
+        return [line.strip() for line in inpt if (len(line.strip()) > 0)]
+
+def _match_examples(quilt=_QUILT, **params):
+    ''' Check the example series in each output mode, with and without find.
+    '''
+    output = {}
+    for mode in ('full', 'complete'):
+        for find in (False, True):
+            params.update({ 'sourcedir' : quilt,
+                            'patchdir'  : os.path.join(quilt, 'patches'),
+                            'mode'      : mode,
+                            'find'      : find })
+            output[(mode, find)] = Checker(params).match(_read_series())
+
+    return output
+
+_SOURCE = 'int a;\nint b;\nint c;\nint d;\n'
+
+_PATCH = '''From: Someone <someone@example.com>
+Subject: [PATCH] change b
+
+---
+diff --git a/foo.c b/foo.c
+--- a/foo.c
++++ b/foo.c
+@@ -1,3 +1,3 @@
+ int a;
+-int b;
++int bb;
+ int c;
+-- 
+1.8.3
+'''
+
+class TestParallel(unittest.TestCase):
+
+    def test_parallel_output_matches_sequential(self):
+
+        expected = _match_examples()
+        self.assertEqual(_match_examples(workers=2), expected)
+        self.assertEqual(_match_examples(workers=3, relocate=True), _match_examples(relocate=True))
+
+class TestStoredResults(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tempdir = tempfile.mkdtemp()
+        for name in ('source', 'patches', 'results'):
+            os.mkdir(os.path.join(self.tempdir, name))
+        with open(os.path.join(self.tempdir, 'source', 'foo.c'), 'w') as outp:
+            outp.write(_SOURCE)
+        for name in ('a.patch', 'b.patch'):
+            with open(os.path.join(self.tempdir, 'patches', name), 'w') as outp:
+                outp.write(_PATCH)
+
+    def tearDown(self):
+
+        shutil.rmtree(self.tempdir)
+
+    def _check(self, name):
+
+        checker = Checker({ 'sourcedir' : os.path.join(self.tempdir, 'source'),
+                            'patchdir'  : os.path.join(self.tempdir, 'patches'),
+                            'resultdir' : os.path.join(self.tempdir, 'results'),
+                            'mode'      : 'complete' })
+
+        return '\n'.join(checker.match([name]))
+
+    def test_identical_patches_report_own_names(self):
+
+        for _ in range(2): # the second pass replays the stored results
+            output = self._check('a.patch')
+            self.assertIn('a.patch', output)
+            output = self._check('b.patch')
+            self.assertIn('b.patch', output)
+            self.assertNotIn('a.patch', output)
+
+    def test_replayed_results_match_checked_results(self):
+
+        quilt = os.path.join(self.tempdir, 'quilt')
+        shutil.copytree(_QUILT, quilt)
+        resultdir = os.path.join(self.tempdir, 'results')
+        expected = _match_examples(quilt)
+        self.assertEqual(_match_examples(quilt, resultdir=resultdir), expected)
+        self.assertTrue(len(os.listdir(resultdir)) > 0)
+        self.assertEqual(_match_examples(quilt, resultdir=resultdir), expected)
+
+        # Results that refer to a changed source file are not used
+        path = os.path.join(quilt, 'drivers', 'misc', 'cape', 'beaglebone', 'capemgr.c')
+        with open(path) as inpt:
+            lines = inpt.readlines()
+        with open(path, 'w') as outp:
+            outp.writelines(lines[:len(lines) // 2])
+        expected = _match_examples(quilt)
+        self.assertEqual(_match_examples(quilt, resultdir=resultdir), expected)
+
+# The old file has no final newline, so the hunk has '\\ No newline' markers
+_NO_NEWLINE_SOURCE = 'int a;\nint b;\nint c;\nint d;'
+
+_NO_NEWLINE_PATCH = '''diff --git a/foo.c b/foo.c
+--- a/foo.c
++++ b/foo.c
+@@ -1,4 +1,4 @@
+ int a;
+ int b;
+ int c;
+-int d;
+\\ No newline at end of file
++int dd;
+\\ No newline at end of file
+'''
+
+class TestProfile(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tempdir = tempfile.mkdtemp()
+        for name in ('source', 'patches'):
+            os.mkdir(os.path.join(self.tempdir, name))
+        with open(os.path.join(self.tempdir, 'source', 'foo.c'), 'w') as outp:
+            outp.write(_SOURCE)
+        with open(os.path.join(self.tempdir, 'patches', 'a.patch'), 'w') as outp:
+            outp.write(_PATCH.replace('-int b;\n+int bb;\n', '+int z;\n int b;\n')
+                             .replace('@@ -1,3 +1,3 @@', '@@ -1,3 +1,4 @@'))
+
+    def tearDown(self):
+
+        shutil.rmtree(self.tempdir)
+
+    def test_lines_compared_counts_comparisons(self):
+
+        checker = Checker({ 'sourcedir' : os.path.join(self.tempdir, 'source'),
+                            'patchdir'  : os.path.join(self.tempdir, 'patches'),
+                            'profile'   : True })
+        checker.match(['a.patch'])
+        totals = checker.get_profile()['totals']
+        self.assertEqual(totals['patches'], 1)
+        self.assertEqual(totals['lines_compared'], 4) # 3 merge lines and 1 add line
+
+def _first_rejected(series, fuzz, workdir):
+    ''' Apply the patches of a series to a copy of the example tree with GNU patch,
+        returning the index of the first patch that is rejected, or -1 if none is.
+        Returns None if patch is not available.
+    '''
+    quilt = os.path.join(workdir, 'quilt')
+    shutil.rmtree(quilt, True)
+    shutil.copytree(_QUILT, quilt)
+    for index in range(len(series)):
+        try:
+            with open(os.path.join(quilt, 'patches', series[index]), 'rb') as inpt:
+                process = subprocess.Popen(['patch', '-p1', '-F%d' % fuzz, '-s', '-f', '-r', '-'], cwd=quilt,
+                                           stdin=inpt, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                process.communicate()
+        except OSError:
+            return None
+        if (process.returncode != 0):
+            return index
+
+    return -1
+
+class TestBisect(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tempdir = tempfile.mkdtemp()
+        for name in ('source', 'patches'):
+            os.mkdir(os.path.join(self.tempdir, name))
+        with open(os.path.join(self.tempdir, 'source', 'foo.c'), 'w') as outp:
+            outp.write(_SOURCE)
+        with open(os.path.join(self.tempdir, 'patches', 'a.patch'), 'w') as outp:
+            outp.write(_PATCH)
+        with open(os.path.join(self.tempdir, 'patches', 'b.patch'), 'w') as outp:
+            outp.write(_PATCH.replace(' int a;', ' int x;'))
+
+    def tearDown(self):
+
+        shutil.rmtree(self.tempdir)
+
+    def _bisect(self, names):
+
+        checker = Checker({ 'sourcedir' : os.path.join(self.tempdir, 'source'),
+                            'patchdir'  : os.path.join(self.tempdir, 'patches') })
+
+        return checker.bisect(names)
+
+    def test_all_pass(self):
+
+        result = self._bisect(['a.patch', 'a.patch'])
+        self.assertIsNone(result['patch'])
+        self.assertEqual(result['index'], -1)
+        self.assertEqual(result['tested'], 2)
+
+    def test_failure_counts_failing_patch(self):
+
+        result = self._bisect(['a.patch', 'b.patch'])
+        self.assertEqual(result['patch'], 'b.patch')
+        self.assertEqual(result['index'], 1)
+        self.assertEqual(result['error'], 'hunk_not_found')
+        self.assertEqual(result['tested'], 2)
+
+    def test_path_failure_is_not_tested(self):
+
+        with open(os.path.join(self.tempdir, 'patches', 'c.patch'), 'w') as outp:
+            outp.write(_PATCH.replace('foo.c', 'bar.c'))
+        result = self._bisect(['a.patch', 'c.patch'])
+        self.assertEqual(result['patch'], 'c.patch')
+        self.assertIsNone(result['hunk'])
+        self.assertEqual(result['tested'], 1)
+
+    def test_series_failure_matches_gnu_patch(self):
+
+        # The example series with each patch left out, and with each pair of patches swapped
+        series = _read_series()
+        cases = ([series[:index] + series[index + 1:] for index in range(1, len(series))] +
+                 [series[:index] + [series[index + 1], series[index]] + series[index + 2:]
+                  for index in range(1, len(series) - 1)])
+        failed = set()
+        for fuzz in (0, 2):
+            checker = Checker({ 'sourcedir' : _QUILT,
+                                'patchdir'  : os.path.join(_QUILT, 'patches'),
+                                'series'    : True,
+                                'relocate'  : True,
+                                'fuzz'      : fuzz })
+            for names in [series] + cases:
+                expected = _first_rejected(names, fuzz, self.tempdir)
+                if (expected is None):
+                    self.skipTest('patch is not available')
+                result = checker.bisect(names)
+                self.assertEqual(result['index'], expected, (fuzz, names))
+                failed.add(expected)
+        self.assertTrue(len(failed) > 3)
+
+class TestNoNewline(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tempdir = tempfile.mkdtemp()
+        for name in ('source', 'patches'):
+            os.mkdir(os.path.join(self.tempdir, name))
+        with open(os.path.join(self.tempdir, 'source', 'foo.c'), 'w') as outp:
+            outp.write(_NO_NEWLINE_SOURCE)
+        with open(os.path.join(self.tempdir, 'patches', 'd.patch'), 'w') as outp:
+            outp.write(_NO_NEWLINE_PATCH)
+
+    def tearDown(self):
+
+        shutil.rmtree(self.tempdir)
+
+    def _checker(self, **params):
+
+        params.update({ 'sourcedir' : os.path.join(self.tempdir, 'source'),
+                        'patchdir'  : os.path.join(self.tempdir, 'patches') })
+
+        return Checker(params)
+
+    def test_bisect_skips_no_newline_markers(self):
+
+        result = self._checker().bisect(['d.patch'])
+        self.assertIsNone(result['patch'])
+        self.assertIsNone(result['error'])
+
+    def test_matrix_skips_no_newline_markers(self):
+
+        sourcedir = os.path.join(self.tempdir, 'source')
+        result = self._checker().matrix(['d.patch'], [sourcedir])
+        self.assertEqual(result['rows'], [['pass']])
+
+    def _write_source(self, text):
+
+        with open(os.path.join(self.tempdir, 'source', 'foo.c'), 'w') as outp:
+            outp.write(text)
+
+    def test_relocate_skips_no_newline_markers(self):
+
+        self._write_source('int x;\nint y;\n' + _NO_NEWLINE_SOURCE)
+        checker = self._checker(relocate=True)
+        self.assertIsNone(checker.bisect(['d.patch'])['error'])
+        sourcedir = os.path.join(self.tempdir, 'source')
+        self.assertEqual(checker.matrix(['d.patch'], [sourcedir])['rows'], [['+2']])
+        output = '\n'.join(self._checker(relocate=True, mode='complete').match(['d.patch']))
+        self.assertIn('hunk found at 3 (offset 2 lines)', output)
+
+    def test_fuzz_before_first_line_is_not_found(self):
+
+        # Ignoring 2 leading merge lines would place the hunk at line -1
+        self._write_source('int c;\nint d;\n')
+        with open(os.path.join(self.tempdir, 'patches', 'e.patch'), 'w') as outp:
+            outp.write(_NO_NEWLINE_PATCH.replace('\\ No newline at end of file\n', ''))
+        checker = self._checker(relocate=True, fuzz=2)
+        self.assertEqual(checker.bisect(['e.patch'])['error'], 'hunk_not_found')
+        sourcedir = os.path.join(self.tempdir, 'source')
+        self.assertEqual(checker.matrix(['e.patch'], [sourcedir])['rows'], [['fail']])
+        output = '\n'.join(self._checker(relocate=True, fuzz=2, mode='complete').match(['e.patch']))
+        self.assertNotIn('hunk found at', output)
+
+if __name__ == '__main__':
+    unittest.main()
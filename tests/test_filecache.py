@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Tests of FileCache and SourceFile.
+'''
+
+import io
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from patchtools.lib.filecache import FileCache, SourceFile
+from patchtools.lib.functions import Functions as ut
+
+# A source file of the example patch series
+_SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       'patchtools', 'examples', 'capemgr', 'quilt',
+                       'drivers', 'misc', 'cape', 'beaglebone', 'capemgr.c')
+
+try:
+    import tracemalloc
+except ImportError: # Python 2
+    tracemalloc = None
+
+def _use(source):
+    ''' Build all the data a SourceFile derives from its lines.
+    '''
+    source.find('int a;')
+    source.locate(['int b;'], 0)
+    source.get_digest()
+
+class TestFileCacheSize(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tempdir = tempfile.mkdtemp()
+        self.paths = []
+        for index in range(8):
+            path = os.path.join(self.tempdir, 'file%d.c' % index)
+            with io.open(path, 'w') as outp:
+                for line in range(2000):
+                    outp.write(u'int a%d_%d = %d;\n' % (index, line, line % 7))
+            self.paths += [path]
+
+    def tearDown(self):
+
+        shutil.rmtree(self.tempdir)
+
+    def check_sizes(self, cache):
+
+        total = 0
+        for (_, source, size) in cache._entries.values():
+            self.assertEqual(size, source.get_size())
+            total += size
+        self.assertEqual(cache._size, total)
+        self.assertTrue(cache._size <= cache.max_bytes)
+
+    def test_derived_data_is_charged(self):
+
+        cache = FileCache()
+        source = cache.get(self.paths[0])
+        inserted = cache._size
+        self.assertTrue(inserted > os.path.getsize(self.paths[0]))
+        _use(source)
+        self.assertTrue(cache._size > 2 * inserted)
+        self.check_sizes(cache)
+
+    def test_max_bytes_holds(self):
+
+        cache = FileCache()
+        source = cache.get(self.paths[0])
+        _use(source)
+        cache = FileCache({ 'max_bytes' : 7 * source.get_size() // 2 })
+        for path in self.paths + self.paths[:3]:
+            _use(cache.get(path))
+            self.check_sizes(cache)
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.misses, len(self.paths) + 3)
+
+    def test_growth_keeps_recent_entry(self):
+
+        cache = FileCache()
+        source = cache.get(self.paths[0])
+        size = source.get_size()
+        _use(source)
+        full = source.get_size()
+        cache = FileCache({ 'max_bytes' : full + size // 2 })
+        first = cache.get(self.paths[0])
+        cache.get(self.paths[1])
+        _use(first) # evicts the other entry, not the one that grew
+        self.assertEqual(len(cache), 1)
+        self.assertTrue(cache.lookup(self.paths[0], cache._entries[self.paths[0]][0]) is first)
+        self.check_sizes(cache)
+
+    def test_evicted_file_is_not_charged(self):
+
+        cache = FileCache()
+        source = cache.get(self.paths[0])
+        cache.clear()
+        cache.get(self.paths[1])
+        size = cache._size
+        _use(source)
+        self.assertEqual(cache._size, size)
+        self.check_sizes(cache)
+
+    @unittest.skipIf(tracemalloc is None, 'tracemalloc is not available')
+    def test_charged_size_is_held_memory(self):
+
+        cache = FileCache()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            sources = [cache.get(path) for path in self.paths]
+            for source in sources:
+                _use(source)
+            held = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+        self.assertTrue(0.75 * held < cache._size < 1.25 * held, (held, cache._size))
+
+def _find_line(text, strings):
+    ''' Find text in the source strings, as the Checker did before the lines were indexed.
+    '''
+    text = ut.normalize_string(text, True)
+
+    return [index for index in range(len(strings)) if (ut.normalize_string(strings[index], True) == text)]
+
+class TestFind(unittest.TestCase):
+
+    def test_find_matches_linear_search(self):
+
+        lines = ut.read_strings(_SOURCE)
+        source = SourceFile(_SOURCE, lines)
+        texts = lines[::7] + ['  ' + line.replace(' ', '\t  ') + ' ' for line in lines[::53]]
+        texts += ['', '\t', '}', 'no such line', u'caf\xe9']
+        for text in texts:
+            self.assertEqual(source.find(text), _find_line(text, lines), text)
+
+    def test_find_returns_a_copy(self):
+
+        source = SourceFile('foo.c', ['}', 'int a;', '}'])
+        source.find('}').append(5)
+        self.assertEqual(source.find('}'), [0, 2])
+
+def _locate(norms, texts, expected):
+    ''' Find the block of lines nearest to expected, by comparing the lines at each position.
+    '''
+    count = len(texts)
+    last  = len(norms) - count
+    if ((count == 0) or (last < 0)):
+        return -1
+    expected = min(max(expected, 0), last)
+    positions = sorted(range(last + 1), key=lambda pos: (abs(pos - expected), -pos))
+    for pos in positions:
+        if (norms[pos:pos + count] == texts):
+            return pos
+
+    return -1
+
+def _locate_hunk(norms, ops, texts, expected, fuzz):
+    ''' Find a hunk's before lines as GNU patch does, ignoring up to fuzz leading
+        and trailing merge lines.
+    '''
+    length = len(ops)
+    lead = len(ops) - len(''.join(ops).lstrip(' '))
+    trail = min(len(ops) - len(''.join(ops).rstrip(' ')), length - lead)
+    for level in range(fuzz + 1):
+        (head, tail) = (min(level, lead), min(level, trail))
+        if ((head + tail) >= length):
+            break
+        index = _locate(norms, texts[head:length - tail], expected + head)
+        if (index != -1):
+            return (index - head, level)
+
+    return (-1, 0)
+
+class TestLocate(unittest.TestCase):
+
+    def test_locate_matches_comparison_at_each_position(self):
+
+        rand = random.Random(5)
+        for _ in range(300):
+            lines = [rand.choice(('a', 'b', 'c', '  a', 'b\t')) for _ in range(rand.randint(0, 30))]
+            source = SourceFile('foo.c', lines)
+            norms = ut.normalize_strings(lines)
+            for _ in range(10):
+                texts = [rand.choice(('a', 'b', 'c')) for _ in range(rand.randint(0, 4))]
+                expected = rand.randint(-3, len(lines) + 3)
+                self.assertEqual(source.locate(texts, expected), _locate(norms, texts, expected),
+                                 (lines, texts, expected))
+
+    def test_locate_hunk_matches_comparison_at_each_position(self):
+
+        rand = random.Random(7)
+        for _ in range(300):
+            lines = [rand.choice(('a', 'b', 'c', 'd')) for _ in range(rand.randint(0, 30))]
+            source = SourceFile('foo.c', lines)
+            for _ in range(10):
+                count = rand.randint(1, 7)
+                ops   = [rand.choice('  -') for _ in range(count)]
+                texts = [rand.choice(('a', 'b', 'c', 'd')) for _ in range(count)]
+                expected = rand.randint(0, len(lines) + 2)
+                fuzz = rand.randint(0, 3)
+                self.assertEqual(source.locate_hunk(ops, texts, expected, fuzz),
+                                 _locate_hunk(lines, ops, texts, expected, fuzz),
+                                 (lines, ops, texts, expected, fuzz))
+
+    def test_locate_hunk_in_example_file(self):
+
+        lines = ut.read_strings(_SOURCE)
+        source = SourceFile(_SOURCE, lines)
+        norms = source.get_norms()
+        texts = norms[1000:1007]
+        ops = [' ', ' ', ' ', '-', ' ', ' ', ' ']
+        self.assertEqual(source.locate_hunk(ops, texts, 900, 0), (1000, 0))
+        self.assertEqual(source.locate_hunk(ops, ['x'] + texts[1:6] + ['y'], 1100, 2), (1000, 1))
+        self.assertEqual(source.locate_hunk(ops, ['x', 'y'] + texts[2:], 1100, 1), (-1, 0))
+
+if __name__ == '__main__':
+    unittest.main()
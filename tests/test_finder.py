@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Tests of the Finder, against the search of each line of each file that it
+made before it could skip files, search in parallel or search raw data.
+'''
+
+import io
+import os
+import gzip
+import shutil
+import tempfile
+import unittest
+
+from patchtools.lib.finder    import Finder
+from patchtools.lib.matcher   import Matcher
+from patchtools.lib.functions import Functions as ut
+
+_LIB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'patchtools', 'lib')
+
+# File data, as bytes, for the cases that the library sources do not have
+_FILES = {
+    'empty.c'   : b'',
+    'crlf.c'    : b'static int a;\r\nreturn foo(a);\r\n\r\n',
+    'cr.c'      : b'static int a;\rreturn foo(a);\r',
+    'latin1.c'  : b'/* caf\xe9 */\nstatic int a;\n',
+    'utf8.c'    : b'/* caf\xc3\xa9 */\nstatic int a;',
+    'blank.c'   : b'\n\n  static int a;\n\n\n',
+    'nomatch.c' : b'int b;\n' * 1000,
+    'prefix.c'  : b'int b;\nimport x\n',
+    'suffix.c'  : b'int b;\nlabel:\n',
+    'match.c'   : b'int f() {\n}\n',
+    'regex.c'   : b'\tfoo();\n    raise PT_Error\n',
+    }
+
+# Patterns with literals (substrings, prefixes, suffixes and exact lines)
+_LITERALS = [
+    { 'substr' : ['self.', 'PT_'], 'prefix' : ['def ', 'import'], 'suffix' : [':'] },
+    { 'substr' : ['static int', u'caf\xe9'], 'match' : ['}', ''] },
+    { 'substr' : ['return', 'zz'] }, # too short to narrow the search by trigrams
+    { 'substr' : ['name_%d' % index for index in range(40)] + ['__init__'] },
+    ]
+
+# Regular expressions. In Python 2 the string of a regex includes its address, so
+# only the options that do not show patterns are compared.
+_REGEXES = [
+    { 'regexp' : [r'\s*return\s+\w+\(', r'.*caf'] },
+    { 'regexp' : [r'\s*raise PT_'], 'substr' : ['static'] },
+    ]
+
+# More file data for raw searches: matches next to each other, at the ends of
+# files, after non-ASCII lines, in compressed files and in a mapped file
+_RAW_FILES = {
+    'adjacent.c' : b'static int a; static int b;\nstatic int c;\nreturn x;\n',
+    'ends.c'     : b'return a;\nint b;\nreturn c;',
+    'late.c'     : b'/* na\xc3\xafve */\n' * 3 + b'return caf\xc3\xa9;\n/* caf\xc3\xa9 */\n',
+    'mixed.c'    : b'/* na\xefve */\nint caf\xe9;\nstatic int caf\xe9 = 1;\n',
+    'large.c'    : (b'/' * 1023 + b'\n') * 1024 + b'static int a;\n' + b'def f(self):\n' * 3,
+    }
+
+_OPTIONS = ('full', 'compact', 'complete', 'match', 'terse')
+
+class _BaselineFinder(Finder):
+    ''' The Finder as it was, matching each line of each file.
+    '''
+    def match(self, params):
+
+        self.matcher = Matcher(params)
+        self.matches = {}
+        for path in self.file_paths:
+            filepath = ut.join_path(self.root_path, path)
+            path_ = path if self.trim_paths else filepath
+            strings = ut.read_strings(filepath)
+            for index in range(len(strings)):
+                pattern = self.matcher(strings[index])
+                if (pattern is None):
+                    continue
+                key = path_ if (self.mode == 'file') else pattern
+                item = (pattern if (self.mode == 'file') else path_, index + 1, strings[index].lstrip())
+                self.matches[key] = self.matches.get(key, []) + [item]
+
+        if (self.mode == 'file'):
+            return self._list_by_file()
+        else:
+            return self._list_by_pattern()
+
+class FinderTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tempdir = tempfile.mkdtemp()
+        self.root = os.path.join(self.tempdir, 'tree')
+        shutil.copytree(_LIB, os.path.join(self.root, 'lib'), ignore=shutil.ignore_patterns('__pycache__', '*.pyc'))
+        os.mkdir(os.path.join(self.root, 'misc'))
+        for (name, data) in _FILES.items():
+            with io.open(os.path.join(self.root, 'misc', name), 'wb') as outp:
+                outp.write(data)
+        self.paths = sorted(['lib/' + name for name in os.listdir(os.path.join(self.root, 'lib'))] +
+                            ['misc/' + name for name in _FILES])
+
+    def tearDown(self):
+
+        shutil.rmtree(self.tempdir)
+
+    def _cases(self):
+        ''' Generate (patterns, options, mode) of each search to compare.
+        '''
+        for patterns in _LITERALS:
+            for options in _OPTIONS:
+                for mode in ('file', 'pattern'):
+                    yield (patterns, options, mode)
+        for patterns in _REGEXES:
+            for options in ('full', 'compact', 'match', 'terse'):
+                yield (patterns, options, 'file')
+
+    def _find(self, cls, patterns, options, mode, **params):
+
+        params.update({ 'root_path'  : self.root,
+                        'file_paths' : self.paths,
+                        'options'    : options,
+                        'mode'       : mode })
+
+        return cls(params).match(dict(patterns))
+
+    def assert_same_results(self, **params):
+        ''' Compare searches with (params) to the baseline searches.
+        '''
+        for (patterns, options, mode) in self._cases():
+            expected = self._find(_BaselineFinder, patterns, options, mode, **params)
+            self.assertEqual(self._find(Finder, patterns, options, mode, **params), expected,
+                             (patterns, options, mode, params))
+
+class TestFinder(FinderTestCase):
+
+    def test_results_match_baseline(self):
+
+        self.assert_same_results()
+        self.assert_same_results(trim_paths=False)
+
+class TestRaw(FinderTestCase):
+
+    def setUp(self):
+
+        FinderTestCase.setUp(self)
+        for (name, data) in _RAW_FILES.items():
+            with io.open(os.path.join(self.root, 'misc', name), 'wb') as outp:
+                outp.write(data)
+            outp = gzip.open(os.path.join(self.root, 'misc', name + '.gz'), 'wb')
+            try:
+                outp.write(data)
+            finally:
+                outp.close()
+            self.paths += ['misc/' + name, 'misc/' + name + '.gz']
+
+    def test_results_match_baseline(self):
+
+        self.assert_same_results(raw=True)
+        self.assert_same_results(raw=True, workers=2)
+
+    def test_files_are_searched_raw(self):
+
+        finder = Finder({ 'root_path' : self.root, 'file_paths' : self.paths, 'raw' : True })
+        finder.matcher = Matcher({ 'substr' : ['static int', u'caf\xe9'] })
+        for name in ('large.c', 'mixed.c', 'late.c.gz'):
+            self.assertIsNotNone(finder._match_raw(ut.join_path(self.root, 'misc/' + name)), name)
+        self.assertIsNone(finder._match_raw(ut.join_path(self.root, 'misc/crlf.c')))
+
+class TestParallel(FinderTestCase):
+
+    def test_results_match_baseline(self):
+
+        for workers in (2, 3):
+            self.assert_same_results(workers=workers)
+
+    def test_files_are_yielded_in_order(self):
+
+        finder = Finder({ 'root_path' : self.root, 'file_paths' : self.paths, 'workers' : 3 })
+        finder.matcher = Matcher(_LITERALS[0])
+        self.assertEqual(list(finder._match_parallel(self.paths)),
+                         list(finder._match_sequential(self.paths)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Tests of the utility functions.
+'''
+
+import io
+import os
+import bz2
+import gzip
+import random
+import shutil
+import tempfile
+import unittest
+
+try:
+    import lzma # Python 3.3 and later
+except ImportError:
+    lzma = None
+
+from patchtools.lib.functions import Functions as ut
+
+# File data, as bytes, for which the streaming and whole file readers must agree
+_DATA = [
+    b'',
+    b'\n',
+    b'\n\n\n',
+    b'a',
+    b'a\n',
+    b'a\n\n\n',
+    b'\n\na\n\nb\n\n',
+    b' \n',
+    b'a\r\nb\r\n\r\n',
+    b'a\rb\r',
+    b'caf\xc3\xa9\n',
+    b'caf\xc3\xa9\ncaf\xe9\n',                 # invalid utf-8 after valid utf-8
+    b'x\n' * 200000 + b'caf\xe9\n',            # ... in a later block
+    b'\n'.join([b'', b'x' * 300000, b'', b'', b'y' * 10, b'']) + b'\n' * 5,
+    (b'ab\n\n' * 100000)[:-1],
+    ]
+
+class TestReadStrings(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+
+        shutil.rmtree(self.tempdir)
+
+    def _write(self, name, data):
+
+        path = os.path.join(self.tempdir, name)
+        if (name.endswith('.gz')):
+            outp = gzip.GzipFile(path, 'wb')
+        elif (name.endswith('.bz2')):
+            outp = bz2.BZ2File(path, 'wb')
+        elif (name.endswith('.xz')):
+            outp = lzma.LZMAFile(path, 'wb')
+        else:
+            outp = io.open(path, 'wb')
+        try:
+            outp.write(data)
+        finally:
+            outp.close()
+
+        return path
+
+    def test_iter_strings_matches_read_strings(self):
+
+        suffixes = ['', '.gz', '.bz2'] + (['.xz'] if (lzma is not None) else [])
+        for index in range(len(_DATA)):
+            for suffix in suffixes:
+                path = self._write('%d.txt%s' % (index, suffix), _DATA[index])
+                expected = ut.read_strings(path)
+                self.assertEqual(list(ut.iter_strings(path)), expected, path)
+                if (suffix != ''):
+                    plain = self._write('%d.txt' % index, _DATA[index])
+                    self.assertEqual(expected, ut.read_strings(plain), path)
+
+    def test_read_bytes_decompresses(self):
+
+        for suffix in ('.gz', '.bz2'):
+            path = self._write('a.txt' + suffix, b'caf\xe9\r\n')
+            self.assertEqual(bytes(ut.read_bytes(path)), b'caf\xe9\r\n')
+
+    def test_decode_data(self):
+
+        self.assertEqual(ut.decode_data(b'caf\xc3\xa9\r\nb\r'), u'caf\xe9\nb\n')
+        self.assertEqual(ut.decode_data(b'caf\xc3\xa9 caf\xe9'), u'caf\xc3\xa9 caf\xe9')
+
+def _normalize_string(string, strip=True):
+    ''' Normalize a string, as Functions.normalize_string did before it was optimized.
+    '''
+    if (strip):
+        string = string.strip()
+        string = string.replace('\t', ' ')
+    while ('  ' in string):
+        string = string.replace('  ', ' ')
+
+    return string
+
+class TestNormalize(unittest.TestCase):
+
+    def test_normalize_string_matches_replace_loop(self):
+
+        rand = random.Random(9)
+        for _ in range(5000):
+            string = u''.join([rand.choice((u' ', u' ', u'\t', u'a', u'b', u'\xa0', u'\n'))
+                               for _ in range(rand.randint(0, 20))])
+            for strip in (True, False):
+                self.assertEqual(ut.normalize_string(string, strip), _normalize_string(string, strip),
+                                 (string, strip))
+
+    def test_normalize_strings_matches_normalize_string(self):
+
+        strings = [u'', u' ', u'\t', u'  a  b  ', u'a\t\tb', u'a    b', u' a   b\t ', u'\xa0a\xa0']
+        self.assertEqual(ut.normalize_strings(strings),
+                         [ut.normalize_string(string, True) for string in strings])
+        self.assertEqual(ut.normalize_strings(strings[3:5]), [u'a b', u'a b'])
+
+if __name__ == '__main__':
+    unittest.main()
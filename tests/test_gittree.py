@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Tests of GitTree, against the files of the working tree.
+'''
+
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from patchtools.lib.gittree    import GitTree
+from patchtools.lib.filecache  import FileCache
+from patchtools.lib.exceptions import PT_NotFoundError
+
+# Data of each file, as committed and left in the working tree
+_FILES = {
+    'lf.c'     : b'int a;\nint b;\n',
+    'crlf.c'   : b'int a;\r\nint b;\r\n\r\n',
+    'cr.c'     : b'int a;\rint b;\r',
+    'latin1.c' : b'/* caf\xe9 */\nint a;\n',
+    'utf8.c'   : b'/* caf\xc3\xa9 */\nint a;',
+    }
+
+def _git(repodir, *args):
+
+    subprocess.check_call(['git', '-c', 'core.autocrlf=false', '-c', 'user.name=test',
+                           '-c', 'user.email=test@example.com'] + list(args),
+                          cwd=repodir, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+class TestGitTree(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tempdir = tempfile.mkdtemp()
+        try:
+            _git(self.tempdir, 'init', '-q', '.')
+        except (OSError, subprocess.CalledProcessError):
+            shutil.rmtree(self.tempdir)
+            self.skipTest('git is not available')
+        os.mkdir(os.path.join(self.tempdir, 'sub'))
+        for (name, data) in _FILES.items():
+            for path in (name, os.path.join('sub', name)):
+                with io.open(os.path.join(self.tempdir, path), 'wb') as outp:
+                    outp.write(data)
+        _git(self.tempdir, 'add', '.')
+        _git(self.tempdir, 'commit', '-q', '-m', 'files')
+        self.tree = GitTree({ 'repodir' : self.tempdir, 'revision' : 'HEAD' })
+
+    def tearDown(self):
+
+        self.tree.close()
+        shutil.rmtree(self.tempdir)
+
+    def test_lines_match_working_tree(self):
+
+        cache = FileCache()
+        for name in _FILES:
+            for path in (name, 'sub/' + name):
+                expected = cache.get(os.path.join(self.tempdir, path)).lines
+                self.assertEqual(self.tree.get(path).lines, expected, path)
+
+    def test_is_file(self):
+
+        self.assertTrue(self.tree.is_file('sub/lf.c'))
+        self.assertFalse(self.tree.is_file('sub'))
+        self.assertFalse(self.tree.is_file('missing.c'))
+        self.assertRaises(PT_NotFoundError, self.tree.get, 'missing.c')
+
+    def test_missing_revision(self):
+
+        self.assertRaises(PT_NotFoundError, GitTree, { 'repodir' : self.tempdir, 'revision' : 'nosuch' })
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Tests of the hunk sections of parsed patches.
+'''
+
+import pickle
+import unittest
+
+from patchtools.lib.hunk import Hunk
+
+_LINES = ['@@ -3,6 +3,6 @@ static int foo(void)',
+          ' int a;',
+          '-int b;',
+          '+int c;',
+          '',
+          ' return 0;',
+          '\\ No newline at end of file',
+          '+}']
+
+def _before(edits):
+    ''' The before lines as the checker selected them from the edit lines.
+    '''
+    ops, texts = [], []
+    for edit in edits:
+        op, text = (edit[0], edit[1:]) if (len(edit) > 0) else (' ', '')
+        if (op not in ('+', '\\')):
+            ops   += [op]
+            texts += [text]
+
+    return (ops, texts)
+
+class TestHunk(unittest.TestCase):
+
+    def test_edits(self):
+
+        hunk = Hunk(_LINES)
+        self.assertEqual((hunk.old_start, hunk.old_count, hunk.note), (3, 6, 'static'))
+        self.assertEqual(hunk.edits, _LINES[1:])
+        self.assertEqual(list(hunk.ops), [ord(' '), ord('-'), ord('+'), 0, ord(' '), ord('\\'), ord('+')])
+        self.assertEqual(Hunk(_LINES[:1]).edits, [])
+
+    def test_get_before(self):
+
+        hunk = Hunk(_LINES)
+        self.assertEqual(hunk.get_before(), ([' ', '-', ' ', ' '], ['int a;', 'int b;', '', 'return 0;']))
+        self.assertEqual(hunk.get_before(), _before(hunk.edits))
+
+    def test_from_buffer(self):
+
+        buffer = 'diff --git a/x b/x\n' + '\n'.join(_LINES) + '\n'
+        start = buffer.index('@@')
+        hunk = Hunk.from_buffer(buffer, start, len(buffer) - 1)
+        self.assertEqual(hunk.edits, _LINES[1:])
+        self.assertEqual(hunk.get_before(), _before(_LINES[1:]))
+
+    def test_pickle(self):
+
+        hunk = Hunk(_LINES)
+        copy = pickle.loads(pickle.dumps(hunk, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual((copy.spec, copy.edits, copy.get_before()),
+                         (hunk.spec, hunk.edits, hunk.get_before()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Tests of Landmarks, against the rules as the Checker applied them before
+they were compiled and memoized.
+'''
+
+import os
+import unittest
+
+from patchtools.lib           import landmark
+from patchtools.lib.landmark  import Landmarks
+from patchtools.lib.functions import Functions as ut
+
+_EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         'patchtools', 'examples')
+
+_PATHS = ('drivers/foo.c', 'include/foo.h', 'arch/arm/foo.S', 'arch/arm/foo.inc',
+          'arch/arm/boot/dts/am335x-bone.dts', 'arch/arm/boot/dts/am33xx.dtsi',
+          'drivers/Kconfig', 'drivers/Kconfig.debug', 'drivers/Makefile', 'README', 'foo.txt')
+
+_STRINGS = ['', ' ', '\t', '};', '}', ');', 'bool', '/*', ' */', 'static int foo;', 'void',
+            'MODULE_LICENSE("GPL");', 'module_init(foo)', 'DEFINE_MUTEX(lock);', 'x->y = 1;',
+            'a = b;', '#ifdef CONFIG_FOO', '#if', '.section .text', 'label:', 'mov r0, r1',
+            '>;', 'status = "okay";', '#address-cells = <1>;', 'pinctrl-names = "default";',
+            'compatible = "ti,am33xx";', 'config FOO', 'depends on BAR', '\thelp',
+            '# - comment', 'obj-$(CONFIG_FOO) += foo.o', 'all: foo', 'a_b-c_d e', 'a b c d e',
+            'averyveryverylongword', 'short words only', '-', '_', 'a\tb\tc\td\te\tf',
+            ' x( ', '\ttab ) ', u'caf\xe9 = 1;']
+
+def _reference(filepath, string):
+    ''' The landmark rules, as the Checker applied them.
+    '''
+    if ((len(string) == 0) or string.isspace()):
+        return False
+
+    words = []
+    for word in ut.string_to_words(string):
+        words += word.split('_')
+    words = sum([word.split('-') for word in words], [])
+
+    if (len(words) > 4):
+        return True
+
+    filename = filepath[filepath.rfind('/') + 1:]
+    word0 = words[0]
+    if (filename.endswith('.c') or filename.endswith('.h')):
+        if ((len(words) == 1) and (word0 in ('/*', '*/', '}', ')', ');', 'bool'))):
+            return False
+        if (word0 in ('#ifdef', '#ifndef', '#include', 'void', 'const', 'static', 'extern', 'struct', 'union')):
+            return True
+        for prefix in ('MACHINE_', 'MODULE_', 'module_', 'DEFINE_', 'DECLARE_'):
+            if (word0.startswith(prefix)):
+                return True
+        for word in words:
+            if (('(' in word) or (')' in word) or ('->' in word)):
+                return True
+        return False
+    elif (filename.endswith('.S') or filename.endswith('.inc')):
+        return ((word0 in ('#ifdef', '#ifndef', '#include', '#if', '.section', '.size', '.align')) or
+                word0.endswith(':'))
+    elif (filename.endswith('.dts') or filename.endswith('.dtsi')):
+        if (word0 in ('};', '>;', '/*', '*/')):
+            return False
+        for common in ('status =', '#address-cells = <1>;', 'interrupt-parent = <&intc>;',
+                       '#size-cells = <0>;', 'pinctrl-names = "default";'):
+            if (common in string):
+                return False
+        return True
+    elif (filename.startswith('Kconfig')):
+        return (word0 in ('config', 'select', 'depends', 'source', 'menu', 'choice'))
+    elif (filename.startswith('Makefile')):
+        if (string.startswith('# -')):
+            return False
+        if ('CONFIG_' in string):
+            return True
+        return any([word.endswith(':') for word in words])
+    else:
+        if (len(words) > 5):
+            return True
+        return any([(len(word) > 12) for word in words])
+
+def _example_strings():
+    ''' The text of each edit line of the example patches.
+    '''
+    strings = set(_STRINGS)
+    for (dirpath, _, filenames) in os.walk(_EXAMPLES):
+        for filename in filenames:
+            if (filename.endswith('.patch')):
+                for line in ut.read_strings(os.path.join(dirpath, filename)):
+                    strings.add(line[1:])
+
+    return sorted(strings)
+
+class TestLandmarks(unittest.TestCase):
+
+    def test_matches_reference(self):
+
+        strings = _example_strings()
+        self.assertTrue(len(strings) > 1000)
+        landmarks = Landmarks()
+        for _ in range(2): # the second pass uses the remembered results
+            for path in _PATHS:
+                for string in strings:
+                    self.assertEqual(landmarks.is_landmark(path, string), _reference(path, string),
+                                     (path, string))
+
+    def test_forgotten_results_match_reference(self):
+
+        limits = (landmark._MEMO_LIMIT, landmark._TYPES_LIMIT)
+        landmark._MEMO_LIMIT, landmark._TYPES_LIMIT = 7, 3
+        try:
+            landmarks = Landmarks()
+            for string in _STRINGS * 3:
+                for path in _PATHS:
+                    self.assertEqual(landmarks.is_landmark(path, string), _reference(path, string),
+                                     (path, string))
+                    self.assertTrue(len(landmarks._memo) <= 7)
+                    self.assertTrue(len(landmarks._types) <= 3)
+        finally:
+            (landmark._MEMO_LIMIT, landmark._TYPES_LIMIT) = limits
+
+if __name__ == '__main__':
+    unittest.main()
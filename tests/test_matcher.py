@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Tests of the Matcher, against a pattern by pattern implementation of its rules.
+'''
+
+import random
+import unittest
+
+from patchtools.lib.matcher import Matcher
+
+# Regular expressions, including some that cannot be combined into one alternation
+_REGEXES = [r'a+b', r'(c)\1', r'(?i)B', r'.*cc$', r'b|c', r'(?P<x>ab)c', r'(?P<x>ba)', r'x?y*']
+
+def _reference(params, regexes, string):
+    ''' The first pattern of the first type that matches, testing each pattern in turn.
+        In Python 2, the string of a regex includes its address, so the regexes are
+        the Matcher's own.
+    '''
+    tests = [('match',  lambda pattern: (string == pattern)),
+             ('prefix', lambda pattern: string.startswith(pattern)),
+             ('suffix', lambda pattern: string.endswith(pattern)),
+             ('substr', lambda pattern: (pattern in string))]
+    for (key, test) in tests:
+        for pattern in params.get(key, []):
+            if test(pattern):
+                return pattern
+    for regex in (regexes or []):
+        if (regex.match(string) is not None):
+            return str(regex)
+
+    return None
+
+def _word(rand, length):
+
+    return ''.join([rand.choice('abc') for _ in range(length)])
+
+class TestMatcher(unittest.TestCase):
+
+    def test_matches_reference(self):
+
+        rand = random.Random(3)
+        for trial in range(3000):
+            count = 40 if ((trial % 4) == 0) else 6 # automata are made for many substrings
+            params = {}
+            for key in ('match', 'prefix', 'suffix', 'substr'):
+                if (rand.random() < 0.5):
+                    params[key] = [_word(rand, rand.randint(0 if (rand.random() < 0.05) else 1, 4))
+                                   for _ in range(rand.randint(0, count))]
+            if (rand.random() < 0.5):
+                params['regexp'] = rand.sample(_REGEXES, rand.randint(0, 3))
+            matcher = Matcher(dict(params))
+            for _ in range(20):
+                string = _word(rand, rand.randint(0, 10))
+                self.assertEqual(matcher(string), _reference(params, matcher.regex_patterns, string),
+                                 (params, string))
+
+    def test_could_match_and_literals(self):
+
+        rand = random.Random(4)
+        for _ in range(1000):
+            params = { 'substr' : [_word(rand, rand.randint(1, 3)) for _ in range(rand.randint(1, 40))] }
+            if (rand.random() < 0.5):
+                params['regexp'] = [r'.*' + _word(rand, 2) + r'\d+']
+            matcher = Matcher(dict(params))
+            lines = [_word(rand, rand.randint(0, 8)) for _ in range(5)]
+            if any([(matcher(line) is not None) for line in lines]):
+                self.assertTrue(matcher.could_match('\n'.join(lines)))
+            literals = matcher.get_literals()
+            self.assertEqual(matcher.could_match('\n'.join(lines)),
+                             any([(literal in line) for literal in literals for line in lines]))
+
+    def test_callbacks_disable_literals(self):
+
+        def is_empty(string):
+            return (len(string) == 0)
+
+        matcher = Matcher({ 'substr' : ['abc'], 'funcs' : [is_empty] })
+        self.assertIsNone(matcher.get_literals())
+        self.assertTrue(matcher.could_match('xyz'))
+        self.assertEqual(matcher(''), str(is_empty))
+        self.assertEqual(matcher('xabcx'), 'abc')
+        self.assertIsNone(matcher('x'))
+
+if __name__ == '__main__':
+    unittest.main()
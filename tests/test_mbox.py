@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Tests of Mbox, against the patch files that a mailbox is made of.
+'''
+
+import os
+import gzip
+import shutil
+import mailbox
+import tempfile
+import unittest
+from email.header import decode_header, make_header
+
+from patchtools.lib.mbox      import Mbox
+from patchtools.lib.patch     import Patch
+from patchtools.lib.functions import Functions as ut
+
+# The example patch series, made by "git format-patch"
+_QUILT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      'patchtools', 'examples', 'capemgr', 'quilt')
+
+_COVER = '''From 0000000000000000000000000000000000000000 Mon Sep 17 00:00:00 2001
+From: A <a@example.com>
+Subject: [PATCH 0/12] the series
+
+The patches of the series.
+
+'''
+
+# A message whose body has lines starting with "From " and ">From ", which are escaped
+# in a mailbox
+_MESSAGE = '''From 1111111111111111111111111111111111111111 Mon Sep 17 00:00:00 2001
+From: =?UTF-8?q?Caf=C3=A9?= <b@example.com>
+Subject: [PATCH] a long subject that is
+ folded
+
+From me, the text.
+>From you too.
+
+diff --git a/foo.c b/foo.c
+--- a/foo.c
++++ b/foo.c
+@@ -1 +1 @@
+-a
++b
+
+'''
+
+def _escape(text):
+    ''' Escape the body lines of a message that start with "From " or ">From ", as they
+        are in a mailbox.
+    '''
+    lines = text.split('\n')
+
+    return '\n'.join(lines[:1] + [('>' + line) if (line.lstrip('>').startswith('From ')) else line
+                                   for line in lines[1:]])
+
+def _values(patch):
+    ''' The parsed values of a patch.
+    '''
+    diffs = []
+    for diff in patch.diffs:
+        hunks = [(hunk.spec, hunk.old_start, hunk.old_count, hunk.new_start, hunk.new_count,
+                  hunk.edits) for hunk in diff.hunks]
+        diffs += [(diff.spec, getattr(diff, 'old_path', None), getattr(diff, 'new_path', None),
+                   diff.diff_type, hunks)]
+
+    return (patch.patch_type, patch.patch_mode, patch.headers, diffs)
+
+class TestMbox(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tempdir = tempfile.mkdtemp()
+        with open(os.path.join(_QUILT, 'series')) as inpt:
+            series = [line.strip() for line in inpt if (len(line.strip()) > 0)]
+        self.paths = [os.path.join(_QUILT, 'patches', name) for name in series]
+
+    def tearDown(self):
+
+        shutil.rmtree(self.tempdir)
+
+    def _write_mbox(self, texts, name='series.mbox'):
+
+        path = os.path.join(self.tempdir, name)
+        data = ''.join(texts).encode('utf-8')
+        outp = gzip.open(path, 'wb') if name.endswith('.gz') else open(path, 'wb')
+        try:
+            outp.write(data)
+        finally:
+            outp.close()
+
+        return path
+
+    def test_patches_match_patch_files(self):
+
+        texts = [_COVER] + [ut.read_file(path) for path in self.paths]
+        for name in ('series.mbox', 'series.mbox.gz'):
+            patches = list(Mbox(self._write_mbox(texts, name)).patches())
+            self.assertEqual([_values(patch) for patch in patches],
+                             [_values(Patch(path)) for path in self.paths], name)
+
+    def test_headers_match_email_parser(self):
+
+        path = self._write_mbox([ut.read_file(path) for path in self.paths] + [_escape(_MESSAGE)])
+        messages = list(mailbox.mbox(path))
+        patches = list(Mbox(path).patches())
+        self.assertEqual(len(patches), len(messages))
+        for (patch, message) in zip(patches, messages):
+            for name in ('From', 'Date', 'Subject'):
+                if (message[name] is not None):
+                    value = u'%s' % make_header(decode_header(message[name].replace('\n', '')))
+                    self.assertEqual(patch.headers[name], value)
+
+    def test_escaped_from_lines_are_restored(self):
+
+        path = self._write_mbox([_COVER, _escape(_MESSAGE), _escape(_MESSAGE.replace('foo.c', 'bar.c'))])
+        patches = list(Mbox(path).patches())
+        self.assertEqual([patch.diffs[0].new_path for patch in patches], ['foo.c', 'bar.c'])
+        messages = list(Mbox(path)._messages())
+        self.assertEqual(messages[1], _MESSAGE.split('\n')[:-1])
+        self.assertEqual(_values(patches[0]), _values(Patch.from_text(_MESSAGE)))
+        self.assertEqual(patches[0].headers['Subject'], u'[PATCH] a long subject that is folded')
+        self.assertEqual(patches[0].headers['From'], u'Caf\xe9 <b@example.com>')
+
+if __name__ == '__main__':
+    unittest.main()
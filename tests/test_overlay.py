@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Tests of Overlay, against the files patched on disk by GNU patch.
+'''
+
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from patchtools.lib.checker   import Checker
+from patchtools.lib.overlay   import Overlay
+from patchtools.lib.patch     import Patch
+from patchtools.lib.functions import Functions as ut
+
+# The example patch series, whose source files are in the same directory
+_QUILT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      'patchtools', 'examples', 'capemgr', 'quilt')
+
+_CHANGES = '''diff --git a/foo.c b/foo.c
+--- a/foo.c
++++ b/foo.c
+@@ -2,4 +2,4 @@
+ int b;
+ int c;
+-int d;
++int dd;
+ int e;
+diff --git a/new.c b/new.c
+--- /dev/null
++++ b/new.c
+@@ -0,0 +1,2 @@
++int x;
++int y;
+diff --git a/old.c b/old.c
+--- a/old.c
++++ /dev/null
+@@ -1,1 +0,0 @@
+-int z;
+'''
+
+def _patch(sourcedir, path):
+    ''' Apply a patch file on disk with GNU patch. Returns False if patch is not available.
+    '''
+    try:
+        with open(path, 'rb') as inpt:
+            subprocess.check_call(['patch', '-p1', '-F2', '-s', '--no-backup-if-mismatch', '-r', '-'],
+                                  cwd=sourcedir, stdin=inpt, stdout=subprocess.PIPE)
+    except OSError:
+        return False
+
+    return True
+
+class TestOverlay(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tempdir = tempfile.mkdtemp()
+        self.quilt = os.path.join(self.tempdir, 'quilt')
+        shutil.copytree(_QUILT, self.quilt)
+        with open(os.path.join(self.quilt, 'series')) as inpt:
+            self.series = [line.strip() for line in inpt if (len(line.strip()) > 0)]
+
+    def tearDown(self):
+
+        shutil.rmtree(self.tempdir)
+
+    def _push(self, name):
+
+        if (not _patch(self.quilt, os.path.join(self.quilt, 'patches', name))):
+            self.skipTest('GNU patch is not available')
+
+    def test_series_matches_patched_files(self):
+
+        overlay = Overlay({ 'sourcedir' : self.quilt })
+        for name in self.series:
+            self.assertEqual(overlay.apply(Patch(os.path.join(self.quilt, 'patches', name))), 0)
+            self._push(name)
+            for filename in overlay.list_files():
+                self.assertEqual(overlay.get(filename).lines,
+                                 ut.read_strings(os.path.join(self.quilt, filename)), filename)
+
+    def _check(self, names, series):
+        ''' Check patches, and return the messages of each patch.
+        '''
+        checker = Checker({ 'sourcedir' : self.quilt,
+                            'patchdir'  : os.path.join(self.quilt, 'patches'),
+                            'mode'      : 'complete',
+                            'series'    : series })
+        msgs = checker.match(names)
+        starts = [index for index in range(len(msgs)) if msgs[index].startswith('\nPATCH:')]
+        starts += [msgs.index('\nSummary:')]
+
+        return [msgs[starts[index]:starts[index + 1]] for index in range(len(starts) - 1)]
+
+    def test_series_check_matches_checks_of_pushed_patches(self):
+
+        expected = self._check(self.series, True)
+        for index in range(len(self.series)):
+            self.assertEqual(self._check(self.series[index:index + 1], False), expected[index:index + 1])
+            self._push(self.series[index])
+
+    def test_offset_create_and_delete(self):
+
+        sourcedir = os.path.join(self.tempdir, 'tree')
+        os.mkdir(sourcedir)
+        files = { 'foo.c' : 'int x;\nint y;\nint a;\nint b;\nint c;\nint d;\nint e;\n',
+                  'old.c' : 'int z;\n' }
+        for (filename, text) in files.items():
+            with open(os.path.join(sourcedir, filename), 'w') as outp:
+                outp.write(text)
+        path = os.path.join(self.tempdir, 'changes.patch')
+        with open(path, 'w') as outp:
+            outp.write(_CHANGES)
+
+        overlay = Overlay({ 'sourcedir' : sourcedir })
+        self.assertEqual(overlay.apply(Patch(path)), 0)
+        self.assertEqual(overlay.list_files(), ['foo.c', 'new.c', 'old.c'])
+        self.assertEqual(overlay.get('foo.c').lines,
+                         ['int x;', 'int y;', 'int a;', 'int b;', 'int c;', 'int dd;', 'int e;'])
+        self.assertEqual(overlay.get('new.c').lines, ['int x;', 'int y;'])
+        self.assertFalse(overlay.is_file('old.c'))
+
+        if (not _patch(sourcedir, path)):
+            self.skipTest('GNU patch is not available')
+        for filename in ('foo.c', 'new.c'):
+            self.assertEqual(overlay.get(filename).lines, ut.read_strings(os.path.join(sourcedir, filename)))
+        self.assertFalse(os.path.exists(os.path.join(sourcedir, 'old.c')))
+
+if __name__ == '__main__':
+    unittest.main()
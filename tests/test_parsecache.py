@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Tests of ParseCache, against patches parsed from their files.
+'''
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from patchtools.lib.checker    import Checker
+from patchtools.lib.patch      import Patch
+from patchtools.lib.parsecache import ParseCache
+
+# The example patch series, whose source files are in the same directory
+_QUILT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      'patchtools', 'examples', 'capemgr', 'quilt')
+
+def _values(patch):
+    ''' The parsed values of a patch.
+    '''
+    diffs = []
+    for diff in patch.diffs:
+        hunks = [(hunk.spec, hunk.old_start, hunk.old_count, hunk.new_start, hunk.new_count,
+                  hunk.edits) for hunk in diff.hunks]
+        diffs += [(diff.spec, getattr(diff, 'old_path', None), getattr(diff, 'new_path', None),
+                   diff.diff_type, hunks)]
+
+    return (patch.patch_type, patch.patch_mode, patch.headers, diffs)
+
+class TestParseCache(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tempdir = tempfile.mkdtemp()
+        self.cachedir = os.path.join(self.tempdir, 'parsed')
+        os.mkdir(self.cachedir)
+        with open(os.path.join(_QUILT, 'series')) as inpt:
+            self.series = [line.strip() for line in inpt if (len(line.strip()) > 0)]
+        self.paths = [os.path.join(_QUILT, 'patches', name) for name in self.series]
+
+    def tearDown(self):
+
+        shutil.rmtree(self.tempdir)
+
+    def test_stored_patches_match_parsed_patches(self):
+
+        cache = ParseCache({ 'cachedir' : self.cachedir })
+        for _ in range(2):
+            for path in self.paths:
+                self.assertEqual(_values(cache.get(path)), _values(Patch(path)), path)
+        self.assertEqual((cache.misses, cache.hits), (len(self.paths), len(self.paths)))
+
+        cache = ParseCache({ 'cachedir' : self.cachedir }) # a later run
+        for path in self.paths:
+            self.assertEqual(_values(cache.get(path)), _values(Patch(path)), path)
+        self.assertEqual((cache.misses, cache.hits), (0, len(self.paths)))
+
+    def test_changed_and_damaged_patches_are_parsed(self):
+
+        path = os.path.join(self.tempdir, 'a.patch')
+        shutil.copy(self.paths[1], path)
+        cache = ParseCache({ 'cachedir' : self.cachedir })
+        cache.get(path)
+        with open(path, 'a') as outp:
+            outp.write('diff --git a/x.c b/x.c\n--- a/x.c\n+++ b/x.c\n@@ -1 +1 @@\n-a\n+b\n')
+        self.assertEqual(_values(cache.get(path)), _values(Patch(path)))
+        self.assertEqual(cache.misses, 2)
+
+        for filename in os.listdir(self.cachedir):
+            with open(os.path.join(self.cachedir, filename), 'wb') as outp:
+                outp.write(b'damaged')
+        self.assertEqual(_values(cache.get(path)), _values(Patch(path)))
+        self.assertEqual(cache.misses, 3)
+
+    def _stored_size(self):
+
+        return sum([os.path.getsize(os.path.join(self.cachedir, filename))
+                    for filename in os.listdir(self.cachedir)])
+
+    def test_size_is_bounded(self):
+
+        cache = ParseCache({ 'cachedir' : self.cachedir })
+        for path in self.paths:
+            cache.get(path)
+        total = self._stored_size()
+        shutil.rmtree(self.cachedir)
+        os.mkdir(self.cachedir)
+
+        cache = ParseCache({ 'cachedir' : self.cachedir, 'max_bytes' : total // 2 })
+        for path in self.paths:
+            self.assertEqual(_values(cache.get(path)), _values(Patch(path)), path)
+            self.assertTrue(self._stored_size() <= total // 2)
+        self.assertTrue(len(os.listdir(self.cachedir)) > 0)
+
+    def test_checker_output_is_unchanged(self):
+
+        def match(**params):
+            params.update({ 'sourcedir' : _QUILT,
+                            'patchdir'  : os.path.join(_QUILT, 'patches'),
+                            'mode'      : 'complete' })
+            return Checker(params).match(self.series)
+
+        expected = match()
+        for _ in range(2):
+            self.assertEqual(match(parsedir=self.cachedir), expected)
+
+if __name__ == '__main__':
+    unittest.main()
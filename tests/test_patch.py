@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Tests of Patch parsing, against the parser the Patch, Diff and Hunk classes
+used before they scanned the lines in one pass.
+'''
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from patchtools.lib.diff      import Diff
+from patchtools.lib.patch     import Patch
+from patchtools.lib.strings   import Strings
+from patchtools.lib.functions import Functions as ut
+
+_EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         'patchtools', 'examples')
+
+_HUNKS = '''@@ -1,3 +1,3 @@ static int foo(void)
+ int a;
+-int b;
++int bb;
+ int c;
+@@ -10 +10 @@
+-x
++y
+'''
+
+# Patch texts for the parts of the format that the examples do not have
+_TEXTS = {
+    'email' : ('From 1234 Mon Sep 17 00:00:00 2001\nFrom: A <a@example.com>\nSubject: [PATCH] x\n\n'
+               'text\n---\n foo.c | 2 +-\n\ndiff --git a/foo.c b/foo.c\nindex 1..2 100644\n'
+               '--- a/foo.c\n+++ b/foo.c\n' + _HUNKS + '-- \n1.8.3\n\n'),
+    'two_diffs' : ('diff --git a/foo.c b/foo.c\n--- a/foo.c\n+++ b/foo.c\n' + _HUNKS + '\n\n'
+                   'diff --git a/bar.c b/bar.c\n--- a/bar.c\n+++ b/bar.c\n' + _HUNKS),
+    'urn' : ('diff -urN a/foo.c b/foo.c\n--- a/foo.c\t2014-01-01\n+++ b/foo.c\t2014-01-02\n' + _HUNKS +
+             'diff -urN a/bar.c b/bar.c\n--- a/bar.c\n+++ b/bar.c\n' + _HUNKS),
+    'commented' : ('diff --git a/foo.c b/foo.c\n--- a/foo.c\n+++ b/foo.c\n"""\n' + _HUNKS + '"""\n' +
+                   _HUNKS.replace('foo', 'baz') + '"""\ndiff --git a/bar.c b/bar.c\n"""\n'),
+    'all_commented' : '"""\ndiff --git a/foo.c b/foo.c\n"""\n',
+    'no_diffs' : 'Subject: nothing\n\njust text\n',
+    'binary' : ('diff --git a/x.bin b/x.bin\nindex 1..2\nGIT binary patch\nliteral 3\nabc\n\n'
+                'diff --git a/foo.c b/foo.c\n--- a/foo.c\n+++ b/foo.c\n' + _HUNKS),
+    'dev_null' : ('diff --git a/new.c b/new.c\nnew file mode 100644\n--- /dev/null\n+++ b/new.c\n'
+                  '@@ -0,0 +1,2 @@\n+a\n+b\ndiff --git a/old.c b/old.c\n--- a/old.c\n+++ /dev/null\n'
+                  '@@ -1 +0,0 @@\n-a\n'),
+    'no_hunks' : 'diff --git a/foo.c b/foo.c\nold mode 100644\nnew mode 100755\n',
+    'crlf' : ('diff --git a/foo.c b/foo.c\r\n--- a/foo.c\r\n+++ b/foo.c\r\n' +
+              _HUNKS.replace('\n', '\r\n')),
+    'footer_only' : 'diff --git a/foo.c b/foo.c\n--- a/foo.c\n+++ b/foo.c\n' + _HUNKS + '-- \n',
+    'empty_lines' : ('diff --git a/foo.c b/foo.c\n--- a/foo.c\n+++ b/foo.c\n' + _HUNKS + '\n\n\n' +
+                     'diff --git a/bar.c b/bar.c\n--- a/bar.c\n+++ b/bar.c\n' + _HUNKS + '\n'),
+    }
+
+def _reference(path):
+    ''' Parse a patch file as Patch did. Returns (patch_type, patch_mode, diffs), where each
+        diff is (spec, a_path, b_path, diff_type, old_path, new_path, hunks), and each hunk is
+        (spec, note, old_start, old_count, new_start, new_count, edits).
+    '''
+    strings = Strings(ut.read_strings(path)).discard('"""', '"""')
+    (_, body) = strings.partition('diff -')
+    if (body is None):
+        return ('text', 'git', [])
+    elif (body[0].startswith('diff --git ')):
+        (head, _) = body.rpartition('-- ')
+        if (head is not None): # with no footer, Patch used to find no diffs; now it parses them all
+            body = head
+        (splitter, mode) = ('diff --git ', 'git')
+    else:
+        (splitter, mode) = ('diff -', 'urn')
+
+    diffs = []
+    patch_type = 'text'
+    if (body is not None):
+        for rec in body.split(splitter):
+            diff = _reference_diff(rec)
+            if (diff[3] == 'binary'):
+                patch_type = 'binary'
+            diffs += [diff]
+
+    return (patch_type, mode, diffs)
+
+def _reference_diff(strings):
+
+    (head, body) = strings.partition('@@ ')
+    spec = a_path = b_path = old_path = new_path = None
+    if (head[0].startswith('diff -')):
+        spec = head[0]
+        parts = ut.normalize_string(spec, False).split(' ')
+        (a_path, b_path) = (parts[2][2:], parts[3][2:])
+        if (a_path.endswith('/')):
+            a_path = b_path
+    diff_type = 'text'
+    for string in head[1:]:
+        if (string == 'GIT binary patch'):
+            (diff_type, old_path, new_path) = ('binary', None, None)
+            break
+        elif (string.startswith('--- ')):
+            old_path = '/dev/null' if (string[4:] == '/dev/null') else string[6:]
+        elif (string.startswith('+++ ')):
+            new_path = '/dev/null' if (string[4:] == '/dev/null') else string[6:]
+
+    hunks = []
+    if (body is not None):
+        for rec in body.split('@@ '):
+            while (len(rec[-1]) == 0):
+                rec.pop(-1)
+            (_, old, new, tail) = ut.normalize_string(rec[0], False).split(' ', 3)
+            note = '' if (tail == '@@') else tail.split(' ')[1]
+            counts = []
+            for field in (old, new):
+                parts = field[1:].split(',')
+                counts += [int(parts[0]), (int(parts[1]) if (',' in field) else 1)]
+            hunks += [tuple([rec[0], note] + counts + [list(rec[1:])])]
+
+    return (spec, a_path, b_path, diff_type, old_path, new_path, hunks)
+
+def _parsed(patch):
+    ''' The values of a Patch, in the form returned by _reference.
+    '''
+    return (patch.patch_type, patch.patch_mode, [_parsed_diff(diff) for diff in patch.diffs])
+
+def _parsed_diff(diff):
+
+    hunks = [(hunk.spec, hunk.note, hunk.old_start, hunk.old_count, hunk.new_start,
+              hunk.new_count, hunk.edits) for hunk in diff.hunks]
+
+    return tuple([getattr(diff, field, None) for field in
+                  ('spec', 'a_path', 'b_path', 'diff_type', 'old_path', 'new_path')] + [hunks])
+
+def _example_patches():
+
+    paths = []
+    for (dirpath, _, filenames) in os.walk(_EXAMPLES):
+        paths += [os.path.join(dirpath, filename) for filename in filenames if filename.endswith('.patch')]
+
+    return sorted(paths)
+
+class TestParse(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+
+        shutil.rmtree(self.tempdir)
+
+    def _write(self, name, text):
+
+        path = os.path.join(self.tempdir, name + '.patch')
+        with open(path, 'wb') as outp:
+            outp.write(text.encode('utf-8'))
+
+        return path
+
+    def test_example_patches_match_reference(self):
+
+        paths = _example_patches()
+        self.assertTrue(len(paths) > 0)
+        for path in paths:
+            self.assertEqual(_parsed(Patch(path)), _reference(path), path)
+
+    def test_patch_texts_match_reference(self):
+
+        for (name, text) in sorted(_TEXTS.items()):
+            path = self._write(name, text)
+            self.assertEqual(_parsed(Patch(path)), _reference(path), name)
+            self.assertEqual(_parsed(Patch.from_text(ut.read_file(path))), _reference(path), name)
+
+class TestLazyHunks(unittest.TestCase):
+
+    def test_hunks_are_made_when_first_used(self):
+
+        patch = Patch(_example_patches()[0])
+        for diff in patch.diffs:
+            self.assertIsNone(diff._hunks)
+            # A pickled diff whose hunks are not made yet makes them when they are used
+            copy = pickle.loads(pickle.dumps(diff, pickle.HIGHEST_PROTOCOL))
+            self.assertIsNone(copy._hunks)
+            hunks = diff.hunks
+            self.assertTrue(diff.hunks is hunks)
+            self.assertEqual([hunk.edits for hunk in copy.hunks], [hunk.edits for hunk in hunks])
+
+    def test_diff_of_lines_matches_reference(self):
+
+        for text in (_TEXTS['dev_null'], _TEXTS['empty_lines'], _TEXTS['binary']):
+            strings = Strings(text.split('\n'))
+            for rec in strings.split('diff --git '):
+                diff = Diff(list(rec))
+                self.assertEqual(_parsed_diff(diff), _reference_diff(rec))
+                self.assertEqual(_parsed_diff(Diff(['x'] + rec + ['y'], 1, len(rec) + 1)),
+                                 _reference_diff(rec))
+
+class TestCompact(unittest.TestCase):
+
+    def test_objects_have_slots_only(self):
+
+        patch = Patch(_example_patches()[0])
+        objects = [patch] + patch.diffs + sum([diff.hunks for diff in patch.diffs], [])
+        self.assertTrue(len(objects) > 2)
+        for obj in objects:
+            self.assertFalse(hasattr(obj, '__dict__'), obj)
+
+    def test_pickled_patches_match(self):
+
+        for path in _example_patches():
+            patch = Patch(path)
+            for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+                copy = pickle.loads(pickle.dumps(patch, protocol))
+                self.assertEqual(_parsed(copy), _parsed(patch), path)
+
+if __name__ == '__main__':
+    unittest.main()
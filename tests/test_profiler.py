@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Tests of the Profiler, and of the profiles of Checker runs.
+'''
+
+import os
+import unittest
+
+from patchtools.lib.checker  import Checker
+from patchtools.lib.profiler import Profiler
+
+# The example patch series, whose source files are in the same directory
+_QUILT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      'patchtools', 'examples', 'capemgr', 'quilt')
+
+def _counters(node):
+
+    return dict([(key, value) for (key, value) in node.items()
+                 if ((key != 'time') and isinstance(value, (int, float)))])
+
+class TestProfiler(unittest.TestCase):
+
+    def test_counters_include_contained_nodes(self):
+
+        profiler = Profiler()
+        profiler.start_patch('a.patch')
+        profiler.add('parse_time', 0.5)
+        profiler.start_diff('diff a', 'foo.c')
+        profiler.add('bytes_read', 10)
+        profiler.start_hunk('@@ 1')
+        profiler.add('lines_compared', 3)
+        profiler.start_hunk('@@ 2')
+        profiler.add('lines_compared', 4)
+        profiler.start_diff('diff b', 'bar.c')
+        profiler.add('bytes_read', 5)
+        profiler.start_patch('b.patch')
+        profiler.add('lines_compared')
+        profiler.end_patch()
+        profiler.add('lines_compared', 100) # no open node
+
+        profile = profiler.get_profile()
+        (first, second) = profile['patches']
+        self.assertEqual(_counters(first), { 'parse_time' : 0.5, 'bytes_read' : 15, 'lines_compared' : 7 })
+        self.assertEqual([_counters(diff) for diff in first['diffs']],
+                         [{ 'bytes_read' : 10, 'lines_compared' : 7 }, { 'bytes_read' : 5 }])
+        self.assertEqual([hunk['hunk'] for hunk in first['diffs'][0]['hunks']], ['@@ 1', '@@ 2'])
+        self.assertEqual(_counters(second), { 'lines_compared' : 1 })
+        self.assertEqual(dict([(key, value) for (key, value) in profile['totals'].items() if (key != 'time')]),
+                         { 'patches' : 2, 'parse_time' : 0.5, 'bytes_read' : 15, 'lines_compared' : 8 })
+        self.assertEqual(sorted([name for (_, name) in profile['slowest_files']]), ['bar.c', 'foo.c'])
+        self.assertEqual(profiler.take_patches(), [first, second])
+        self.assertEqual(profiler.patches, [])
+
+class TestCheckerProfile(unittest.TestCase):
+
+    def _checker(self, **params):
+
+        params.update({ 'sourcedir' : _QUILT,
+                        'patchdir'  : os.path.join(_QUILT, 'patches'),
+                        'mode'      : 'complete' })
+
+        return Checker(params)
+
+    def _series(self):
+
+        with open(os.path.join(_QUILT, 'series')) as inpt:
+            return [line.strip() for line in inpt if (len(line.strip()) > 0)]
+
+    def test_profile_does_not_change_output(self):
+
+        for params in ({}, { 'find' : True }, { 'relocate' : True }):
+            expected = self._checker(**params).match(self._series())
+            params['profile'] = True
+            self.assertEqual(self._checker(**params).match(self._series()), expected)
+
+    def test_nodes_sum_their_contents(self):
+
+        checker = self._checker(find=True, profile=True)
+        self.assertIsNone(self._checker().get_profile())
+        series = self._series()
+        checker.match(series)
+        profile = checker.get_profile(3)
+        self.assertEqual([patch['patch'] for patch in profile['patches']], series)
+        self.assertEqual(profile['totals']['patches'], len(series))
+        self.assertEqual(len(profile['slowest_patches']), 3)
+        self.assertTrue(profile['totals']['find_lookups'] > 0)
+        for patch in profile['patches']:
+            for diff in patch['diffs']:
+                for key in ('lines_compared', 'normalizations', 'find_lookups'):
+                    self.assertEqual(diff.get(key, 0), sum([hunk.get(key, 0) for hunk in diff['hunks']]))
+            for key in ('lines_compared', 'bytes_read'):
+                self.assertEqual(patch.get(key, 0), sum([diff.get(key, 0) for diff in patch['diffs']]))
+        for key in ('lines_compared', 'bytes_read', 'normalizations'):
+            self.assertEqual(profile['totals'][key], sum([patch.get(key, 0) for patch in profile['patches']]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Tests of the result records and sinks.
+'''
+
+import io
+import os
+import json
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from patchtools.lib.checker import Checker
+from patchtools.lib.results import CheckResult, TextSink, JsonSink
+
+# The example patch series, whose source files are in the same directory
+_QUILT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      'patchtools', 'examples', 'capemgr', 'quilt')
+
+class TestSinks(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tempdir = tempfile.mkdtemp()
+        with open(os.path.join(_QUILT, 'series')) as inpt:
+            self.series = [line.strip() for line in inpt if (len(line.strip()) > 0)]
+
+    def tearDown(self):
+
+        shutil.rmtree(self.tempdir)
+
+    def _checker(self, find):
+
+        return Checker({ 'sourcedir' : _QUILT,
+                         'patchdir'  : os.path.join(_QUILT, 'patches'),
+                         'mode'      : 'complete',
+                         'find'      : find })
+
+    def _read(self, path):
+
+        with io.open(path, 'r', encoding='utf-8') as inpt:
+            return inpt.read()
+
+    def test_records_format_as_match_messages(self):
+
+        for find in (False, True):
+            expected = self._checker(find).match(self.series)
+            records = list(self._checker(find).results(self.series))
+            sink = TextSink()
+            strings = []
+            for record in records:
+                strings += sink.format(record)
+            self.assertEqual(strings, expected)
+
+            path = os.path.join(self.tempdir, 'out.txt')
+            self.assertEqual(sink.write(iter(records), path), len(records))
+            self.assertEqual(self._read(path), ''.join([string + '\n' for string in expected]))
+
+    def test_json_records_round_trip(self):
+
+        records = list(self._checker(True).results(self.series))
+        path = os.path.join(self.tempdir, 'out.json')
+        self.assertEqual(JsonSink().write(iter(records), path), len(records))
+        copies = [CheckResult.from_dict(json.loads(line)) for line in self._read(path).splitlines()]
+        self.assertEqual([copy.as_dict() for copy in copies], [record.as_dict() for record in records])
+        copies = pickle.loads(pickle.dumps(records, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual([copy.as_dict() for copy in copies], [record.as_dict() for record in records])
+
+class TestFormatMatrix(unittest.TestCase):
+
+    def test_passed_counts_pass_and_offset_cells(self):
+
+        matrix = { 'trees'   : ['v1', 'v2', 'v3'],
+                   'patches' : ['a.patch', 'b.patch', 'c.patch'],
+                   'rows'    : [['pass', '+2', 'fail'],
+                                ['skip', '-1', 'pass'],
+                                ['pass', 'fail', 'skip']] }
+        strings = TextSink().format_matrix(matrix)
+        self.assertEqual(strings[:4], ['trees:', '   [1] v1', '   [2] v2', '   [3] v3'])
+        self.assertEqual(strings[-1].split(), ['passed', '2', '2', '1'])
+        self.assertEqual(strings[-3].split(), ['b.patch', 'skip', '-1', 'pass'])
+
+if __name__ == '__main__':
+    unittest.main()
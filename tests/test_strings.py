@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Tests of StringsView, against the results of Strings for the same lines.
+'''
+
+import random
+import unittest
+
+from patchtools.lib.strings import Strings, StringsView
+
+# Characters of the random lines, including whitespace that lstrip removes
+_CHARS = [u' ', u'  ', u'\t', u'\x0b', u'\x0c', u'\r', u'\xa0', u'　',
+          u'#', u'#i', u'f', u'o', u'{', u'}']
+
+def _random_lines(rand):
+
+    return [u''.join([rand.choice(_CHARS) for _ in range(rand.randint(0, 5))])
+            for _ in range(rand.randint(0, 12))]
+
+def _random_pattern(rand, lines):
+    ''' A prefix of a line, possibly of its whitespace, or a random string.
+    '''
+    if ((len(lines) > 0) and (rand.random() < 0.7)):
+        line = rand.choice(lines)
+        if (len(line) > 0):
+            start = rand.randint(0, len(line) - 1)
+            return line[start:rand.randint(start + 1, len(line))]
+
+    return u''.join([rand.choice(_CHARS) for _ in range(rand.randint(1, 3))])
+
+def _as_lists(parts):
+
+    return [(None if (part is None) else list(part)) for part in parts]
+
+class TestStringsView(unittest.TestCase):
+
+    def test_leading_whitespace_patterns(self):
+
+        self.assertEqual(StringsView([u'\tfoo']).find(u'\t'), -1)
+        self.assertEqual(StringsView([u'  #if']).find(u' #if'), -1)
+        self.assertEqual(StringsView([u'  #if']).match([u' #i', u'#i']), (0, u'#i'))
+        self.assertEqual(StringsView([u'a', u'  #if']).rmatch([u' #', u'#if']), (1, u'#if'))
+
+    def test_searches_match_strings(self):
+
+        rand = random.Random(1)
+        for _ in range(3000):
+            lines = _random_lines(rand)
+            strings, view = Strings(list(lines)), StringsView(list(lines))
+            length = len(lines)
+            patterns = [_random_pattern(rand, lines) for _ in range(rand.randint(1, 3))]
+            begin = rand.randint(0, length)
+            end   = rand.randint(begin, length)
+            self.assertEqual(view.find(patterns[0], begin, end), strings.find(patterns[0], begin, end))
+            self.assertEqual(view.match(list(patterns), begin, end), strings.match(list(patterns), begin, end))
+            self.assertEqual(view.filter(patterns[0], begin, end), strings.filter(patterns[0], begin, end))
+            self.assertEqual(view.index(patterns[0]), strings.index(patterns[0]))
+            if (length > 0):
+                begin = rand.randint(0, length - 1)
+                end   = rand.randint(-1, begin)
+                self.assertEqual(view.rfind(patterns[0], begin, end), strings.rfind(patterns[0], begin, end))
+                self.assertEqual(view.rmatch(list(patterns), begin, end),
+                                 strings.rmatch(list(patterns), begin, end))
+            self.assertEqual(_as_lists(view.partition(patterns[0])),
+                             _as_lists(strings.partition(patterns[0])))
+            self.assertEqual(_as_lists(view.rpartition(patterns[0])),
+                             _as_lists(strings.rpartition(patterns[0])))
+
+    def test_sections_match_strings(self):
+
+        rand = random.Random(2)
+        markers = [u'#++', u'  #++ ', u'#--', u'\t#--', u'#+', u'x']
+        for _ in range(2000):
+            lines = [rand.choice(markers + [u'a', u' b']) for _ in range(rand.randint(0, 12))]
+            strings, view = Strings(list(lines)), StringsView(list(lines))
+            self.assertEqual(_as_lists(view.extract(u'#++', u'#--')),
+                             _as_lists(strings.extract(u'#++', u'#--')))
+            self.assertEqual(list(view.discard(u'#++', u'#--')), list(strings.discard(u'#++', u'#--')))
+            self.assertEqual(list(view[:].lstrip().rstrip()), list(Strings(list(lines)).lstrip().rstrip()))
+            start = rand.randint(0, len(lines))
+            stop  = rand.randint(0, len(lines))
+            self.assertEqual(list(view[start:stop]), list(strings[start:stop]))
+            self.assertEqual(list(view[start:stop].to_strings()), lines[start:stop])
+
+    def test_split_views_the_same_buffer(self):
+
+        view = StringsView.from_text(u'head\ndiff a\n x\ndiff b\n y\n')
+        parts = view.split(u'diff ')
+        self.assertEqual(_as_lists(parts), [[u'head'], [u'diff a', u' x'], [u'diff b', u' y']])
+        self.assertEqual(StringsView.join(parts), view)
+        self.assertTrue(all([part._buffer is view._buffer for part in parts]))
+
+if __name__ == '__main__':
+    unittest.main()
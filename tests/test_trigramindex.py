@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+'''
+Created on Oct 18, 2026
+
+@copyright 2014, Milton C Mobley
+
+Tests of TrigramIndex, against the trigrams of the files read on each search,
+and of the Finder with an index, against the Finder without one.
+'''
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from patchtools.lib.finder       import Finder
+from patchtools.lib.functions    import Functions as ut
+from patchtools.lib              import trigramindex
+from patchtools.lib.trigramindex import TrigramIndex
+
+_LIB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'patchtools', 'lib')
+
+_LITERALS = [['self.'], ['PT_ParameterError', 'import io'], [u'caf\xe9'], ['def __init__(self, params):'],
+             ['no such string'], ['_trigrams', 'Latin-1']]
+
+def _trigrams(text):
+
+    return set([text[index:index + 3] for index in range(len(text) - 2)])
+
+class TestTrigramIndex(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tempdir = tempfile.mkdtemp()
+        self.root = os.path.join(self.tempdir, 'tree')
+        self.indexdir = os.path.join(self.tempdir, 'index')
+        shutil.copytree(_LIB, self.root, ignore=shutil.ignore_patterns('__pycache__', '*.pyc'))
+        os.mkdir(self.indexdir)
+        self.stamp = 0
+        self._write('latin1.c', b'/* caf\xe9 */\n')
+        self._write('utf8.c', b'/* caf\xc3\xa9 */\n')
+        self.paths = sorted(os.listdir(self.root))
+
+    def tearDown(self):
+
+        shutil.rmtree(self.tempdir)
+
+    def _write(self, name, data):
+        ''' Write a file, with a later modification time than the last one written.
+        '''
+        path = os.path.join(self.root, name)
+        with io.open(path, 'wb') as outp:
+            outp.write(data)
+        self.stamp += 10
+        os.utime(path, (os.path.getatime(path), os.path.getmtime(path) + self.stamp))
+
+    def _index(self):
+
+        return TrigramIndex({ 'root_path' : self.root, 'indexdir' : self.indexdir })
+
+    def assert_candidates(self, index, paths):
+        ''' Compare the candidates of the index to the files of (paths) that contain
+            all the trigrams of a literal, and to the files that contain a literal.
+        '''
+        trigrams = dict([(path, _trigrams(ut.read_file(os.path.join(self.root, path)))) for path in paths])
+        for literals in _LITERALS:
+            expected = set([path for path in paths
+                            if any([_trigrams(literal) <= trigrams[path] for literal in literals])])
+            containing = set([path for path in paths
+                              if any([literal in ut.read_file(os.path.join(self.root, path)) for literal in literals])])
+            candidates = index.candidates(literals)
+            self.assertEqual(candidates, expected, literals)
+            self.assertTrue(candidates >= containing, literals)
+        self.assertEqual(len(index), len(paths))
+
+    def test_candidates_match_file_trigrams(self):
+
+        index = self._index()
+        self.assertEqual(index.update(self.paths), len(self.paths))
+        self.assert_candidates(index, self.paths)
+        self.assertIsNone(index.candidates(None))
+        self.assertIsNone(index.candidates(['self.', 'io']))
+        self.assertEqual(index.update(self.paths), 0)
+
+        index = self._index() # a later run
+        self.assertEqual(index.update(self.paths), 0)
+        self.assert_candidates(index, self.paths)
+
+    def test_changed_files_are_indexed(self):
+
+        index = self._index()
+        index.update(self.paths)
+
+        self._write('finder.py', b'# no longer a finder\n')
+        self._write('new.c', b'static int PT_ParameterError;\n')
+        os.remove(os.path.join(self.root, 'functions.py'))
+        data = ut.read_bytes(os.path.join(self.root, 'matcher.py'))
+        self._write('matcher.py', data) # only the stamp changes
+        self.paths = sorted(os.listdir(self.root))
+        self.assertEqual(index.update(self.paths), 2)
+        self.assert_candidates(index, self.paths)
+
+        index = self._index()
+        self.assertEqual(index.update(self.paths), 0)
+        self.assert_candidates(index, self.paths)
+
+        # Files that are not searched are kept, unless they are removed
+        os.remove(os.path.join(self.root, 'new.c'))
+        index.update(['finder.py'])
+        self.paths.remove('new.c')
+        self.assert_candidates(index, self.paths)
+
+    def test_index_is_compacted(self):
+
+        index = self._index()
+        index.update(self.paths)
+        for count in range(6): # replace half of the files, retiring their ids
+            changed = self.paths[count % 2::2]
+            for path in changed:
+                self._write(path, ut.read_bytes(os.path.join(self.root, path)) + ('\n# %d\n' % count).encode('ascii'))
+            self.assertEqual(index.update(self.paths), len(changed))
+            self.assertTrue(index._next_id <= 2 * len(self.paths))
+            self.assert_candidates(index, self.paths)
+
+        index = self._index()
+        self.assertEqual(index.update(self.paths), 0)
+        self.assert_candidates(index, self.paths)
+
+    def test_segments_are_merged(self):
+
+        index = self._index()
+        index.update(self.paths)
+        for count in range(trigramindex._MAX_SEGMENTS + 4):
+            name = 'added%d.c' % count
+            self._write(name, ('int added_%d;\n' % count).encode('ascii'))
+            self.paths += [name]
+            self.assertEqual(index.update(self.paths), 1)
+            segments = [filename for filename in os.listdir(self.indexdir) if filename.endswith('.segment')]
+            self.assertTrue(len(segments) <= trigramindex._MAX_SEGMENTS)
+
+        index = self._index()
+        self.assertEqual(index.update(self.paths), 0)
+        self.assert_candidates(index, self.paths)
+        self.assertEqual(index.candidates(['added_3;']), set(['added3.c']))
+
+    def test_damaged_index_is_rebuilt(self):
+
+        self._index().update(self.paths)
+        for filename in os.listdir(self.indexdir):
+            with open(os.path.join(self.indexdir, filename), 'wb') as outp:
+                outp.write(b'damaged')
+
+        index = self._index()
+        self.assertEqual(index.update(self.paths), len(self.paths))
+        self.assert_candidates(index, self.paths)
+
+    def test_finder_results_are_unchanged(self):
+
+        def match(patterns, **params):
+            params.update({ 'root_path' : self.root, 'file_paths' : self.paths })
+            return Finder(params).match(patterns)
+
+        index = self._index()
+        for patterns in ({ 'substr' : ['PT_ParameterError', u'caf\xe9'] }, { 'prefix' : ['def _'] },
+                         { 'regexp' : [r'\s*return None'] }, { 'substr' : ['io'] }):
+            self.assertEqual(match(patterns, index=index), match(patterns))
+            self._write('new.c', b'return None\nPT_ParameterError\n')
+            self.paths = sorted(os.listdir(self.root))
+
+if __name__ == '__main__':
+    unittest.main()